@@ -38,9 +38,22 @@ DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "")
 DB_URL = os.getenv("DATABASE_URL", "")  # Full connection string if provided
 
-# PostgreSQL connection pooling
+# PostgreSQL connection pooling. Every worker process has two pools (the
+# psycopg2 pool below and the SQLAlchemy engine), so unless overridden each
+# worker's share of a server-wide connection budget (kept under Postgres's
+# default max_connections of 100) is split between them
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "80"))
+DB_WORKER_CONNECTIONS = max(2, min(20, DB_MAX_CONNECTIONS // WEB_CONCURRENCY))
 DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
-DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", str(max(DB_POOL_MIN, DB_WORKER_CONNECTIONS // 2))))
+# SQLAlchemy engine: persistent pool_size connections plus max_overflow
+# opened on demand, together taking the rest of the worker's share
+DB_ENGINE_POOL_SIZE = int(os.getenv("DB_ENGINE_POOL_SIZE", str(max(1, min(5, DB_WORKER_CONNECTIONS - DB_POOL_MAX)))))
+DB_ENGINE_MAX_OVERFLOW = int(os.getenv(
+    "DB_ENGINE_MAX_OVERFLOW",
+    str(max(0, DB_WORKER_CONNECTIONS - DB_POOL_MAX - DB_ENGINE_POOL_SIZE))
+))
 
 # Database retry settings
 DB_MAX_RETRIES = int(os.getenv("DB_MAX_RETRIES", "3"))
@@ -94,6 +107,14 @@ class CircuitBreaker:
             elif self.state == "HALF_OPEN":
                 return True
             return False
+    
+    def would_allow(self):
+        """Like is_allowed(), but never changes the breaker's state"""
+        with self.lock:
+            if self.state == "OPEN":
+                return bool(self.last_failure_time and
+                            (time.time() - self.last_failure_time) > self.recovery_time)
+            return self.state in ("CLOSED", "HALF_OPEN")
 
 # Create circuit breaker instances
 pg_circuit = CircuitBreaker()
@@ -137,6 +158,14 @@ class Database:
         self.pg_pool = None
         self.failed_operations = 0
         
+        # Raw JSON database text keyed on the file's (mtime, size), so repeated
+        # reads skip the file read and health probes only re-check after the
+        # file changes. Each read parses its own copy, so callers can never
+        # modify the cached state.
+        self._json_cache = None
+        self._json_cache_key = None
+        self._json_probe = {"key": None, "ok": False}
+        
         # Attempt to connect to the preferred database type
         try:
             if self.db_type == "postgres" and POSTGRES_AVAILABLE:
@@ -175,6 +204,10 @@ class Database:
             raise Exception("PostgreSQL not available or circuit breaker open")
             
         try:
+            logger.info(f"Sizing PostgreSQL pool to {DB_POOL_MIN}-{DB_POOL_MAX} connections per worker, "
+                        f"engine pool {DB_ENGINE_POOL_SIZE}+{DB_ENGINE_MAX_OVERFLOW} "
+                        f"({WEB_CONCURRENCY} workers, budget {DB_MAX_CONNECTIONS})")
+            
             # Parse connection string if provided, otherwise use individual params
             if DB_URL:
                 # Use connection string directly
@@ -320,6 +353,23 @@ class Database:
             self.connection = None
             raise e
     
+    @staticmethod
+    def _json_file_key(st: os.stat_result) -> Tuple[int, int]:
+        """Identity of the JSON database file contents for cache validation"""
+        return (st.st_mtime_ns, st.st_size)
+    
+    def _load_json_file(self) -> Dict:
+        """Parse the JSON database, reusing the cached file text while the file is unchanged"""
+        with file_lock:
+            key = self._json_file_key(os.stat(JSON_DB_PATH))
+            if key != self._json_cache_key:
+                with open(JSON_DB_PATH, 'r') as f:
+                    self._json_cache = f.read()
+                self._json_cache_key = key
+            cached = self._json_cache
+        # A fresh parse per call gives every caller an independent structure
+        return json.loads(cached)
+    
     def _get_json_data(self) -> Dict:
         """Read JSON database with fallback to empty structure"""
         if not os.path.exists(JSON_DB_PATH):
@@ -330,9 +380,7 @@ class Database:
             }
         
         try:
-            with file_lock:
-                with open(JSON_DB_PATH, 'r') as f:
-                    return json.load(f)
+            return self._load_json_file()
         except Exception as e:
             logger.error(f"Error reading JSON database: {e}")
             # Attempt to recover from backup
@@ -362,12 +410,19 @@ class Database:
                         dst.write(src.read())
             
             # Write new data
+            text = json.dumps(data, indent=2)
             with file_lock:
                 with open(JSON_DB_PATH, 'w') as f:
-                    json.dump(data, f, indent=2)
+                    f.write(text)
+                # What we just wrote is the new cached state
+                self._json_cache = text
+                self._json_cache_key = self._json_file_key(os.stat(JSON_DB_PATH))
             return True
         except Exception as e:
             logger.error(f"Error saving JSON database: {e}")
+            with file_lock:
+                self._json_cache = None
+                self._json_cache_key = None
             return False
     
     def execute_with_fallback(self, operation_name, sqlite_fn, postgres_fn, json_fn):
@@ -740,6 +795,25 @@ class Database:
             finally:
                 self.pg_pool = None
     
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get PostgreSQL pool usage so operators can right-size DB_POOL_MIN/MAX"""
+        if not self.pg_pool:
+            return {"enabled": False}
+        
+        # _used and _pool are psycopg2 internals; report None if they go away
+        used = getattr(self.pg_pool, "_used", None)
+        idle = getattr(self.pg_pool, "_pool", None)
+        return {
+            "enabled": True,
+            "min": getattr(self.pg_pool, "minconn", DB_POOL_MIN),
+            "max": getattr(self.pg_pool, "maxconn", DB_POOL_MAX),
+            "in_use": len(used) if used is not None else None,
+            "idle": len(idle) if idle is not None else None,
+            "engine_pool_size": DB_ENGINE_POOL_SIZE,
+            "engine_max_overflow": DB_ENGINE_MAX_OVERFLOW,
+            "workers": WEB_CONCURRENCY
+        }
+    
     def get_status(self) -> Dict[str, Any]:
         """Get database connection status information"""
         status = {
@@ -751,15 +825,23 @@ class Database:
         
         # Check current database health
         if self.db_type == "postgres" and self.pg_pool:
+            status["fallbacks"] = ["sqlite", "json"]
+            
+            # Fail fast while the breaker is open. This is a read-only probe,
+            # so it never records results: a status poll must not reset the
+            # failure count built up by real operations
+            if not pg_circuit.would_allow():
+                status["circuit_state"] = pg_circuit.state
+                return status
+            
             try:
                 with self._get_pg_connection() as conn:
                     with conn.cursor() as cursor:
                         cursor.execute("SELECT 1")
                         status["healthy"] = True
-                status["circuit_state"] = pg_circuit.state
-                status["fallbacks"] = ["sqlite", "json"]
             except Exception:
                 status["healthy"] = False
+            status["circuit_state"] = pg_circuit.state
         elif self.db_type == "sqlite" and self.connection:
             try:
                 cursor = self.connection.cursor()
@@ -770,12 +852,25 @@ class Database:
             except Exception:
                 status["healthy"] = False
         elif self.db_type == "json":
+            status["fallbacks"] = []
             try:
-                self._get_json_data()
+                st = os.stat(JSON_DB_PATH)
+            except FileNotFoundError:
+                # Not created yet; reads fall back to an empty structure
                 status["healthy"] = True
-                status["fallbacks"] = []
             except Exception:
                 status["healthy"] = False
+            else:
+                # A single stat() answers the probe unless the file changed
+                key = self._json_file_key(st)
+                if key != self._json_probe["key"]:
+                    try:
+                        self._load_json_file()
+                        ok = st.st_size > 0
+                    except Exception:
+                        ok = False
+                    self._json_probe = {"key": key, "ok": ok}
+                status["healthy"] = self._json_probe["ok"]
                 
         return status
 
@@ -789,7 +884,12 @@ from sqlalchemy.ext.declarative import declarative_base
 engine = None
 if DB_TYPE == 'postgres' and POSTGRES_AVAILABLE:
     db_url = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    engine = create_engine(db_url, pool_pre_ping=True, pool_size=5, max_overflow=10)
+    engine = create_engine(
+        db_url,
+        pool_pre_ping=True,
+        pool_size=DB_ENGINE_POOL_SIZE,
+        max_overflow=DB_ENGINE_MAX_OVERFLOW
+    )
 elif DB_TYPE == 'sqlite':
     engine = create_engine(f'sqlite:///{DB_PATH}', connect_args={"check_same_thread": False})
 else:
@@ -7,10 +7,15 @@ import os
 import sys
 import logging
 import asyncio
+import functools
+import threading
 from pathlib import Path
 
+# Backend root, resolved once at import
+_BASE = Path(__file__).resolve().parent.parent
+
 # Add parent directory to path to import modules
-sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(_BASE))
 
 from ailang_adapter import AILangAdapter
 from agent_orchestrator import AgentOrchestrator
@@ -22,13 +27,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger("ailang_example")
 
-async def run_code_review_task():
-    """
-    Example of using AILang to define and execute a code review task
-    """
-    # Path to the AILang model definition file
-    model_path = os.path.join(Path(__file__).parent.parent, "ailang_models", "agent_system.ail")
-    
+# Path to the AILang model definition file
+MODEL_PATH = str(_BASE / "ailang_models" / "agent_system.ail")
+
+# Guards the one-time adapter construction when examples run from threads
+_adapter_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=1)
+def _build_adapter() -> AILangAdapter:
+    """Parse the AILang model once and return an adapter shared by all examples"""
     # Create an agent orchestrator
     orchestrator = AgentOrchestrator()
     
@@ -36,11 +43,28 @@ async def run_code_review_task():
     adapter = AILangAdapter(orchestrator)
     
     # Initialize the adapter from the AILang model
-    if not adapter.initialize_from_model(model_path):
-        logger.error("Failed to initialize AILang adapter")
-        return
+    if not adapter.initialize_from_model(MODEL_PATH):
+        raise RuntimeError("Failed to initialize AILang adapter")
     
     logger.info("AILang adapter initialized successfully")
+    return adapter
+
+def _get_adapter() -> AILangAdapter:
+    """Return the shared AILang adapter, building it on first use"""
+    with _adapter_lock:
+        return _build_adapter()
+
+async def run_code_review_task():
+    """
+    Example of using AILang to define and execute a code review task
+    """
+    # Reuse the adapter parsed from the AILang model
+    try:
+        adapter = _get_adapter()
+    except RuntimeError as e:
+        logger.error(str(e))
+        return
+    orchestrator = adapter.orchestrator
     
     # Create a code review task using the AILang task template
     context = {
@@ -98,21 +122,13 @@ async def run_security_audit_task():
     """
     Example of using AILang to define and execute a security audit task
     """
-    # Path to the AILang model definition file
-    model_path = os.path.join(Path(__file__).parent.parent, "ailang_models", "agent_system.ail")
-    
-    # Create an agent orchestrator
-    orchestrator = AgentOrchestrator()
-    
-    # Create an AILang adapter with the orchestrator
-    adapter = AILangAdapter(orchestrator)
-    
-    # Initialize the adapter from the AILang model
-    if not adapter.initialize_from_model(model_path):
-        logger.error("Failed to initialize AILang adapter")
+    # Reuse the adapter parsed from the AILang model
+    try:
+        adapter = _get_adapter()
+    except RuntimeError as e:
+        logger.error(str(e))
         return
-    
-    logger.info("AILang adapter initialized successfully")
+    orchestrator = adapter.orchestrator
     
     # Create a security audit task using the AILang task template
     context = {
@@ -176,12 +192,16 @@ async def main():
     """
     logger.info("Running AILang integration examples")
     
-    # Run the code review task example
-    logger.info("=== Running Code Review Task Example ===")
-    await run_code_review_task()
-    
-    logger.info("\n=== Running Security Audit Task Example ===")
-    await run_security_audit_task()
+    # Run the code review and security audit examples concurrently
+    logger.info("=== Running Code Review and Security Audit Task Examples ===")
+    results = await asyncio.gather(
+        run_code_review_task(),
+        run_security_audit_task(),
+        return_exceptions=True
+    )
+    for name, result in zip(("Code review", "Security audit"), results):
+        if isinstance(result, Exception):
+            logger.error(f"{name} example failed: {str(result)}")
     
     logger.info("AILang integration examples completed")
 
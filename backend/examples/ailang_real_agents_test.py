@@ -13,8 +13,11 @@ import logging
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+# Backend root, resolved once at import
+_BASE = Path(__file__).resolve().parent.parent
+
 # Add parent directory to path to import modules
-sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(_BASE))
 
 from ailang_adapter import AILangAdapter
 from agent_orchestrator import AgentOrchestrator
@@ -27,7 +30,10 @@ logging.basicConfig(
 logger = logging.getLogger("ailang_real_agents_test")
 
 # Path to the AILang model
-MODEL_PATH = os.path.join(Path(__file__).parent.parent, "ailang_models", "agent_system.ail")
+MODEL_PATH = str(_BASE / "ailang_models" / "agent_system.ail")
+
+# Maximum number of task templates exercised at the same time
+MAX_CONCURRENT_TESTS = 4
 
 # Test cases for different task templates
 TEST_CASES = {
@@ -147,14 +153,22 @@ async def main() -> None:
         adapter.configure_system()
         logger.info("Configured system settings")
         
-        # Test each task template
-        for template_name, context in TEST_CASES.items():
-            logger.info(f"Testing template: {template_name}")
-            try:
+        # Test all task templates concurrently; each one is an independent
+        # round-trip to the agents, bounded so we don't flood the orchestrator
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_TESTS)
+        
+        async def run_bounded(template_name: str, context: Dict[str, Any]) -> None:
+            async with semaphore:
                 await test_task_template(adapter, template_name, context)
-            except Exception as e:
-                logger.error(f"Error in template {template_name}: {str(e)}")
-            logger.info("-" * 50)
+        
+        results = await asyncio.gather(
+            *(run_bounded(name, ctx) for name, ctx in TEST_CASES.items()),
+            return_exceptions=True
+        )
+        for template_name, result in zip(TEST_CASES, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error in template {template_name}: {str(result)}")
+        logger.info("-" * 50)
         
         logger.info("AILang integration test completed")
     
@@ -1,60 +1,150 @@
 # /project-root/backend/executor.py
 
+import asyncio
+import codecs
 import docker
 import uuid
 import os
-import tempfile
 import logging
 import shutil
+import socket
 import subprocess
+import threading
+import time
+from typing import AsyncIterator, Iterator
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Execution images; pin by digest (e.g. "python:3.10-slim@sha256:...") so
+# upgrades are deliberate and the daemon never has to resolve a moving tag
+PYTHON_IMAGE = os.getenv("EXECUTOR_PYTHON_IMAGE", "python:3.10-slim")
+JS_IMAGE = os.getenv("EXECUTOR_JS_IMAGE", "node:16-alpine")
+PREPULL_ON_START = os.getenv("PREPULL_ON_START", "False").lower() == "true"
+
+# Images already confirmed present on the daemon
+_image_cache = {}
+
+# Shared Docker client, created on first use and reused across runs
+DOCKER_CLIENT_TIMEOUT = 5
+DOCKER_RETRY_ATTEMPTS = 3
+DOCKER_BACKOFF_INITIAL = 0.1
+DOCKER_BACKOFF_MAX = 2.0
+_docker_client = None
+_docker_lock = threading.Lock()
+
+# Container runs are killed after this many seconds or this much output
+CONTAINER_TIMEOUT = 30
+MAX_OUTPUT_BYTES = 1024 * 1024
+
+# One-shot scripts gain nothing from .pyc files, and unbuffered output keeps
+# stdout/stderr ordering intact
+LOCAL_EXEC_ENV = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1", "PYTHONUNBUFFERED": "1"}
+
+def _run_local_script(interpreter: str, code: str) -> subprocess.CompletedProcess:
+    """
+    Run code with a local interpreter, piping it via stdin. communicate()
+    feeds the pipe while draining output, so code of any size goes through
+    without touching the filesystem. Output is captured as raw bytes;
+    callers decode it once.
+    """
+    return subprocess.run(
+        [interpreter, "-"],
+        input=code.encode("utf-8"),
+        capture_output=True,
+        env=LOCAL_EXEC_ENV,
+        timeout=15
+    )
+
+def _get_docker():
+    """Return the shared Docker client, creating it on first use"""
+    global _docker_client
+    if _docker_client is None:
+        with _docker_lock:
+            if _docker_client is None:
+                _docker_client = docker.from_env(timeout=DOCKER_CLIENT_TIMEOUT)
+    return _docker_client
+
+def _reset_docker():
+    """Drop the shared Docker client so the next call reconnects"""
+    global _docker_client
+    with _docker_lock:
+        client, _docker_client = _docker_client, None
+    if client is not None:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+def _get_live_docker():
+    """
+    Return a Docker client that has answered a request, recreating it with
+    exponential backoff if the daemon returns API errors.
+    """
+    backoff = DOCKER_BACKOFF_INITIAL
+    for attempt in range(DOCKER_RETRY_ATTEMPTS):
+        client = _get_docker()
+        try:
+            # Check if Docker is running by listing containers
+            client.containers.list(limit=1)
+            return client
+        except docker.errors.APIError as e:
+            _reset_docker()
+            if attempt == DOCKER_RETRY_ATTEMPTS - 1:
+                raise
+            logger.debug(f"Docker API error ({e}), reconnecting in {backoff:.1f}s")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, DOCKER_BACKOFF_MAX)
+
+def _ensure_image(client, image: str):
+    """
+    Look up an image once and remember it, so later runs skip the daemon
+    lookup. A missing image is pulled, as containers.run used to do.
+    """
+    cached = _image_cache.get(image)
+    if cached is None:
+        try:
+            cached = client.images.get(image)
+        except docker.errors.ImageNotFound:
+            logger.info(f"Execution image {image} not found locally, pulling it")
+            cached = client.images.pull(image)
+        _image_cache[image] = cached
+    return cached
+
+def prepull_images(client=None):
+    """Pull the execution images ahead of time so run_code never hits a missing image"""
+    try:
+        client = client or _get_docker()
+        for image in (PYTHON_IMAGE, JS_IMAGE):
+            logger.info(f"Pre-pulling execution image {image}")
+            _image_cache[image] = client.images.pull(image)
+    except (docker.errors.DockerException, docker.errors.APIError) as e:
+        logger.warning(f"Could not pre-pull execution images: {e}")
+
 # Fallback execution methods if Docker isn't available
 def execute_python_locally(code: str) -> str:
     """Execute Python code locally as a fallback when Docker isn't available"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        script_path = os.path.join(tmpdir, "script.py")
-        with open(script_path, "w", encoding="utf-8") as f:
-            f.write(code)
-        
-        try:
-            result = subprocess.run(
-                ["python", script_path],
-                capture_output=True,
-                text=True,
-                timeout=15  # 15 second timeout for safety
-            )
-            if result.returncode == 0:
-                return result.stdout
-            else:
-                return f"Error (Exit code {result.returncode}):\n{result.stderr}"
-        except subprocess.TimeoutExpired:
-            return "Execution timed out (15 seconds)"
-        except Exception as e:
-            return f"Local execution error: {str(e)}"
+    try:
+        result = _run_local_script("python", code)
+        if result.returncode == 0:
+            return result.stdout.decode("utf-8", errors="replace")
+        else:
+            return f"Error (Exit code {result.returncode}):\n{result.stderr.decode('utf-8', errors='replace')}"
+    except subprocess.TimeoutExpired:
+        return "Execution timed out (15 seconds)"
+    except Exception as e:
+        return f"Local execution error: {str(e)}"
 
 def execute_javascript_locally(code: str) -> str:
     """Execute JavaScript code locally using Node.js as a fallback"""
     try:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            script_path = os.path.join(tmpdir, "script.js")
-            with open(script_path, "w", encoding="utf-8") as f:
-                f.write(code)
-            
-            result = subprocess.run(
-                ["node", script_path],
-                capture_output=True,
-                text=True,
-                timeout=15
-            )
-            
-            if result.returncode == 0:
-                return result.stdout
-            else:
-                return f"Error (Exit code {result.returncode}):\n{result.stderr}"
+        result = _run_local_script("node", code)
+        
+        if result.returncode == 0:
+            return result.stdout.decode("utf-8", errors="replace")
+        else:
+            return f"Error (Exit code {result.returncode}):\n{result.stderr.decode('utf-8', errors='replace')}"
     except FileNotFoundError:
         return "Node.js not found. Please install Node.js to run JavaScript code locally."
     except subprocess.TimeoutExpired:
@@ -62,67 +152,167 @@ def execute_javascript_locally(code: str) -> str:
     except Exception as e:
         return f"Local execution error: {str(e)}"
 
-# Main execution function with Docker
-def run_code(code: str, language: str = "python") -> str:
+def _kill_quietly(container) -> None:
+    """Kill a container, ignoring errors if it has already exited"""
+    try:
+        container.kill()
+    except Exception:
+        pass
+
+def _start_container_with_stdin(client, image: str, cmd: list, code: str):
     """
-    Run code in a Docker container with appropriate language runtime.
-    Falls back to local execution if Docker is unavailable.
+    Start a container and stream the code to the interpreter's stdin.
+    The root filesystem is read-only and /workspace lives in RAM, so nothing
+    touches the host filesystem or the overlay driver.
+    """
+    container = client.containers.create(
+        image,
+        cmd,
+        name=f"exec_{uuid.uuid4().hex[:8]}",
+        working_dir="/workspace",
+        read_only=True,
+        tmpfs={"/workspace": "rw,size=64m,mode=1777"},
+        stdin_open=True,
+        stdin_once=True,       # close stdin once our attach socket disconnects
+        mem_limit='256m',      # limit memory to prevent abuse
+        cpu_quota=50000,       # limit to 50% of single CPU core
+        network_mode="none",   # No network access for security
+        cap_drop=["ALL"],
+        security_opt=["no-new-privileges"],
+        pids_limit=64          # guard against fork bombs
+    )
+    try:
+        sock = container.attach_socket(params={"stdin": 1, "stream": 1})
+        container.start()
+
+        raw_sock = getattr(sock, "_sock", sock)
+        raw_sock.sendall(code.encode("utf-8"))
+        # Half-close so the interpreter sees EOF on stdin
+        if hasattr(raw_sock, "shutdown"):
+            raw_sock.shutdown(socket.SHUT_WR)
+        sock.close()
+    except Exception:
+        container.remove(force=True)
+        raise
+    return container
+
+def _iter_container_output(container, timeout: int = CONTAINER_TIMEOUT) -> Iterator[str]:
+    """
+    Yield a running container's output as it is produced, then remove it.
+    stdout and stderr arrive interleaved; a non-zero exit status is reported
+    as a final "Error (Exit code N)" line, like the local fallbacks do.
+    The container is killed once it exceeds the timeout or MAX_OUTPUT_BYTES.
+    """
+    deadline = time.monotonic() + timeout
+    # logs(follow=True) blocks while the script is silent, so a timer enforces the deadline
+    watchdog = threading.Timer(timeout, _kill_quietly, args=(container,))
+    watchdog.daemon = True
+    watchdog.start()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    total = 0
+    try:
+        for chunk in container.logs(stream=True, follow=True, stdout=True, stderr=True):
+            total += len(chunk)
+            if total > MAX_OUTPUT_BYTES:
+                yield decoder.decode(chunk[:len(chunk) - (total - MAX_OUTPUT_BYTES)], final=True)
+                yield f"\n[Output truncated at {MAX_OUTPUT_BYTES} bytes]"
+                _kill_quietly(container)
+                return
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+        if time.monotonic() >= deadline:
+            yield f"\nExecution timed out ({timeout} seconds)"
+            return
+        # The log stream ends when the container exits, so this returns promptly
+        status = container.wait(timeout=DOCKER_CLIENT_TIMEOUT).get("StatusCode", 0)
+        if status != 0:
+            yield f"\nError (Exit code {status})"
+    except Exception as e:
+        yield f"Docker execution error: {e}"
+    finally:
+        watchdog.cancel()
+        try:
+            container.remove(force=True)
+        except Exception as e:
+            logger.warning(f"Failed to remove container {container.name}: {e}")
+
+def _open_output_stream(code: str, language: str) -> Iterator[str]:
+    """
+    Start executing code and return an iterator over its output. Uses Docker
+    when available and falls back to local execution otherwise.
     """
     # Select Docker image based on language
     if language.lower() == "python":
-        image = "python:3.10-slim"
-        filename = "script.py"
-        cmd = f"python {filename}"
+        image = PYTHON_IMAGE
+        stdin_cmd = ["python", "-"]
     elif language.lower() in ("javascript", "js", "node"):
-        image = "node:16-alpine"
-        filename = "script.js" 
-        cmd = f"node {filename}"
+        image = JS_IMAGE
+        stdin_cmd = ["node", "-"]
     else:
-        return f"Unsupported language: {language}. Currently supported: python, javascript"
+        return iter([f"Unsupported language: {language}. Currently supported: python, javascript"])
     
     # Try Docker execution first
     try:
-        client = docker.from_env()
+        client = _get_live_docker()
         
-        # Check if Docker is running by listing containers
-        client.containers.list(limit=1)
-        
-        # Use isolated temporary directory for thread safety
-        with tempfile.TemporaryDirectory() as tmpdir:
-            script_path = os.path.join(tmpdir, filename)
-            with open(script_path, "w", encoding="utf-8") as f:
-                f.write(code)
-            
+        # The script is piped straight into the interpreter; the attach socket
+        # has no argv-style size limit, so no temp file is ever needed
+        try:
+            _ensure_image(client, image)
             try:
-                # Constrain resources: limit memory and CPU
-                output = client.containers.run(
-                    image,
-                    cmd,
-                    name=f"exec_{uuid.uuid4().hex[:8]}",
-                    volumes={tmpdir: {'bind': '/workspace', 'mode': 'rw'}},
-                    working_dir="/workspace",
-                    remove=True,
-                    stdout=True,
-                    stderr=True,
-                    mem_limit='256m',      # limit memory to prevent abuse
-                    cpu_quota=50000,       # limit to 50% of single CPU core
-                    network_mode="none",   # No network access for security
-                    timeout=30             # 30 second timeout
-                )
-                return output.decode('utf-8')
-            except docker.errors.ContainerError as e:
-                return e.stderr.decode('utf-8')
+                container = _start_container_with_stdin(client, image, stdin_cmd, code)
             except docker.errors.ImageNotFound:
-                return f"Docker image '{image}' not found. Please pull it first with 'docker pull {image}'"
-            except Exception as e:
-                return f"Docker execution error: {e}"
+                # The cached image was removed since it was looked up
+                _image_cache.pop(image, None)
+                _ensure_image(client, image)
+                container = _start_container_with_stdin(client, image, stdin_cmd, code)
+        except docker.errors.ImageNotFound:
+            _image_cache.pop(image, None)
+            return iter([f"Docker image '{image}' not found. Please pull it first with 'docker pull {image}'"])
+        except Exception as e:
+            return iter([f"Docker execution error: {e}"])
+        return _iter_container_output(container)
     except (docker.errors.DockerException, docker.errors.APIError) as e:
         logger.warning(f"Docker unavailable: {e}. Falling back to local execution")
         
         # Fallback to local execution if Docker isn't available
         if language.lower() == "python":
-            return execute_python_locally(code)
-        elif language.lower() in ("javascript", "js", "node"):
-            return execute_javascript_locally(code)
+            return iter([execute_python_locally(code)])
         else:
-            return f"Unsupported language: {language} and Docker is unavailable for execution"
+            return iter([execute_javascript_locally(code)])
+
+# Main execution function with Docker
+def run_code(code: str, language: str = "python") -> str:
+    """
+    Run code in a Docker container with appropriate language runtime.
+    Falls back to local execution if Docker is unavailable.
+    """
+    return "".join(_open_output_stream(code, language))
+
+async def stream_code(code: str, language: str = "python") -> AsyncIterator[str]:
+    """
+    Async variant of run_code that yields output chunks as they are produced,
+    suitable for a StreamingResponse.
+    """
+    loop = asyncio.get_running_loop()
+    chunks = await loop.run_in_executor(None, _open_output_stream, code, language)
+    done = object()
+    try:
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, done)
+            if chunk is done:
+                break
+            yield chunk
+    finally:
+        # Ensures the container is removed if the client disconnects early
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            try:
+                await loop.run_in_executor(None, close)
+            except ValueError:
+                # A read is still in flight; the watchdog ends it and the
+                # generator cleans up when it is garbage collected
+                pass
+
+if PREPULL_ON_START:
+    prepull_images()
@@ -1,12 +1,31 @@
 # /project-root/backend/file_manager.py
 
 import os
+import sys
 import json
 import shutil
+import hashlib
 import logging
-import traceback
+import math
+import queue
+import stat
+import time
+import secrets
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+from io_uring_engine import stat_many, read_many_with_stats
+
+# Fast non-cryptographic hashing for project IDs if available
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
 
 # Try to import our custom logger, fall back to standard logging
 try:
@@ -20,10 +39,357 @@ FILES_DIR = os.path.join(PROJECT_DIR, 'projects')
 BACKUP_DIR = os.path.join(PROJECT_DIR, 'backups')
 TEMP_DIR = os.path.join(PROJECT_DIR, 'tmp')
 
+# Directories already created during this session; skips repeated
+# makedirs syscalls when many files are written under the same parents
+_ENSURED_DIRS = set()
+
+def _ensure_dir(path: str) -> None:
+    """os.makedirs(path, exist_ok=True), skipped for directories already ensured"""
+    if path not in _ENSURED_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _ENSURED_DIRS.add(path)
+
 # Create necessary directories if they don't exist
-os.makedirs(FILES_DIR, exist_ok=True)
-os.makedirs(BACKUP_DIR, exist_ok=True)
-os.makedirs(TEMP_DIR, exist_ok=True)
+_ensure_dir(FILES_DIR)
+_ensure_dir(BACKUP_DIR)
+_ensure_dir(TEMP_DIR)
+
+# Maximum number of opened projects kept in memory (least recently used evicted)
+MAX_OPEN_PROJECTS = int(os.getenv("MAX_OPEN_PROJECTS", "32"))
+
+# Limits for one read_project_files_batch call
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", "200"))
+MAX_BATCH_BYTES = int(os.getenv("MAX_BATCH_BYTES", str(16 * 1024 * 1024)))
+
+# Files are stat()ed in batches of this size while scanning project folders
+SCAN_CHUNK_SIZE = 256
+
+# How long get_status reuses its directory accessibility checks
+STATUS_CACHE_TTL = float(os.getenv("FILE_STATUS_CACHE_TTL", "30"))  # seconds
+
+# Threads used to walk a project folder. The default of 1 scans serially;
+# more threads only pay off on very large trees or network filesystems.
+# SCAN_MAX_INFLIGHT is how many scanned directories may wait for the
+# consumer before workers block.
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "1"))
+SCAN_MAX_INFLIGHT = 64
+
+# Per-file stat cache used when (re)opening project folders
+STAT_CACHE_SIZE = int(os.getenv("STAT_CACHE_SIZE", "100000"))
+STAT_CACHE_TTL = float(os.getenv("STAT_CACHE_TTL", "5"))  # seconds
+
+# Single-pass translation tables for path separator rewriting
+_SAFE_TRANS = str.maketrans({'/': '_', '\\': '_'})
+_SLASH_TRANS = str.maketrans({'\\': '/'})
+
+# Atomic writes can create the new file as an anonymous inode and link it
+# into place once complete (Linux, via /proc/self/fd)
+HAS_O_TMPFILE = hasattr(os, "O_TMPFILE") and os.path.isdir("/proc/self/fd")
+
+# Kernel access-pattern hints are only available on POSIX platforms, and
+# only worth the extra syscall for files large enough to need readahead
+HAS_FADVISE = hasattr(os, "posix_fadvise")
+SEQUENTIAL_HINT_MIN = 1024 * 1024
+
+# Project files with these extensions are returned as raw bytes, not text
+BINARY_EXTENSIONS = frozenset({
+    "png", "jpg", "jpeg", "gif", "bmp", "ico", "webp", "tiff",
+    "pdf", "zip", "gz", "tgz", "bz2", "xz", "tar", "7z", "rar",
+    "exe", "dll", "so", "dylib", "bin", "o", "a", "wasm", "class", "jar", "pyc",
+    "woff", "woff2", "ttf", "otf", "eot",
+    "mp3", "mp4", "wav", "ogg", "webm", "mov", "avi",
+    "sqlite", "db",
+})
+
+# Local-time "YYYY-MM-DDTHH:MM:" prefixes keyed by epoch minute. Files in a
+# tree tend to share minutes (checkouts, bulk edits), so most mtimes only
+# need their seconds appended instead of a datetime built per file.
+_MTIME_PREFIXES: Dict[int, str] = {}
+_MTIME_PREFIX_LIMIT = 4096
+
+# Before ~1973 some zones still had offsets with odd seconds, which breaks
+# the per-minute split, so older timestamps are formatted directly
+_MTIME_PREFIX_MIN = 100_000_000
+
+def _format_mtime(mtime: float) -> str:
+    """Same result as datetime.fromtimestamp(mtime).isoformat(), memoized per minute"""
+    if mtime < _MTIME_PREFIX_MIN:
+        return datetime.fromtimestamp(mtime).isoformat()
+    seconds = int(mtime)
+    micros = round((mtime - seconds) * 1e6)
+    if micros >= 1_000_000:
+        seconds += 1
+        micros -= 1_000_000
+    minute, second = divmod(seconds, 60)
+    prefix = _MTIME_PREFIXES.get(minute)
+    if prefix is None:
+        if len(_MTIME_PREFIXES) >= _MTIME_PREFIX_LIMIT:
+            _MTIME_PREFIXES.clear()
+        prefix = _MTIME_PREFIXES[minute] = datetime.fromtimestamp(minute * 60).isoformat()[:-2]
+    if micros:
+        return f"{prefix}{second:02d}.{micros:06d}"
+    return f"{prefix}{second:02d}"
+
+def _read_file_bytes(path: str) -> Tuple[bytes, os.stat_result]:
+    """
+    Read a whole file with a single sized read, bypassing the text I/O
+    layer. Large files are marked sequential so the kernel reads ahead
+    more aggressively.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        stats = os.fstat(fd)
+        if HAS_FADVISE and stats.st_size > SEQUENTIAL_HINT_MIN:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        data = os.read(fd, stats.st_size)
+        # Short reads only happen for very large or growing files
+        while len(data) < stats.st_size:
+            chunk = os.read(fd, stats.st_size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data, stats
+    finally:
+        os.close(fd)
+
+def _prefetch_file(path: str) -> None:
+    """Ask the kernel to start reading a file into the page cache in the background"""
+    if not HAS_FADVISE:
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+def _project_id(folder_path: str) -> str:
+    """
+    Derive a short, stable project ID from a folder path.
+    
+    The ID is only an in-memory lookup key, so a fast non-cryptographic
+    hash is enough; blake2b is the stdlib fallback when xxhash is missing.
+    """
+    data = folder_path.encode()
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64(data).hexdigest()[:12]
+    return hashlib.blake2b(data, digest_size=6).hexdigest()
+
+def _file_ext(name: str) -> str:
+    """Lowercased extension without the dot, or "" if there is none"""
+    return os.path.splitext(name)[1][1:].lower() if '.' in name else ""
+
+def _iter_tree(root: str, skip_hidden: bool = False) -> Iterator[os.DirEntry]:
+    """
+    Recursively yield a DirEntry for every non-directory under root.
+    
+    Uses os.scandir so file types come from the directory listing itself
+    rather than an extra stat() per entry. Like os.walk, symlinked
+    directories are not followed and unreadable directories are skipped.
+    """
+    pending = [root]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as it:
+                for entry in it:
+                    # Skip hidden entries before they cost anything further
+                    if skip_hidden and entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            pending.append(entry.path)
+                        continue
+                    yield entry
+        except OSError as e:
+            logger.warning(f"Skipping unreadable directory: {e}")
+
+def _iter_rel_paths(root: str) -> Iterator[str]:
+    """Lazily yield the path of every file under root, relative to root"""
+    prefix_len = len(os.path.join(root, ''))
+    for entry in _iter_tree(root):
+        yield entry.path[prefix_len:]
+
+# Thread pool shared by every ParallelScan, created on first use
+_scan_executor: Optional[ThreadPoolExecutor] = None
+_scan_executor_lock = threading.Lock()
+
+def _get_scan_executor() -> ThreadPoolExecutor:
+    global _scan_executor
+    with _scan_executor_lock:
+        if _scan_executor is None:
+            _scan_executor = ThreadPoolExecutor(max_workers=max(1, SCAN_WORKERS), thread_name_prefix="scan")
+        return _scan_executor
+
+class ParallelScan:
+    """
+    Walk a directory tree with a pool of threads, yielding the same entries
+    as _iter_tree in no particular order.
+    
+    Each worker takes a directory off a shared queue, scans it, pushes the
+    subdirectories it finds back onto the queue and hands its files to the
+    consumer as one batch. scandir releases the GIL while it reads the
+    directory, so workers overlap on the syscalls that dominate a walk.
+    """
+    
+    _DONE = object()
+    
+    def __init__(self, root: str, skip_hidden: bool = False, workers: int = SCAN_WORKERS):
+        self.root = root
+        self.skip_hidden = skip_hidden
+        self.workers = max(1, workers)
+        self._pending: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        # Bounded so a slow consumer applies backpressure to the workers
+        self._results: "queue.Queue[Any]" = queue.Queue(maxsize=SCAN_MAX_INFLIGHT)
+        self._outstanding = 1  # directories queued or being scanned
+        self._lock = threading.Lock()
+        self._stopped = False
+    
+    def __iter__(self) -> Iterator[os.DirEntry]:
+        self._pending.put(self.root)
+        executor = _get_scan_executor()
+        try:
+            for _ in range(self.workers):
+                executor.submit(self._worker)
+            while True:
+                batch = self._results.get()
+                if batch is self._DONE:
+                    return
+                if isinstance(batch, BaseException):
+                    raise batch
+                yield from batch
+        finally:
+            self._stop()
+    
+    def _stop(self) -> None:
+        self._stopped = True
+        for _ in range(self.workers):
+            self._pending.put(None)
+        # Unblock workers waiting to hand over results nobody will read
+        try:
+            while True:
+                self._results.get_nowait()
+        except queue.Empty:
+            pass
+    
+    def _put(self, item: Any) -> None:
+        while not self._stopped:
+            try:
+                self._results.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    
+    def _worker(self) -> None:
+        try:
+            while not self._stopped:
+                directory = self._pending.get()
+                if directory is None:
+                    return
+                files, subdirs = self._scan(directory)
+                for subdir in subdirs:
+                    self._pending.put(subdir)
+                if files:
+                    self._put(files)
+                with self._lock:
+                    self._outstanding += len(subdirs) - 1
+                    finished = self._outstanding == 0
+                if finished:
+                    self._put(self._DONE)
+                    return
+        except BaseException as e:
+            self._put(e)
+    
+    def _scan(self, directory: str) -> Tuple[List[os.DirEntry], List[str]]:
+        files: List[os.DirEntry] = []
+        subdirs: List[str] = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if self.skip_hidden and entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                        continue
+                    files.append(entry)
+        except OSError as e:
+            logger.warning(f"Skipping unreadable directory: {e}")
+        return files, subdirs
+
+class ProjectFileList:
+    """
+    Compact file listing for an opened project.
+    
+    Stores one column per field (interned path strings, packed size and
+    mtime arrays) instead of a dict per file, which cuts the per-file
+    overhead substantially on large trees. Dicts are only built when the
+    listing is serialized.
+    """
+    
+    def __init__(self):
+        self.paths: List[str] = []
+        self.exts: List[str] = []
+        self.sizes = array('Q')
+        self.mtimes = array('d')   # NaN when the file couldn't be stat()ed
+        self._index: Optional[Dict[str, int]] = None
+    
+    def __len__(self) -> int:
+        return len(self.paths)
+    
+    def append(self, path: str, ext: str, size: int = 0, mtime: float = math.nan) -> None:
+        """Add a file to the end of the listing"""
+        if self._index is not None:
+            self._index[path] = len(self.paths)
+        self.paths.append(sys.intern(path))
+        self.exts.append(sys.intern(ext))
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+    
+    def sort(self) -> None:
+        """Order the listing by path, so it is the same on every scan"""
+        order = sorted(range(len(self.paths)), key=self.paths.__getitem__)
+        self.paths = [self.paths[i] for i in order]
+        self.exts = [self.exts[i] for i in order]
+        self.sizes = array('Q', (self.sizes[i] for i in order))
+        self.mtimes = array('d', (self.mtimes[i] for i in order))
+        self._index = None
+    
+    def index_of(self, path: str) -> int:
+        """Position of a path in the listing, or -1; builds a lookup index on first use"""
+        if self._index is None:
+            self._index = {p: i for i, p in enumerate(self.paths)}
+        return self._index.get(path, -1)
+    
+    def upsert(self, path: str, ext: str, size: int, mtime: float) -> None:
+        """Update an existing file's entry or append it if new"""
+        i = self.index_of(path)
+        if i < 0:
+            self.append(path, ext, size, mtime)
+        else:
+            self.sizes[i] = size
+            self.mtimes[i] = mtime
+    
+    @staticmethod
+    def _build_entry(path: str, ext: str, size: int, mtime: float) -> Dict[str, Any]:
+        info = {
+            "path": path,
+            "name": path.rsplit('/', 1)[-1],
+            "size": size,
+        }
+        if not math.isnan(mtime):
+            info["modified"] = _format_mtime(mtime)
+        info["ext"] = ext
+        return info
+    
+    def entry(self, i: int) -> Dict[str, Any]:
+        """Build the API representation of the i-th file"""
+        return self._build_entry(self.paths[i], self.exts[i], self.sizes[i], self.mtimes[i])
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        build = self._build_entry
+        return [build(*row) for row in zip(self.paths, self.exts, self.sizes, self.mtimes)]
 
 class FileManager:
     """File Manager class with robust fallback mechanisms for file operations"""
@@ -34,12 +400,27 @@ class FileManager:
         self.backup_dir = BACKUP_DIR
         self.temp_dir = TEMP_DIR
         self.failed_operations = 0
-        self.open_projects = {}
+        # Least recently used projects are evicted beyond MAX_OPEN_PROJECTS.
+        # Requests run on several threads, so the LRU order is only changed
+        # under _projects_lock; callers keep a reference to the project dict
+        # rather than looking it up again.
+        self.open_projects = OrderedDict()
+        self._projects_lock = threading.Lock()
+        
+        # path -> (inode, stat, ext, cached_at); lets repeated opens of
+        # overlapping trees skip stat() for files that haven't been replaced.
+        # Concurrent scans (streamed ones run in the server's threadpool)
+        # share it, so it is only touched under _stat_cache_lock.
+        self._stat_cache = OrderedDict()
+        self._stat_cache_lock = threading.Lock()
+        
+        # (checked_at, accessibility flags) for get_status
+        self._dir_status: Optional[Tuple[float, Dict[str, bool]]] = None
         
         # Create fallback directories
         for directory in [self.files_dir, self.backup_dir, self.temp_dir]:
             try:
-                os.makedirs(directory, exist_ok=True)
+                _ensure_dir(directory)
             except Exception as e:
                 logger.error(f"Error creating directory {directory}: {e}")
     
@@ -58,7 +439,7 @@ class FileManager:
                     raise ValueError("Invalid filename in fallback save")
                 
                 fallback_path = os.path.join(self.temp_dir, filename)
-                os.makedirs(os.path.dirname(os.path.abspath(fallback_path)), exist_ok=True)
+                _ensure_dir(os.path.dirname(os.path.abspath(fallback_path)))
                 
                 with open(fallback_path, 'w', encoding='utf-8') as f:
                     f.write(content)
@@ -70,7 +451,7 @@ class FileManager:
                 
                 # Ultimate fallback: Save to memory and log
                 try:
-                    safe_filename = filename.replace('/', '_').replace('\\', '_')
+                    safe_filename = filename.translate(_SAFE_TRANS)
                     memory_path = f"<memory>/{safe_filename}"
                     logger.warning(f"Emergency fallback: Content for {filename} held in memory")
                     # In a real system, this could be saved to a cache or database
@@ -89,13 +470,7 @@ class FileManager:
             
             # Fallback: manual directory scan
             try:
-                files = []
-                for root, _, filenames in os.walk(self.files_dir):
-                    for filename in filenames:
-                        path = os.path.join(root, filename)
-                        rel_path = os.path.relpath(path, self.files_dir)
-                        files.append(rel_path)
-                return files
+                return list(_iter_rel_paths(self.files_dir))
             except Exception as e2:
                 logger.error(f"Fallback file list mechanism failed: {e2}")
                 return []
@@ -148,11 +523,128 @@ class FileManager:
         return {
             "healthy": self.failed_operations < 5,
             "failed_operations": self.failed_operations,
-            "files_dir_accessible": os.access(self.files_dir, os.R_OK | os.W_OK),
-            "backup_dir_accessible": os.access(self.backup_dir, os.R_OK | os.W_OK),
-            "temp_dir_accessible": os.access(self.temp_dir, os.R_OK | os.W_OK)
+            **self._dir_access()
         }
+    
+    def _dir_access(self) -> Dict[str, bool]:
+        """Directory accessibility flags, re-checked at most every STATUS_CACHE_TTL seconds"""
+        now = time.monotonic()
+        if self._dir_status is None or now - self._dir_status[0] >= STATUS_CACHE_TTL:
+            self._dir_status = (now, {
+                "files_dir_accessible": os.access(self.files_dir, os.R_OK | os.W_OK),
+                "backup_dir_accessible": os.access(self.backup_dir, os.R_OK | os.W_OK),
+                "temp_dir_accessible": os.access(self.temp_dir, os.R_OK | os.W_OK)
+            })
+        return self._dir_status[1]
 
+    def _get_project(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Look up an opened project, marking it as most recently used"""
+        with self._projects_lock:
+            project = self.open_projects.get(project_id)
+            if project is not None:
+                self.open_projects.move_to_end(project_id)
+        return project
+    
+    def _cached_stat(self, entry: os.DirEntry) -> Optional[Tuple[Any, str]]:
+        """
+        Return (stat, ext) for a directory entry if a fresh cached copy exists.
+        
+        The inode comes free with the directory listing, so files replaced
+        via write-and-rename are detected without a stat(); in-place edits
+        are picked up once the entry is older than STAT_CACHE_TTL.
+        """
+        current_inode = entry.inode()
+        with self._stat_cache_lock:
+            cached = self._stat_cache.get(entry.path)
+            if cached is None:
+                return None
+            inode, stats, ext, cached_at = cached
+            if inode != current_inode or time.monotonic() - cached_at > STAT_CACHE_TTL:
+                self._stat_cache.pop(entry.path, None)
+                return None
+            self._stat_cache.move_to_end(entry.path)
+        return stats, ext
+    
+    def _store_stat(self, path: str, stats: Any, ext: str) -> None:
+        """Remember a file's stat result, evicting the least recently used entry when full"""
+        with self._stat_cache_lock:
+            self._stat_cache[path] = (stats.st_ino, stats, ext, time.monotonic())
+            self._stat_cache.move_to_end(path)
+            if len(self._stat_cache) > STAT_CACHE_SIZE:
+                self._stat_cache.popitem(last=False)
+    
+    def _register_project(self, folder_path: str) -> Tuple[str, Dict[str, Any]]:
+        """Validate a folder and record it as an opened project, returning its ID and entry"""
+        # Validate folder exists
+        if not os.path.isdir(folder_path):
+            raise ValueError(f"Folder does not exist: {folder_path}")
+            
+        # Generate a project ID based on path hash
+        project_id = _project_id(folder_path)
+        
+        # Store project info
+        project = {
+            "path": folder_path,
+            # Resolved once so per-file security checks are pure string work
+            "abs_path": os.path.abspath(folder_path),
+            "name": os.path.basename(folder_path),
+            "opened_at": datetime.now().isoformat(),
+            "files": ProjectFileList()
+        }
+        with self._projects_lock:
+            self.open_projects[project_id] = project
+            self.open_projects.move_to_end(project_id)
+            while len(self.open_projects) > MAX_OPEN_PROJECTS:
+                self.open_projects.popitem(last=False)
+        return project_id, project
+    
+    def _scan_iter(self, folder_path: str, file_list: ProjectFileList) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield an entry for every file under folder_path, recording
+        each in file_list. Files are stat()ed in chunks so batching still
+        amortizes syscalls while results stream out as they are found.
+        """
+        prefix_len = len(os.path.join(folder_path, ''))
+        chunk = []
+        
+        # Hidden files and folders (starting with .) are skipped
+        if SCAN_WORKERS > 1:
+            entries = ParallelScan(folder_path, skip_hidden=True, workers=SCAN_WORKERS)
+        else:
+            entries = _iter_tree(folder_path, skip_hidden=True)
+        for entry in entries:
+            chunk.append(entry)
+            if len(chunk) >= SCAN_CHUNK_SIZE:
+                yield from self._scan_chunk(chunk, prefix_len, file_list)
+                chunk = []
+        if chunk:
+            yield from self._scan_chunk(chunk, prefix_len, file_list)
+    
+    def _scan_chunk(self, entries: List[os.DirEntry], prefix_len: int,
+                    file_list: ProjectFileList) -> Iterator[Dict[str, Any]]:
+        # Reuse cached stats and stat the remaining files in one batch
+        known = [self._cached_stat(entry) for entry in entries]
+        misses = [i for i, cached in enumerate(known) if cached is None]
+        fresh = stat_many([entries[i].path for i in misses])
+        for i, stats in zip(misses, fresh):
+            ext = _file_ext(entries[i].name)
+            if not isinstance(stats, Exception):
+                self._store_stat(entries[i].path, stats, ext)
+            known[i] = (stats, ext)
+        
+        for entry, (stats, ext) in zip(entries, known):
+            # Convert backslashes to forward slashes for consistent path handling
+            rel_path = entry.path[prefix_len:].translate(_SLASH_TRANS)
+            
+            # Get file stats
+            if not isinstance(stats, Exception):
+                file_list.append(rel_path, ext, stats.st_size, stats.st_mtime)
+            else:
+                logger.warning(f"Error getting stats for {entry.path}: {stats}")
+                # Add with minimal info if we can't get stats
+                file_list.append(rel_path, ext)
+            yield file_list.entry(len(file_list) - 1)
+    
     def open_folder(self, folder_path: str) -> Dict[str, Any]:
         """
         Open a folder as the root project folder and scan all its contents
@@ -164,59 +656,13 @@ class FileManager:
             Dict with project info and file structure
         """
         try:
-            # Validate folder exists
-            if not os.path.isdir(folder_path):
-                raise ValueError(f"Folder does not exist: {folder_path}")
-                
-            # Generate a project ID based on path hash
-            import hashlib
-            project_id = hashlib.md5(folder_path.encode()).hexdigest()[:12]
-            
-            # Store project info
-            self.open_projects[project_id] = {
-                "path": folder_path,
-                "name": os.path.basename(folder_path),
-                "opened_at": datetime.now().isoformat(),
-                "files": []
-            }
+            project_id, project = self._register_project(folder_path)
             
             # Scan all files in the folder recursively
-            file_list = []
+            file_list = ProjectFileList()
             try:
-                for root, dirs, files in os.walk(folder_path):
-                    # Skip hidden folders (starting with .)
-                    dirs[:] = [d for d in dirs if not d.startswith('.')]
-                    
-                    for file in files:
-                        # Skip hidden files
-                        if file.startswith('.'):
-                            continue
-                            
-                        file_path = os.path.join(root, file)
-                        rel_path = os.path.relpath(file_path, folder_path)
-                        
-                        # Convert backslashes to forward slashes for consistent path handling
-                        rel_path = rel_path.replace('\\', '/')
-                        
-                        # Get file stats
-                        try:
-                            stats = os.stat(file_path)
-                            file_list.append({
-                                "path": rel_path,
-                                "name": file,
-                                "size": stats.st_size,
-                                "modified": datetime.fromtimestamp(stats.st_mtime).isoformat(),
-                                "ext": os.path.splitext(file)[1][1:].lower() if '.' in file else "",
-                            })
-                        except Exception as e:
-                            logger.warning(f"Error getting stats for {file_path}: {e}")
-                            # Add with minimal info if we can't get stats
-                            file_list.append({
-                                "path": rel_path,
-                                "name": file,
-                                "size": 0,
-                                "ext": os.path.splitext(file)[1][1:].lower() if '.' in file else "",
-                            })
+                for _ in self._scan_iter(folder_path, file_list):
+                    pass
             except Exception as e:
                 logger.error(f"Error scanning folder {folder_path}: {e}")
                 return {
@@ -225,23 +671,65 @@ class FileManager:
                     "project_id": project_id
                 }
                 
-            # Update project info with file list
-            self.open_projects[project_id]["files"] = file_list
+            # Update project info with file list, in a stable order
+            file_list.sort()
+            project["files"] = file_list
             
             return {
                 "success": True,
                 "project_id": project_id,
                 "name": os.path.basename(folder_path),
                 "path": folder_path,
-                "files": file_list
+                "files": file_list.to_list()
             }
         except Exception as e:
-            logger.error(f"Error opening folder {folder_path}: {e}\n{traceback.format_exc()}")
+            logger.exception(f"Error opening folder {folder_path}: {e}")
             return {
                 "success": False,
                 "error": f"Error opening folder: {str(e)}"
             }
     
+    def open_folder_stream(self, folder_path: str) -> Iterator[str]:
+        """
+        Streaming variant of open_folder that yields NDJSON lines: a header
+        with the project info, then one line per file as it is discovered.
+        Scan failures are reported as a final {"success": false} line.
+        
+        Args:
+            folder_path: The absolute path to the folder to open
+        """
+        try:
+            project_id, project = self._register_project(folder_path)
+        except Exception as e:
+            logger.error(f"Error opening folder {folder_path}: {e}")
+            yield json.dumps({"success": False, "error": f"Error opening folder: {str(e)}"}) + "\n"
+            return
+        
+        yield json.dumps({
+            "success": True,
+            "project_id": project_id,
+            "name": os.path.basename(folder_path),
+            "path": folder_path
+        }) + "\n"
+        
+        file_list = ProjectFileList()
+        try:
+            for file_info in self._scan_iter(folder_path, file_list):
+                yield json.dumps(file_info) + "\n"
+        except Exception as e:
+            logger.error(f"Error scanning folder {folder_path}: {e}")
+            yield json.dumps({
+                "success": False,
+                "error": f"Error scanning folder: {str(e)}",
+                "project_id": project_id
+            }) + "\n"
+            return
+        
+        # Only a complete scan replaces the project's file list. Lines were
+        # streamed in discovery order; the stored listing is sorted.
+        file_list.sort()
+        project["files"] = file_list
+    
     def get_project_files(self, project_id: str) -> Dict[str, Any]:
         """
         Get the file list for a previously opened project
@@ -252,7 +740,8 @@ class FileManager:
         Returns:
             Dict with project info and file structure
         """
-        if project_id not in self.open_projects:
+        project = self._get_project(project_id)
+        if project is None:
             return {
                 "success": False,
                 "error": f"Project not found: {project_id}"
@@ -261,23 +750,46 @@ class FileManager:
         return {
             "success": True,
             "project_id": project_id,
-            "name": self.open_projects[project_id]["name"],
-            "path": self.open_projects[project_id]["path"],
-            "files": self.open_projects[project_id]["files"]
+            "name": project["name"],
+            "path": project["path"],
+            "files": project["files"].to_list()
         }
         
-    def read_project_file(self, project_id: str, file_path: str) -> Dict[str, Any]:
+    def _resolve_project_path(self, project: Dict[str, Any], file_path: str) -> Optional[str]:
+        """
+        Join a project-relative path onto the project root, returning None if
+        the result would fall outside the project directory
+        """
+        abs_root = project["abs_path"]
+        absolute_path = os.path.normpath(os.path.join(abs_root, file_path.replace('/', os.sep)))
+        if not absolute_path.startswith(os.path.join(abs_root, '')):
+            return None
+        return absolute_path
+    
+    def _prefetch_next(self, project: Dict[str, Any], file_path: str) -> None:
+        """Warm the page cache for the file listed after file_path in the project"""
+        files = project["files"]
+        i = files.index_of(file_path)
+        if 0 <= i < len(files) - 1:
+            next_path = files.paths[i + 1].replace('/', os.sep)
+            _prefetch_file(os.path.join(project["abs_path"], next_path))
+    
+    def read_project_file(self, project_id: str, file_path: str, prefetch: bool = False) -> Dict[str, Any]:
         """
         Read a file from an opened project
         
         Args:
             project_id: The ID of the project
             file_path: The relative path to the file within the project
+            prefetch: Also start reading the next file in the project listing
+                      into the page cache, for sequential browsing
             
         Returns:
-            Dict with file content and metadata
+            Dict with file content and metadata. Files with a binary
+            extension have raw bytes as content and "binary" set to True.
         """
-        if project_id not in self.open_projects:
+        project = self._get_project(project_id)
+        if project is None:
             return {
                 "success": False,
                 "error": f"Project not found: {project_id}"
@@ -285,30 +797,30 @@ class FileManager:
             
         try:
             # Get absolute path
-            project_root = self.open_projects[project_id]["path"]
-            absolute_path = os.path.join(project_root, file_path.replace('/', os.sep))
+            absolute_path = self._resolve_project_path(project, file_path)
             
             # Validate file exists and is within project
-            if not os.path.isfile(absolute_path) or not os.path.abspath(absolute_path).startswith(os.path.abspath(project_root)):
+            if absolute_path is None or not os.path.isfile(absolute_path):
                 return {
                     "success": False,
                     "error": f"File not found or access denied: {file_path}"
                 }
             
-            # Read file content
-            with open(absolute_path, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
-                
-            # Get file stats
-            stats = os.stat(absolute_path)
+            # Read file content and stats from the same descriptor
+            data, stats = _read_file_bytes(absolute_path)
+            binary = _file_ext(file_path) in BINARY_EXTENSIONS
+            
+            if prefetch:
+                self._prefetch_next(project, file_path)
                 
             return {
                 "success": True,
-                "content": content,
+                "content": data if binary else data.decode('utf-8', errors='replace'),
+                "binary": binary,
                 "path": file_path,
                 "name": os.path.basename(file_path),
                 "size": stats.st_size,
-                "modified": datetime.fromtimestamp(stats.st_mtime).isoformat(),
+                "modified": _format_mtime(stats.st_mtime),
                 "project_id": project_id
             }
         except Exception as e:
@@ -318,6 +830,87 @@ class FileManager:
                 "error": f"Error reading file: {str(e)}"
             }
             
+    def read_project_files_batch(self, project_id: str, file_paths: List[str]) -> Dict[str, Any]:
+        """
+        Read several files from an opened project in one batch
+        
+        Args:
+            project_id: The ID of the project
+            file_paths: The relative paths of the files within the project
+            
+        Returns:
+            Dict with per-file content and metadata, in request order. As in
+            read_project_file, files with a binary extension have raw bytes
+            as content and "binary" set to True. At most MAX_BATCH_FILES
+            paths are accepted, and files past MAX_BATCH_BYTES in total come
+            back as errors.
+        """
+        project = self._get_project(project_id)
+        if project is None:
+            return {
+                "success": False,
+                "error": f"Project not found: {project_id}"
+            }
+        if len(file_paths) > MAX_BATCH_FILES:
+            return {
+                "success": False,
+                "error": f"Too many files in one batch: {len(file_paths)} (limit {MAX_BATCH_FILES})"
+            }
+            
+        results = [None] * len(file_paths)
+        
+        # Validate every path up front, then read the allowed ones together
+        allowed = []
+        for index, file_path in enumerate(file_paths):
+            absolute_path = self._resolve_project_path(project, file_path)
+            if absolute_path is None:
+                results[index] = {
+                    "success": False,
+                    "path": file_path,
+                    "error": f"File not found or access denied: {file_path}"
+                }
+            else:
+                allowed.append((index, file_path, absolute_path))
+        
+        # Content and stats come from the same descriptor, so each file is
+        # opened and stat()ed once
+        reads = read_many_with_stats([absolute_path for _, _, absolute_path in allowed],
+                                     max_total_bytes=MAX_BATCH_BYTES)
+        
+        for (index, file_path, _), result in zip(allowed, reads):
+            if isinstance(result, (FileNotFoundError, IsADirectoryError)):
+                results[index] = {
+                    "success": False,
+                    "path": file_path,
+                    "error": f"File not found or access denied: {file_path}"
+                }
+                continue
+            if isinstance(result, Exception):
+                logger.error(f"Error reading project file {file_path}: {result}")
+                results[index] = {
+                    "success": False,
+                    "path": file_path,
+                    "error": f"Error reading file: {str(result)}"
+                }
+                continue
+            data, stats = result
+            binary = _file_ext(file_path) in BINARY_EXTENSIONS
+            results[index] = {
+                "success": True,
+                "content": data if binary else data.decode('utf-8', errors='replace'),
+                "binary": binary,
+                "path": file_path,
+                "name": os.path.basename(file_path),
+                "size": stats.st_size,
+                "modified": _format_mtime(stats.st_mtime)
+            }
+        
+        return {
+            "success": True,
+            "project_id": project_id,
+            "files": results
+        }
+            
     def write_project_file(self, project_id: str, file_path: str, content: str) -> Dict[str, Any]:
         """
         Write content to a file in an opened project
@@ -330,7 +923,8 @@ class FileManager:
         Returns:
             Dict with success status and file info
         """
-        if project_id not in self.open_projects:
+        project = self._get_project(project_id)
+        if project is None:
             return {
                 "success": False,
                 "error": f"Project not found: {project_id}"
@@ -338,45 +932,34 @@ class FileManager:
             
         try:
             # Get absolute path
-            project_root = self.open_projects[project_id]["path"]
-            absolute_path = os.path.join(project_root, file_path.replace('/', os.sep))
-            
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(absolute_path), exist_ok=True)
+            absolute_path = self._resolve_project_path(project, file_path)
             
             # Validate path is within project
-            if not os.path.abspath(absolute_path).startswith(os.path.abspath(project_root)):
+            if absolute_path is None:
                 return {
                     "success": False,
                     "error": f"Access denied: Cannot write outside project directory"
                 }
             
-            # Write file content
-            with open(absolute_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Write file content, creating its directory if needed
+            _write_file(absolute_path, content.encode('utf-8'))
                 
             # Get file stats
             stats = os.stat(absolute_path)
+            ext = _file_ext(file_path)
+            self._store_stat(absolute_path, stats, ext)
             
             # Update file list if this is a new file
             file_info = {
                 "path": file_path,
                 "name": os.path.basename(file_path),
                 "size": stats.st_size,
-                "modified": datetime.fromtimestamp(stats.st_mtime).isoformat(),
-                "ext": os.path.splitext(file_path)[1][1:].lower() if '.' in file_path else "",
+                "modified": _format_mtime(stats.st_mtime),
+                "ext": ext,
             }
             
-            # Check if file exists in the list and update it, or add if new
-            file_exists = False
-            for i, f in enumerate(self.open_projects[project_id]["files"]):
-                if f["path"] == file_path:
-                    self.open_projects[project_id]["files"][i] = file_info
-                    file_exists = True
-                    break
-                    
-            if not file_exists:
-                self.open_projects[project_id]["files"].append(file_info)
+            # Update the file in the project listing, or add it if new
+            project["files"].upsert(file_path, ext, stats.st_size, stats.st_mtime)
                 
             return {
                 "success": True,
@@ -410,16 +993,12 @@ def save_file(filename: str, content: str) -> str:
     
     path = os.path.join(FILES_DIR, filename)
     
-    # Create parent directories if they don't exist
-    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
-    
     # Create a backup if file exists
     if os.path.exists(path):
         _create_backup(filename)
     
-    # Write the new content
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    # Write the new content, creating parent directories if they don't exist
+    _write_file(os.path.abspath(path), content.encode('utf-8'))
     
     return path
 
@@ -431,13 +1010,8 @@ def load_files() -> List[str]:
         List[str]: List of filenames
     """
     try:
-        result = []
-        for root, _, files in os.walk(FILES_DIR):
-            for file in files:
-                # Get path relative to FILES_DIR
-                rel_path = os.path.relpath(os.path.join(root, file), FILES_DIR)
-                result.append(rel_path)
-        return result
+        # Paths are relative to FILES_DIR
+        return list(_iter_rel_paths(FILES_DIR))
     except Exception as e:
         print(f"Error listing files: {e}")
         # Fallback to empty list
@@ -491,12 +1065,154 @@ def _create_backup(filename: str) -> str:
     backup_path = os.path.join(BACKUP_DIR, backup_filename)
     
     # Create parent directories in backup location if needed
-    os.makedirs(os.path.dirname(os.path.abspath(backup_path)), exist_ok=True)
+    backup_parent = os.path.dirname(os.path.abspath(backup_path))
+    _ensure_dir(backup_parent)
     
     # Copy the file
-    shutil.copy2(source_path, backup_path)
+    try:
+        _copy_file(source_path, backup_path)
+    except FileNotFoundError:
+        # The directory may have been removed since it was ensured
+        _ENSURED_DIRS.discard(backup_parent)
+        raise
     return backup_path
 
+def _copy_file(source_path: str, dest_path: str) -> None:
+    """
+    Copy a file's contents and metadata, doing the data copy in-kernel with
+    sendfile where available instead of through userspace buffers
+    """
+    if not hasattr(os, "sendfile"):
+        shutil.copy2(source_path, dest_path)
+        return
+    
+    src = os.open(source_path, os.O_RDONLY)
+    try:
+        dst = os.open(dest_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            remaining = os.fstat(src).st_size
+            offset = 0
+            while remaining > 0:
+                sent = os.sendfile(dst, src, offset, remaining)
+                if sent == 0:
+                    break
+                offset += sent
+                remaining -= sent
+        finally:
+            os.close(dst)
+    finally:
+        os.close(src)
+    shutil.copystat(source_path, dest_path)
+
+def _atomic_write(path: str, data: bytes) -> None:
+    """
+    Write data to path so that readers, and the file left behind after a
+    crash, see either the old or the new content but never a partial write.
+    Existing files keep their permission bits.
+    
+    Args:
+        path: Destination file path; its directory must exist
+        data: The complete new file content
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+        exists = True
+    except FileNotFoundError:
+        # New files get the usual 0o666 minus umask, like open()
+        mode, exists = 0o666, False
+    
+    if HAS_O_TMPFILE and _write_tmpfile(path, data, mode, exists):
+        return
+    
+    temp_path = f"{path}.{secrets.token_hex(4)}.tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+    try:
+        _write_fd(fd, data, mode if exists else None)
+    except BaseException:
+        os.close(fd)
+        os.unlink(temp_path)
+        raise
+    os.close(fd)
+    _replace(temp_path, path)
+    _fsync_dir(os.path.dirname(path))
+
+def _write_file(path: str, data: bytes) -> None:
+    """_atomic_write that creates the parent directory of path if needed"""
+    parent = os.path.dirname(path)
+    _ensure_dir(parent)
+    try:
+        _atomic_write(path, data)
+    except FileNotFoundError:
+        # The directory was removed since it was ensured; recreate it once
+        _ENSURED_DIRS.discard(parent)
+        _ensure_dir(parent)
+        _atomic_write(path, data)
+
+def _write_tmpfile(path: str, data: bytes, mode: int, exists: bool) -> bool:
+    """Atomic write via O_TMPFILE; returns False if the filesystem lacks support"""
+    directory, name = os.path.split(path)
+    dir_fd = os.open(directory or ".", os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        try:
+            fd = os.open(".", os.O_WRONLY | os.O_TMPFILE, mode, dir_fd=dir_fd)
+        except OSError:
+            return False
+        try:
+            _write_fd(fd, data, mode if exists else None)
+            # Passing dir_fd makes os.link use linkat(AT_SYMLINK_FOLLOW),
+            # which is what resolves the /proc/self/fd magic link
+            proc_path = f"/proc/self/fd/{fd}"
+            if not exists:
+                try:
+                    os.link(proc_path, name, dst_dir_fd=dir_fd, follow_symlinks=True)
+                    os.fsync(dir_fd)
+                    return True
+                except FileExistsError:
+                    pass  # created concurrently, replace it below
+            # linkat can't overwrite, so link beside the target and rename
+            temp_name = f"{name}.{secrets.token_hex(4)}.tmp"
+            os.link(proc_path, temp_name, dst_dir_fd=dir_fd, follow_symlinks=True)
+        finally:
+            os.close(fd)
+        try:
+            os.replace(temp_name, name, src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
+        except BaseException:
+            os.unlink(temp_name, dir_fd=dir_fd)
+            raise
+        os.fsync(dir_fd)
+        return True
+    finally:
+        os.close(dir_fd)
+
+def _write_fd(fd: int, data: bytes, mode: Optional[int]) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+    # Restore the replaced file's permissions exactly, bypassing the umask
+    if mode is not None and hasattr(os, "fchmod"):
+        os.fchmod(fd, mode)
+    # The data must be on disk before the file is published under its
+    # name, or a crash could leave an empty or truncated file there
+    os.fsync(fd)
+
+def _fsync_dir(directory: str) -> None:
+    """Persist a directory's entries, e.g. after a rename into it"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return  # Windows can't open directories for fsync
+    dir_fd = os.open(directory or ".", os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+def _replace(temp_path: str, path: str) -> None:
+    try:
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
 def delete_file(filename: str) -> bool:
     """
     Delete a file with backup
@@ -2,13 +2,26 @@
 FastAPI health check endpoints for the Coder AI Platform.
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
-from typing import Dict, Any, Optional
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, Any, Optional, Tuple
+import asyncio
 import time
 import logging
 import os
+import platform
 
-from health_service import health_service, HealthStatus, HealthCheckResult
+from health_service import get_health_service, HealthStatus, HealthCheckResult
+
+# Conditional import for faster JSON encoding of health reports
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as HealthJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    HealthJSONResponse = JSONResponse
+    ORJSON_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,11 +31,109 @@ router = APIRouter(
     prefix="/api/health",
     tags=["health"],
     responses={404: {"description": "Not found"}},
+    default_response_class=HealthJSONResponse,
 )
 
-# Cache for health check results
-health_cache = {}
+# Constant probe bodies are encoded once instead of serialized per request
+_ALIVE = Response(content=b'{"status":"alive"}', media_type="application/json")
+_STARTED = Response(content=b'{"status":"started"}', media_type="application/json")
+_OK = Response(content=b'{"status":"ok"}', media_type="application/json")
+
+# Static values reported by every health response, resolved once
+APP_VERSION = os.getenv("APP_VERSION", "dev")
+PYTHON_VERSION = platform.python_version()
+
+# The formatted UTC time only changes once per second, so reuse it
+_time_cache: Tuple[int, str] = (-1, "")
+
+def _utc_time(now: float) -> str:
+    """Format now as an ISO-8601 UTC timestamp with second precision"""
+    global _time_cache
+    second = int(now)
+    cached_second, formatted = _time_cache
+    if second != cached_second:
+        t = time.gmtime(second)
+        formatted = f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}Z"
+        _time_cache = (second, formatted)
+    return formatted
+
+# Bounded TTL/LRU cache for health check results
 CACHE_TTL = 30  # seconds
+CACHE_MAX_ENTRIES = 64
+_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+# One lock per cache key so concurrent requests for an expired entry wait
+# for a single check instead of each running their own
+_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+# Components that must be healthy for the service to accept traffic
+CRITICAL_COMPONENTS = ("database", "filesystem")
+
+# Component name -> health_service check method
+COMPONENT_CHECKS = {
+    "ollama": "check_ollama_health",
+    "database": "check_database_health",
+    "filesystem": "check_filesystem_health",
+    "network": "check_network_health",
+    "system": "check_system_resources",
+}
+
+def _cache_get(key: str) -> Optional[Dict[str, Any]]:
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() - entry[0] >= CACHE_TTL:
+        del _cache[key]
+        return None
+    _cache.move_to_end(key)
+    return entry[1]
+
+def _cache_put(key: str, data: Dict[str, Any]) -> None:
+    _cache[key] = (time.monotonic(), data)
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+async def _get_or_compute(key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Return the cached result for key, or run compute once and cache it.
+    
+    Args:
+        key: Cache key
+        compute: Blocking function producing the result; runs in the threadpool
+        
+    Returns:
+        The cached or freshly computed result.
+    """
+    result = _cache_get(key)
+    if result is not None:
+        return result
+    async with _locks[key]:
+        # Another request may have filled the cache while we waited
+        result = _cache_get(key)
+        if result is None:
+            result = await run_in_threadpool(compute)
+            _cache_put(key, result)
+    return result
+
+def _system_health() -> Dict[str, Any]:
+    # check_system_health may hand back its own cached dict, so copy
+    # before adding the API-level fields
+    health_data = dict(get_health_service().check_system_health())
+    # The service shares a read-only view of its metrics; serialize a copy
+    health_data["metrics"] = dict(health_data["metrics"])
+    
+    # Add version information
+    health_data["version"] = {
+        "api": APP_VERSION,
+        "python": PYTHON_VERSION
+    }
+    
+    # Add timestamps
+    now = time.time()
+    health_data["timestamp"] = now
+    health_data["time"] = _utc_time(now)
+    return health_data
 
 @router.get("", response_model=Dict[str, Any])
 async def get_health() -> Dict[str, Any]:
@@ -33,51 +144,30 @@ async def get_health() -> Dict[str, Any]:
         Dict containing health status of all components and overall system status.
     """
     try:
-        # Check cache first
-        cache_key = "health_summary"
-        cached_result = health_service._get_cached_result(cache_key)
-        if cached_result:
-            return cached_result
-        
-        # Get fresh health status
-        health_data = health_service.check_system_health()
-        
-        # Add version information
-        health_data["version"] = {
-            "api": os.getenv("APP_VERSION", "dev"),
-            "python": "3.12.0"  # TODO: Get actual Python version
-        }
-        
-        # Add timestamps
-        health_data["timestamp"] = time.time()
-        health_data["time"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-        
-        # Cache the result
-        health_service._cache_result(cache_key, health_data)
-        
-        return health_data
+        return await _get_or_compute("health_summary", _system_health)
         
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}", exc_info=True)
+        now = time.time()
         return {
             "status": HealthStatus.UNHEALTHY.value,
             "error": str(e),
-            "timestamp": time.time(),
-            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            "timestamp": now,
+            "time": _utc_time(now)
         }
 
 @router.get("/liveness")
-async def liveness_probe() -> Dict[str, str]:
+async def liveness_probe() -> Response:
     """
     Kubernetes liveness probe endpoint.
     
     Returns:
         Simple status indicating if the service is alive.
     """
-    return {"status": "alive"}
+    return _ALIVE
 
 @router.get("/readiness")
-async def readiness_probe() -> Dict[str, str]:
+async def readiness_probe() -> JSONResponse:
     """
     Kubernetes readiness probe endpoint.
     
@@ -85,28 +175,26 @@ async def readiness_probe() -> Dict[str, str]:
         Status indicating if the service is ready to handle requests.
     """
     try:
-        # Check if we can access required services
-        health_data = health_service.check_system_health()
+        # Only probe the components readiness depends on
+        components = await run_in_threadpool(get_health_service().quick_readiness)
         
-        # Consider the service ready if at least one critical component is healthy
-        critical_components = ["database", "filesystem"]
+        healthy = HealthStatus.HEALTHY.value
         ready = all(
-            health_data["components"][component]["status"] == HealthStatus.HEALTHY.value
-            for component in critical_components
-            if component in health_data["components"]
+            (components.get(component) or {}).get("status") == healthy
+            for component in CRITICAL_COMPONENTS
         )
         
         if ready:
-            return {"status": "ready"}
+            return JSONResponse({"status": "ready"})
         else:
-            return {"status": "not ready"}, 503
+            return JSONResponse({"status": "not ready"}, status_code=503)
             
     except Exception as e:
         logger.error(f"Readiness check failed: {str(e)}")
-        return {"status": f"error: {str(e)}"}, 503
+        return JSONResponse({"status": f"error: {str(e)}"}, status_code=503)
 
 @router.get("/startup")
-async def startup_probe() -> Dict[str, str]:
+async def startup_probe() -> Response:
     """
     Kubernetes startup probe endpoint.
     
@@ -115,7 +203,7 @@ async def startup_probe() -> Dict[str, str]:
     """
     # For now, just return success if we can reach this endpoint
     # You can add more sophisticated startup checks here
-    return {"status": "started"}
+    return _STARTED
 
 @router.get("/components/{component}")
 async def get_component_health(component: str) -> Dict[str, Any]:
@@ -128,35 +216,17 @@ async def get_component_health(component: str) -> Dict[str, Any]:
     Returns:
         Health status of the specified component.
     """
+    # Validate before creating a cache lock so unknown names can't grow _locks
+    check_name = COMPONENT_CHECKS.get(component)
+    if check_name is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown component: {component}"
+        )
+    
     try:
-        # Check cache first
-        cache_key = f"component_{component}"
-        cached_result = health_service._get_cached_result(cache_key)
-        if cached_result:
-            return cached_result
-        
-        # Get fresh health status for the component
-        if component == "ollama":
-            result = health_service.check_ollama_health()
-        elif component == "database":
-            result = health_service.check_database_health()
-        elif component == "filesystem":
-            result = health_service.check_filesystem_health()
-        elif component == "network":
-            result = health_service.check_network_health()
-        elif component == "system":
-            result = health_service.check_system_resources()
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Unknown component: {component}"
-            )
-        
-        # Convert to dict and cache
-        result_dict = result.to_dict()
-        health_service._cache_result(cache_key, result_dict)
-        
-        return result_dict
+        check = getattr(get_health_service(), check_name)
+        return await _get_or_compute(f"component_{component}", lambda: check().to_dict())
         
     except HTTPException:
         raise
@@ -176,7 +246,7 @@ def add_health_routes(app):
     @app.get("/health")
     async def root_health():
         """Simple health check endpoint for load balancers and monitoring."""
-        return {"status": "ok"}
+        return _OK
     
     # Add a head method for health checks
     @app.head("/health")
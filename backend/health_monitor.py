@@ -1,15 +1,124 @@
 import os
 import time
+import asyncio
+import atexit
+import functools
+import json
 import logging
-import requests
+import urllib3
 import docker
+import shutil
+import socket
+import errno
 import sqlite3
-from typing import Dict, Any
+import threading
+import tempfile
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlparse
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, Callable, Optional
+
+# Async HTTP client for probing Ollama from the event loop, if available
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+# Connection-level SQLite settings: wait on locks instead of failing with
+# SQLITE_BUSY, and keep temp tables and the page cache in memory
+SQLITE_PRAGMAS = """
+    PRAGMA busy_timeout=5000;
+    PRAGMA temp_store=memory;
+    PRAGMA cache_size=-20000;
+"""
+
+# Persistent/writer settings, applied on the read-write schema connection:
+# WAL lets readers run alongside a writer and NORMAL skips per-commit fsyncs
+SQLITE_WRITE_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+"""
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Constant probe results, returned by reference instead of rebuilt per call;
+# callers treat check results as read-only
+_DOCKER_DISABLED_RESULT = {
+    "status": "healthy",
+    "message": "Docker integration is disabled",
+    "disabled": True
+}
+_CODE_EXECUTION_UNAVAILABLE_RESULT = {
+    "status": "degraded",
+    "message": "Code execution module not available",
+    "fallback": "Using built-in Python exec as fallback"
+}
+_CODE_EXECUTION_PENDING_RESULT = {
+    "status": "unknown",
+    "message": "Code execution has not been checked yet"
+}
+
+def _on_tmpfs(path: str) -> bool:
+    """Whether path lives on a tmpfs mount (detected on Linux only)"""
+    try:
+        target = os.path.realpath(path)
+        best, fstype = "", ""
+        with open("/proc/self/mountinfo") as f:
+            for line in f:
+                fields, _, fs_fields = line.partition(" - ")
+                mount_point = fields.split()[4].replace("\\040", " ")
+                inside = target == mount_point or target.startswith(mount_point.rstrip("/") + "/")
+                if inside and len(mount_point) >= len(best):
+                    best, fstype = mount_point, fs_fields.split()[0]
+        return fstype == "tmpfs"
+    except (OSError, IndexError):
+        return False
+
+@functools.lru_cache(maxsize=1)
+def _get_code_executor():
+    """Import the code executor once; None if the module isn't available"""
+    try:
+        import code_execution
+        return code_execution.code_executor
+    except ImportError:
+        logger.warning("Code execution module not available")
+        return None
+
+# Connect errors that prove nothing is listening, as opposed to timeouts
+_REFUSAL_ERRNOS = frozenset({errno.ECONNREFUSED, errno.EHOSTUNREACH, errno.ENETUNREACH})
+
+def _is_refusal(error: OSError) -> bool:
+    """Whether a connect error is a definite refusal rather than a slow network"""
+    return isinstance(error, ConnectionRefusedError) or error.errno in _REFUSAL_ERRNOS
+
+def _timed(key: str):
+    """
+    Record how long a component check takes under the given metrics key.
+    
+    The latency goes to the metrics store (see get_metrics) and the result
+    is returned untouched, since checks may return shared constant dicts.
+    """
+    def deco(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrap(self, *args, **kwargs):
+                t0 = time.perf_counter_ns()
+                result = await fn(self, *args, **kwargs)
+                return self._record(key, result, (time.perf_counter_ns() - t0) // 1000)
+            return async_wrap
+        
+        @functools.wraps(fn)
+        def wrap(self, *args, **kwargs):
+            t0 = time.perf_counter_ns()
+            result = fn(self, *args, **kwargs)
+            return self._record(key, result, (time.perf_counter_ns() - t0) // 1000)
+        return wrap
+    return deco
+
 class HealthMonitor:
     """Health monitoring service with comprehensive fallback mechanisms"""
     
@@ -19,146 +128,459 @@ class HealthMonitor:
         self.ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
         self.ollama_model = os.getenv("OLLAMA_MODEL", "codellama:instruct")
         self.ollama_timeout = int(os.getenv("OLLAMA_TIMEOUT", "5"))
+        # Connect timeout for the TCP pre-probe; only a refused connection
+        # skips the HTTP check
+        self.tcp_probe_timeout = float(os.getenv("OLLAMA_TCP_PROBE_TIMEOUT", "1.0"))
+        # A refused or unanswered TCP connect marks Ollama offline without
+        # waiting out the full HTTP timeout
+        parsed = urlparse(self.ollama_url)
+        self._ollama_addr = (
+            parsed.hostname or "localhost",
+            parsed.port or (443 if parsed.scheme == "https" else 80)
+        )
+        
+        # Keep-alive pool so repeated probes reuse the Ollama connection; plain
+        # urllib3 skips the per-request overhead of a requests.Session
+        self._http = urllib3.PoolManager(
+            num_pools=1,
+            maxsize=4,
+            timeout=urllib3.Timeout(connect=self.ollama_timeout, read=self.ollama_timeout),
+            retries=False
+        )
+        atexit.register(self._http.clear)
+        # aiohttp sessions for check_health_async, one per event loop,
+        # created on first use inside the loop they belong to
+        self._aio_sessions = {}
         
         # Docker settings
         self.docker_timeout = int(os.getenv("DOCKER_TIMEOUT", "5"))
+        self._docker_enabled = os.getenv("ENABLE_DOCKER", "False").strip().lower() == "true"
+        # Local daemon socket; when it doesn't exist the daemon can't be up.
+        # None for TCP or named-pipe hosts, which skip the check
+        docker_host = os.getenv("DOCKER_HOST", "")
+        if docker_host.startswith("unix://"):
+            self._docker_sock_path = docker_host[len("unix://"):]
+        elif not docker_host and os.name == "posix":
+            self._docker_sock_path = "/var/run/docker.sock"
+        else:
+            self._docker_sock_path = None
+        # The client is kept between probes, and the daemon version (which
+        # rarely changes) is refreshed every docker_version_ttl seconds
+        self.docker_version_ttl = 300
+        self._docker_client = None
+        self._docker_version_cache = None  # (expires_at, version info)
         
         # Database settings
         self.db_type = os.getenv("DB_TYPE", "sqlite")
+        self._db_is_sqlite = self.db_type == "sqlite"
         self.db_path = os.getenv("DB_PATH", "data/coder.db")
         self.json_db_path = os.getenv("JSON_DB_PATH", "data/db.json")
+        # Health probes open the database read-only, so they never take the
+        # write lock; the schema is created once by ensure_schema instead
+        self._db_ro_uri = f"{Path(self.db_path).absolute().as_uri()}?mode=ro"
+        self._schema_ready = False
+        # When the database is memory-backed anyway, routine probes only need
+        # to exercise the SQLite engine, which an in-memory connection does
+        self._sqlite_fast_probe = (
+            os.getenv("HEALTH_SQLITE_FAST", "False").lower() in ("true", "1")
+            or (self._db_is_sqlite and _on_tmpfs(os.path.dirname(self.db_path) or "."))
+        )
+        
+        # Directories known to exist, so probes don't stat them every time
+        self._dirs_ok = set()
+        
+        # One probe file per process, overwritten by each filesystem check
+        self._fs_probe_path = os.path.join(tempfile.gettempdir(), f"health_check_{os.getpid()}.txt")
+        atexit.register(self._remove_fs_probe)
         
         # Cache settings
         self.cache_ttl = int(os.getenv("HEALTH_CACHE_TTL", "30"))
+        # key -> (expires_at, data), using the monotonic clock; entries are
+        # replaced whole, so reads need no lock
         self.cache = {}
+        
+        # Each component is cached for its own TTL (seconds), so a cheap or
+        # fast-changing check never forces the expensive ones to rerun.
+        # Defaults scale with HEALTH_CACHE_TTL; HEALTH_<COMPONENT>_TTL
+        # (e.g. HEALTH_DOCKER_TTL) overrides a single component.
+        base_ttl = self.cache_ttl
+        default_ttls = {
+            "ollama": base_ttl,
+            "docker": base_ttl * 2,
+            "database": base_ttl / 3,
+            "code_execution": base_ttl * 2,
+            "filesystem": base_ttl,
+            "ollama_models": base_ttl * 10,
+        }
+        self.ttls = {
+            key: float(os.getenv(f"HEALTH_{key.upper()}_TTL", str(default)))
+            for key, default in default_ttls.items()
+        }
+        
+        # Component checks are independent and I/O-bound, so run them side
+        # by side; a health check then takes as long as its slowest probe
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="health")
+        atexit.register(self._executor.shutdown)
+        
+        # Concurrent health requests share the check already in flight
+        # instead of each probing the (possibly struggling) services
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._inflight_task: Optional[asyncio.Task] = None
+        
+        # Per-probe metrics: EWMA of latency (microseconds) and a count of
+        # status outcomes, so the slowest or flakiest probe is easy to spot
+        self._ewma: Dict[str, float] = {}
+        self._last_latency: Dict[str, int] = {}
+        self._status_counts = Counter()
+        self._metrics_lock = threading.Lock()
+        
+        # The code execution probe runs real code, so it is refreshed in the
+        # background every ttls["code_execution"] seconds and requests only
+        # read the latest snapshot
+        self._bg_results: Dict[str, Any] = {}
+        self._bg_stop = threading.Event()
+        threading.Thread(target=self._bg_loop, name="health-refresh", daemon=True).start()
+        atexit.register(self._bg_stop.set)
     
     def check_health(self) -> Dict[str, Any]:
         """
         Check health of all system components with fallbacks
         
+        Callers arriving while a check is running wait for and share its
+        result. Component results may be up to their cache TTL old.
+        
         Returns:
             Dict with status of each component and overall system health
         """
-        # Check if we can return cached result
-        if self._check_cache("health"):
-            return self.cache["health"]["data"]
+        with self._inflight_lock:
+            future = self._inflight.get("health")
+            leader = future is None
+            if leader:
+                future = self._inflight["health"] = Future()
+        if not leader:
+            return self._copy_result(future.result())
         
+        try:
+            result = self._run_health_checks()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop("health", None)
+    
+    def _run_health_checks(self) -> Dict[str, Any]:
         # Start health check
         start_time = time.time()
         
-        health_data = {
-            "status": "healthy",
-            "timestamp": time.time(),
-            "checks": {}
+        # Reuse component results still within their TTL and run the
+        # remaining checks concurrently
+        components = {
+            "ollama": self._check_ollama,
+            "docker": self._check_docker,
+            "database": self._check_database,
         }
+        results = {}
+        pending = {}
+        for key, check in components.items():
+            cached = self._get_cached(key)
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending[key] = self._executor.submit(self._cached, key, check)
+        if pending:
+            wait(pending.values(), timeout=max(self.ollama_timeout, self.docker_timeout) + 1)
+            for key, future in pending.items():
+                results[key] = self._check_result(key, future)
         
-        # Check individual components
-        ollama_status = self._check_ollama()
-        docker_status = self._check_docker()
-        database_status = self._check_database()
-        
-        # Add component status to response
-        health_data["checks"]["ollama"] = ollama_status
-        health_data["checks"]["docker"] = docker_status
-        health_data["checks"]["database"] = database_status
-        
-        # Format for frontend
-        health_data["ollama_status"] = ollama_status["status"]
-        health_data["docker_status"] = docker_status["status"]
-        health_data["database_status"] = database_status["status"]
-        
-        # Determine overall status (healthy only if all components are healthy)
-        all_healthy = all(
-            check["status"] == "healthy" 
-            for check in health_data["checks"].values()
-        )
+        return self._summarize(results, start_time)
+    
+    async def check_health_async(self) -> Dict[str, Any]:
+        """
+        Check health of all system components from the event loop
+        
+        Probes run concurrently as coroutines: Ollama natively through
+        aiohttp when it is installed, Docker and SQLite (which have no
+        async client here) in the default executor.
         
-        if not all_healthy:
-            health_data["status"] = "degraded"
+        Concurrent callers on the same event loop share one in-flight check.
         
-        # Add timing information
-        health_data["response_time"] = time.time() - start_time
+        Returns:
+            Dict with status of each component and overall system health
+        """
+        loop = asyncio.get_running_loop()
+        task = self._inflight_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = self._inflight_task = loop.create_task(self._run_health_checks_async())
+            # Shielded below, so the first caller disconnecting can't cancel
+            # the check the other callers are waiting on
+            return await asyncio.shield(task)
+        return self._copy_result(await asyncio.shield(task))
+    
+    async def _run_health_checks_async(self) -> Dict[str, Any]:
+        start_time = time.time()
+        
+        probes = {
+            "ollama": self._check_ollama_async if HAS_AIOHTTP else lambda: asyncio.to_thread(self._check_ollama),
+            "docker": lambda: asyncio.to_thread(self._check_docker),
+            "database": lambda: asyncio.to_thread(self._check_database),
+        }
+        results = {}
+        pending = {}
+        for key, probe in probes.items():
+            cached = self._get_cached(key)
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending[key] = probe()
+        if pending:
+            outcomes = await asyncio.gather(*pending.values(), return_exceptions=True)
+            for key, outcome in zip(pending, outcomes):
+                if isinstance(outcome, Exception):
+                    results[key] = self._error_result(key, outcome)
+                else:
+                    self._cache_result(key, outcome)
+                    results[key] = outcome
+        
+        return self._summarize(results, start_time)
+    
+    @staticmethod
+    def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a shared health result that callers may extend safely"""
+        return {**result, "checks": dict(result["checks"])}
+    
+    def _summarize(self, results: Dict[str, Dict[str, Any]], start_time: float) -> Dict[str, Any]:
+        """Combine component results into the health response"""
+        ollama_status = results["ollama"]
+        docker_status = results["docker"]
+        database_status = results["database"]
+        checks = {
+            "ollama": ollama_status,
+            "docker": docker_status,
+            "database": database_status
+        }
         
-        # Cache the result
-        self._cache_result("health", health_data)
+        # Overall status is healthy only if all components are healthy
+        all_healthy = all(check["status"] == "healthy" for check in checks.values())
         
-        return health_data
+        return {
+            "status": "healthy" if all_healthy else "degraded",
+            "timestamp": time.time(),
+            "checks": checks,
+            # Format for frontend
+            "ollama_status": ollama_status["status"],
+            "docker_status": docker_status["status"],
+            "database_status": database_status["status"],
+            # Add timing information
+            "response_time": time.time() - start_time
+        }
+    
+    def _check_result(self, name: str, future) -> Dict[str, Any]:
+        """Result of a submitted check, or an error status if it didn't finish in time"""
+        if not future.done():
+            logger.warning(f"{name} health check timed out")
+            return {
+                "status": "error",
+                "message": f"{name} health check timed out"
+            }
+        try:
+            return future.result()
+        except Exception as e:
+            return self._error_result(name, e)
+    
+    def _error_result(self, name: str, error: Exception) -> Dict[str, Any]:
+        logger.error(f"Unexpected error checking {name}: {error}")
+        return {
+            "status": "error",
+            "message": f"Error checking {name}: {str(error)}"
+        }
     
+    @_timed("ollama")
     def _check_ollama(self) -> Dict[str, Any]:
         """Check Ollama service health with fallbacks"""
+        if self._tcp_refused(*self._ollama_addr):
+            return self._ollama_offline()
         try:
+            names = self._get_cached("ollama_models")
+            if names is not None:
+                # With the model catalog cached, the tiny version endpoint is
+                # enough to show Ollama is up
+                response = self._http.request("GET", f"{self.ollama_url}/api/version")
+                if response.status == 200:
+                    return self._ollama_model_status(names)
+            
             # Try to get Ollama models list as health check
-            response = requests.get(
+            response = self._http.request("GET", f"{self.ollama_url}/api/tags")
+            models = json.loads(response.data).get("models", []) if response.status == 200 else None
+            return self._ollama_result(response.status, models)
+        # NewConnectionError subclasses ConnectTimeoutError, so test it first
+        except (urllib3.exceptions.NewConnectionError,
+                urllib3.exceptions.ProtocolError,
+                urllib3.exceptions.MaxRetryError):
+            return self._ollama_offline()
+        except urllib3.exceptions.TimeoutError:
+            return self._ollama_timed_out()
+        except Exception as e:
+            return self._ollama_error(e)
+    
+    @_timed("ollama")
+    async def _check_ollama_async(self) -> Dict[str, Any]:
+        """Check Ollama service health without blocking the event loop (needs aiohttp)"""
+        if await self._tcp_refused_async(*self._ollama_addr):
+            return self._ollama_offline()
+        try:
+            session = self._get_aio_session()
+            timeout = aiohttp.ClientTimeout(total=self.ollama_timeout)
+            names = self._get_cached("ollama_models")
+            if names is not None:
+                async with session.get(f"{self.ollama_url}/api/version", timeout=timeout) as response:
+                    if response.status == 200:
+                        return self._ollama_model_status(names)
+            
+            async with session.get(
                 f"{self.ollama_url}/api/tags",
-                timeout=self.ollama_timeout
+                timeout=timeout
+            ) as response:
+                models = (await response.json(content_type=None)).get("models", []) if response.status == 200 else None
+                return self._ollama_result(response.status, models)
+        except asyncio.TimeoutError:
+            return self._ollama_timed_out()
+        except aiohttp.ClientConnectionError:
+            return self._ollama_offline()
+        except Exception as e:
+            return self._ollama_error(e)
+    
+    def _tcp_refused(self, host: str, port: int) -> bool:
+        """
+        Whether host:port definitely rejects TCP connections. A slow connect
+        (e.g. a remote Ollama over a WAN or VPN) falls through to the HTTP probe.
+        """
+        try:
+            socket.create_connection((host, port), self.tcp_probe_timeout).close()
+            return False
+        except OSError as e:
+            return _is_refusal(e)
+    
+    async def _tcp_refused_async(self, host: str, port: int) -> bool:
+        """Event-loop version of _tcp_refused"""
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.tcp_probe_timeout)
+            writer.close()
+            return False
+        except asyncio.TimeoutError:
+            return False
+        except OSError as e:
+            return _is_refusal(e)
+    
+    def _get_aio_session(self):
+        """Shared aiohttp session for the running event loop"""
+        loop = asyncio.get_running_loop()
+        session = self._aio_sessions.get(loop)
+        if session is None or session.closed:
+            # Forget sessions left behind by loops that have since closed
+            for stale in [l for l in self._aio_sessions if l.is_closed()]:
+                del self._aio_sessions[stale]
+            session = self._aio_sessions[loop] = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=60)
             )
-            
-            if response.status_code == 200:
-                models = response.json().get("models", [])
-                has_model = any(model["name"] == self.ollama_model for model in models) if models else False
-                
-                if has_model:
-                    return {
-                        "status": "healthy",
-                        "message": f"Ollama is running with model {self.ollama_model}",
-                        "has_model": True
-                    }
-                else:
-                    return {
-                        "status": "degraded",
-                        "message": f"Ollama is running but model {self.ollama_model} is not available",
-                        "has_model": False,
-                        "fallback": "Using fallback responses for AI features"
-                    }
-            else:
-                return {
-                    "status": "degraded",
-                    "message": f"Ollama returned status code {response.status_code}",
-                    "has_model": False,
-                    "fallback": "Using fallback responses for AI features"
-                }
-        except requests.exceptions.ConnectionError:
-            logger.warning("Ollama connection error")
-            return {
-                "status": "offline",
-                "message": "Cannot connect to Ollama service",
-                "has_model": False,
-                "fallback": "Using static responses for AI features"
-            }
-        except requests.exceptions.Timeout:
-            logger.warning("Ollama request timeout")
+        return session
+    
+    async def close_async(self):
+        """Close the aiohttp session of the running event loop, if any"""
+        session = self._aio_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+    
+    def _ollama_result(self, status_code: int, models: Optional[list]) -> Dict[str, Any]:
+        """Interpret an /api/tags response; models is only given for a 200"""
+        if status_code == 200:
+            names = frozenset(model.get("name") for model in models or ())
+            # Remembered so later probes can skip re-downloading the catalog
+            self._cache_result("ollama_models", names)
+            return self._ollama_model_status(names)
+        else:
             return {
                 "status": "degraded",
-                "message": "Ollama request timed out",
+                "message": f"Ollama returned status code {status_code}",
                 "has_model": False,
                 "fallback": "Using fallback responses for AI features"
             }
-        except Exception as e:
-            logger.error(f"Unexpected error checking Ollama: {e}")
+    
+    def _ollama_model_status(self, names: frozenset) -> Dict[str, Any]:
+        """Status of a running Ollama given the names of the models it has"""
+        if self.ollama_model in names:
             return {
-                "status": "error",
-                "message": f"Error checking Ollama: {str(e)}",
+                "status": "healthy",
+                "message": f"Ollama is running with model {self.ollama_model}",
+                "has_model": True
+            }
+        else:
+            return {
+                "status": "degraded",
+                "message": f"Ollama is running but model {self.ollama_model} is not available",
                 "has_model": False,
-                "fallback": "Using static responses for AI features"
+                "fallback": "Using fallback responses for AI features"
             }
     
+    def _ollama_offline(self) -> Dict[str, Any]:
+        logger.warning("Ollama connection error")
+        return {
+            "status": "offline",
+            "message": "Cannot connect to Ollama service",
+            "has_model": False,
+            "fallback": "Using static responses for AI features"
+        }
+    
+    def _ollama_timed_out(self) -> Dict[str, Any]:
+        logger.warning("Ollama request timeout")
+        return {
+            "status": "degraded",
+            "message": "Ollama request timed out",
+            "has_model": False,
+            "fallback": "Using fallback responses for AI features"
+        }
+    
+    def _ollama_error(self, error: Exception) -> Dict[str, Any]:
+        logger.error(f"Unexpected error checking Ollama: {error}")
+        return {
+            "status": "error",
+            "message": f"Error checking Ollama: {str(error)}",
+            "has_model": False,
+            "fallback": "Using static responses for AI features"
+        }
+    
+    @_timed("docker")
     def _check_docker(self) -> Dict[str, Any]:
         """Check Docker service health with fallbacks"""
         # Check if Docker is actually needed
-        docker_enabled = os.getenv("ENABLE_DOCKER", "False").lower() == "true"
-        
-        if not docker_enabled:
+        if not self._docker_enabled:
             # If Docker isn't required, don't report it as an error
+            return _DOCKER_DISABLED_RESULT
+        
+        if self._docker_sock_path is not None and not os.path.exists(self._docker_sock_path):
+            logger.warning(f"Docker socket {self._docker_sock_path} not found")
             return {
-                "status": "healthy",
-                "message": "Docker integration is disabled",
-                "disabled": True
+                "status": "offline",
+                "message": "Docker service is not available",
+                "fallback": "Code execution will fall back to local mode"
             }
             
         try:
-            # Try to connect to Docker
-            client = docker.from_env(timeout=self.docker_timeout)
-            version = client.version()
+            # Reuse the client; a ping is enough to show the daemon is up
+            if self._docker_client is None:
+                self._docker_client = docker.from_env(timeout=self.docker_timeout)
+            client = self._docker_client
+            client.ping()
+            
+            cached = self._docker_version_cache
+            if cached is not None and cached[0] > time.monotonic():
+                version = cached[1]
+            else:
+                version = client.version()
+                self._docker_version_cache = (time.monotonic() + self.docker_version_ttl, version)
             
             return {
                 "status": "healthy",
@@ -167,6 +589,7 @@ class HealthMonitor:
             }
         except docker.errors.DockerException as e:
             logger.warning(f"Docker error: {e}")
+            self._reset_docker_client()
             return {
                 "status": "offline",
                 "message": "Docker service is not available",
@@ -174,49 +597,66 @@ class HealthMonitor:
             }
         except Exception as e:
             logger.error(f"Unexpected error checking Docker: {e}")
+            self._reset_docker_client()
             return {
                 "status": "error",
                 "message": f"Error checking Docker: {str(e)}",
                 "fallback": "Code execution will fall back to local mode"
             }
     
-    def _check_database(self) -> Dict[str, Any]:
-        """Check database health with fallbacks"""
-        if self.db_type == "sqlite":
+    def _reset_docker_client(self) -> None:
+        """Drop the cached Docker client so the next probe reconnects from scratch"""
+        client, self._docker_client = self._docker_client, None
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+    
+    @_timed("database")
+    def _check_database(self, thorough: bool = False) -> Dict[str, Any]:
+        """
+        Check database health with fallbacks
+        
+        Args:
+            thorough: Always open the database file, even when the fast
+                      in-memory probe is enabled
+        """
+        if self._db_is_sqlite:
             try:
-                # Ensure directory exists
-                db_dir = os.path.dirname(self.db_path)
-                if not os.path.exists(db_dir):
+                # Normally done at startup; only retried here until it succeeds
+                if not self._schema_ready:
+                    self.ensure_schema()
+                
+                if self._sqlite_fast_probe and self._schema_ready and not thorough:
+                    conn = sqlite3.connect(":memory:")
                     try:
-                        os.makedirs(db_dir, exist_ok=True)
-                        logger.info(f"Created database directory: {db_dir}")
-                    except Exception as e:
-                        logger.error(f"Failed to create database directory: {e}")
-                        # Will continue and likely fail, but we tried
+                        self._configure_sqlite(conn)
+                        version = conn.execute("SELECT sqlite_version();").fetchone()[0]
+                    finally:
+                        conn.close()
+                    return {
+                        "status": "healthy",
+                        "message": f"SQLite database is available (v{version})",
+                        "type": "sqlite",
+                        "version": version,
+                        "probe": "memory"
+                    }
                 
                 # Try to connect to SQLite
-                conn = sqlite3.connect(self.db_path, timeout=self.docker_timeout)
-                cursor = conn.cursor()
-                cursor.execute("SELECT sqlite_version();")
-                version = cursor.fetchone()[0]
-                
-                # Create basic tables if they don't exist
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS chat_history (
-                        id INTEGER PRIMARY KEY,
-                        timestamp REAL,
-                        prompt TEXT,
-                        response TEXT
-                    )
-                """)
-                conn.commit()
-                conn.close()
+                conn = sqlite3.connect(self._db_ro_uri, uri=True, timeout=self.docker_timeout)
+                try:
+                    journal_mode = self._configure_sqlite(conn)
+                    version = conn.execute("SELECT sqlite_version();").fetchone()[0]
+                finally:
+                    conn.close()
                 
                 return {
                     "status": "healthy",
                     "message": f"SQLite database is available (v{version})",
                     "type": "sqlite",
-                    "version": version
+                    "version": version,
+                    "journal_mode": journal_mode
                 }
             except sqlite3.Error as e:
                 logger.warning(f"SQLite error: {e}")
@@ -224,6 +664,7 @@ class HealthMonitor:
                 # Try in-memory SQLite as first fallback
                 try:
                     conn = sqlite3.connect(":memory:")
+                    self._configure_sqlite(conn)
                     cursor = conn.cursor()
                     cursor.execute("SELECT sqlite_version();")
                     version = cursor.fetchone()[0]
@@ -240,12 +681,7 @@ class HealthMonitor:
                     pass
                 
                 # Check if JSON fallback is available
-                json_dir = os.path.dirname(self.json_db_path)
-                if not os.path.exists(json_dir):
-                    try:
-                        os.makedirs(json_dir, exist_ok=True)
-                    except Exception:
-                        pass
+                self._ensure_dir(os.path.dirname(self.json_db_path))
                         
                 try:
                     # Try to create/access JSON file
@@ -287,16 +723,82 @@ class HealthMonitor:
                     "fallback": "New database will be created on first use"
                 }
     
-    def _check_cache(self, key: str) -> bool:
-        """Check if cache entry is valid"""
-        if key not in self.cache:
+    def ensure_schema(self) -> bool:
+        """
+        Create the SQLite database and its basic tables if they don't exist
+        
+        Returns:
+            True if the schema is in place
+        """
+        if not self._db_is_sqlite:
+            return False
+        
+        # Ensure directory exists
+        if not self._ensure_dir(os.path.dirname(self.db_path)):
             return False
         
-        cache_entry = self.cache[key]
-        if time.time() - cache_entry["timestamp"] < self.cache_ttl:
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=self.docker_timeout)
+            try:
+                self._configure_sqlite(conn, writable=True)
+                self._ensure_schema(conn)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to create SQLite schema: {e}")
+        return self._schema_ready
+    
+    def _ensure_dir(self, path: str) -> bool:
+        """Create a directory if needed, remembering it once it is known to exist"""
+        if not path or path in self._dirs_ok:
             return True
+        try:
+            if not os.path.exists(path):
+                os.makedirs(path, exist_ok=True)
+                logger.info(f"Created directory: {path}")
+        except Exception as e:
+            logger.error(f"Failed to create directory {path}: {e}")
+            return False
+        self._dirs_ok.add(path)
+        return True
+    
+    def _configure_sqlite(self, conn: sqlite3.Connection, writable: bool = False) -> str:
+        """
+        Apply the SQLite PRAGMA settings to a new connection
         
-        return False
+        Returns:
+            The database's journal mode, reported so regressions are visible
+        """
+        conn.executescript(SQLITE_WRITE_PRAGMAS + SQLITE_PRAGMAS if writable else SQLITE_PRAGMAS)
+        return conn.execute("PRAGMA journal_mode;").fetchone()[0]
+    
+    def _ensure_schema(self, conn: sqlite3.Connection) -> None:
+        # Create basic tables if they don't exist
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS chat_history (
+                id INTEGER PRIMARY KEY,
+                timestamp REAL,
+                prompt TEXT,
+                response TEXT
+            )
+        """)
+        conn.commit()
+        self._schema_ready = True
+    
+    def _get_cached(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result if it hasn't expired, else None"""
+        entry = self.cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+    
+    def _cached(self, key: str, check: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Run a component check unless a fresh result for it is cached"""
+        result = self._get_cached(key)
+        if result is None:
+            result = check()
+            self._cache_result(key, result)
+        return result
         
     def check_all_systems(self):
         """Comprehensive health check for all system components with multiple fallbacks"""
@@ -304,23 +806,22 @@ class HealthMonitor:
             # Start with basic health check
             health_data = self.check_health()
             
-            # Check code execution capability
-            code_exec_status = self._check_code_execution()
+            # Latest code execution result from the background refresher
+            code_exec_status = self._bg_results.get("code_execution", _CODE_EXECUTION_PENDING_RESULT)
             health_data["checks"]["code_execution"] = code_exec_status
             
             # Check file system access
-            fs_status = self._check_filesystem()
+            fs_status = self._cached("filesystem", self._check_filesystem)
             health_data["checks"]["filesystem"] = fs_status
             
             # Additional system metrics
             health_data["language"] = "python"  # Default language
             
-            # Enhanced status determination logic
-            critical_services = ["code_execution", "filesystem"]
-            critical_healthy = all(
-                health_data["checks"].get(service, {}).get("status") in ["healthy", "degraded"]
-                for service in critical_services
-                if service in health_data["checks"]
+            # Enhanced status determination logic: the critical services
+            # were just checked, so test their results directly
+            critical_healthy = (
+                code_exec_status.get("status") in ("healthy", "degraded", "unknown")
+                and fs_status.get("status") in ("healthy", "degraded")
             )
             
             # Only mark as healthy if critical services are working
@@ -348,15 +849,28 @@ class HealthMonitor:
                 "message": "System operational with limited features"
             }
             
+    def _bg_loop(self) -> None:
+        """Refresh the background probe results until the process exits"""
+        while True:
+            try:
+                self._bg_results["code_execution"] = self._check_code_execution()
+            except Exception as e:
+                logger.error(f"Background health refresh failed: {e}")
+            if self._bg_stop.wait(self.ttls["code_execution"]):
+                return
+    
+    @_timed("code_execution")
     def _check_code_execution(self) -> Dict[str, Any]:
         """Check if code execution is working with multiple fallbacks"""
         try:
             # Try to import our code execution module
-            import code_execution
+            executor = _get_code_executor()
+            if executor is None:
+                return _CODE_EXECUTION_UNAVAILABLE_RESULT
             
             # Execute simple test code
             test_code = "print('health_check_test')"
-            result = code_execution.code_executor.execute_code(test_code)
+            result = executor.execute_code(test_code)
             
             if result.success:
                 return {
@@ -374,11 +888,7 @@ class HealthMonitor:
                 }
         except ImportError:
             logger.warning("Code execution module not available")
-            return {
-                "status": "degraded",
-                "message": "Code execution module not available",
-                "fallback": "Using built-in Python exec as fallback"
-            }
+            return _CODE_EXECUTION_UNAVAILABLE_RESULT
         except Exception as e:
             logger.error(f"Code execution check error: {e}")
             return {
@@ -387,13 +897,35 @@ class HealthMonitor:
                 "fallback": "Code will be displayed without execution"
             }
             
-    def _check_filesystem(self) -> Dict[str, Any]:
-        """Check filesystem access with fallbacks"""
+    @_timed("filesystem")
+    def _check_filesystem(self, thorough: bool = False) -> Dict[str, Any]:
+        """
+        Check filesystem access with fallbacks
+        
+        Args:
+            thorough: Actually write and read back a file instead of only
+                      checking permissions and free space
+        """
         try:
-            # Check temp directory access
-            import tempfile
-            temp_dir = tempfile.gettempdir()
-            test_file = os.path.join(temp_dir, f"health_check_{time.time()}.txt")
+            temp_dir = os.path.dirname(self._fs_probe_path)
+            if not thorough:
+                # Metadata-only probe: no file I/O on the regular health path
+                if not os.access(temp_dir, os.R_OK | os.W_OK):
+                    logger.warning("Filesystem permission error")
+                    return {
+                        "status": "degraded",
+                        "message": "Filesystem permission issues",
+                        "fallback": "Using restricted file access paths"
+                    }
+                free_mib = shutil.disk_usage(temp_dir).free >> 20
+                return {
+                    "status": "healthy",
+                    "message": f"Filesystem access is working, {free_mib} MiB free",
+                    "free_mib": free_mib
+                }
+            
+            # Check temp directory access, reusing this process's probe file
+            test_file = self._fs_probe_path
             
             # Test write access
             with open(test_file, 'w') as f:
@@ -402,9 +934,6 @@ class HealthMonitor:
             # Test read access
             with open(test_file, 'r') as f:
                 content = f.read()
-                
-            # Clean up
-            os.remove(test_file)
             
             if content == 'health check':
                 return {
@@ -432,12 +961,51 @@ class HealthMonitor:
                 "fallback": "Using in-memory storage only"
             }
     
-    def _cache_result(self, key: str, data: Dict[str, Any]) -> None:
-        """Cache a result with timestamp"""
-        self.cache[key] = {
-            "timestamp": time.time(),
-            "data": data
+    def _remove_fs_probe(self) -> None:
+        """Clean up the filesystem probe file at exit"""
+        try:
+            os.remove(self._fs_probe_path)
+        except OSError:
+            pass
+    
+    def _record(self, key: str, result: Dict[str, Any], latency_us: int) -> Dict[str, Any]:
+        """Fold one probe's latency and status into the metrics"""
+        with self._metrics_lock:
+            previous = self._ewma.get(key, latency_us)
+            self._ewma[key] = 0.9 * previous + 0.1 * latency_us
+            self._last_latency[key] = latency_us
+            self._status_counts[(key, result.get("status"))] += 1
+        return result
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of per-probe metrics
+        
+        Returns:
+            Dict with the latency EWMA and most recent latency (both in
+            microseconds) and the status counts per probe
+        """
+        with self._metrics_lock:
+            latency = {key: round(value) for key, value in self._ewma.items()}
+            last_latency = dict(self._last_latency)
+            counts: Dict[str, Dict[str, int]] = {}
+            for (key, status), count in self._status_counts.items():
+                counts.setdefault(key, {})[status] = count
+        return {
+            "latency_us_ewma": latency,
+            "latency_us_last": last_latency,
+            "status_counts": counts,
         }
+    
+    def _cache_result(self, key: str, data: Dict[str, Any]) -> None:
+        """Cache a result for its component's TTL, or cache_ttl by default"""
+        self.cache[key] = (time.monotonic() + self.ttls.get(key, self.cache_ttl), data)
+
+@functools.lru_cache(maxsize=1)
+def get_health_monitor() -> HealthMonitor:
+    """Shared HealthMonitor, created on first use rather than at import time"""
+    return HealthMonitor()
 
-# Singleton instance
-health_monitor = HealthMonitor()
+def initialize():
+    """Startup hook called by startup_manager: set up the database schema"""
+    return get_health_monitor().ensure_schema()
@@ -3,17 +3,27 @@ Enhanced health monitoring service with comprehensive fallback mechanisms.
 """
 import os
 import time
+import asyncio
+import atexit
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 import socket
-import psutil
+import errno
+import functools
 import json
+import random
+import shutil
 import sqlite3
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor, wait
 import threading
+import types
+from collections import OrderedDict, deque
+from urllib.parse import urlparse
 
 # Conditional imports for database backends
 try:
@@ -23,25 +33,60 @@ except ImportError:
     SQLITE_AVAILABLE = False
     logging.warning("sqlite3 module not available. SQLite support will be disabled.")
 
+@functools.lru_cache(maxsize=1)
+def _get_psycopg2():
+    """Import psycopg2 on first use; None if it isn't installed."""
+    try:
+        import psycopg2
+        import psycopg2.pool
+        return psycopg2
+    except ImportError:
+        logging.warning("psycopg2 not available. PostgreSQL support will be disabled.")
+        return None
+
 try:
-    import psycopg2
-    from psycopg2 import pool
-    POSTGRES_AVAILABLE = True
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
 except ImportError:
-    POSTGRES_AVAILABLE = False
-    logging.warning("psycopg2 not available. PostgreSQL support will be disabled.")
+    AIOHTTP_AVAILABLE = False
+    logging.warning("aiohttp not available. HTTP probes will run sequentially.")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds between background CPU usage samples
+CPU_SAMPLE_INTERVAL = 5
+
+# JSON databases larger than this are only checked for readability
+JSON_DB_PARSE_LIMIT = 16 * 1024 * 1024
+
+# Connect errors that prove nothing is listening, as opposed to timeouts
+_REFUSAL_ERRNOS = frozenset({errno.ECONNREFUSED, errno.EHOSTUNREACH, errno.ENETUNREACH})
+
+
+def _is_refusal(error: OSError) -> bool:
+    """Whether a connect error is a definite refusal rather than a slow network."""
+    return isinstance(error, ConnectionRefusedError) or error.errno in _REFUSAL_ERRNOS
+
 class HealthStatus(str, Enum):
     HEALTHY = "healthy"
     DEGRADED = "degraded"
     UNHEALTHY = "unhealthy"
     UNKNOWN = "unknown"
 
-@dataclass
+# Plain status strings for the hot serialization paths
+_HEALTHY = HealthStatus.HEALTHY.value
+_DEGRADED = HealthStatus.DEGRADED.value
+
+# Status -> serialized string, avoiding the enum .value lookup per result
+_STATUS_STR = {status: status.value for status in HealthStatus}
+
+# Status -> bit, so component statuses aggregate with a single OR each
+_STATUS_BIT = {status: 1 << i for i, status in enumerate(HealthStatus)}
+_UNHEALTHY_BIT = _STATUS_BIT[HealthStatus.UNHEALTHY]
+
+@dataclass(slots=True)
 class HealthCheckResult:
     """Result of a health check."""
     status: HealthStatus
@@ -53,7 +98,7 @@ class HealthCheckResult:
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
         result = {
-            "status": self.status.value,
+            "status": _STATUS_STR[self.status],
             "message": self.message,
             "timestamp": self.timestamp or time.time(),
         }
@@ -82,33 +127,133 @@ class HealthService:
     def __init__(self, config: Optional[Dict] = None):
         """Initialize the health service with configuration."""
         self.config = self._load_config(config)
+        self._precompute_config()
         self.circuit_breakers = {}
-        self.cache = {}
-        self.lock = threading.RLock()
+        # LRU of cached results, bounded so new keys can't grow it forever
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_max = 128
+        # Fine-grained locks: each circuit breaker has its own (under "_lock"),
+        # and the cache and metrics each have theirs, so concurrent probes of
+        # different services never wait on each other; self.lock only
+        # guards one-time setup
+        self.lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        # The component checks are independent network/disk probes, so they
+        # run side by side and a full check takes as long as the slowest one
+        self._executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="health")
+        atexit.register(self._executor.shutdown, wait=False)
+        # Stale cache entries are refreshed here in the background, apart from
+        # the probe pool so a refresh can't starve the checks it submits
+        self._refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="health-refresh")
+        atexit.register(self._refresh_executor.shutdown, wait=False)
+        # Database connections are reused between probes: a small pool for
+        # PostgreSQL and one connection per probe thread for SQLite
+        self._pg_pool = None
+        self._sqlite_local = threading.local()
+        # db_path -> (file versions, table names)
+        self._sqlite_schema_cache: Dict[str, Tuple[Tuple[int, int], List[str]]] = {}
+        # ((mtime_ns, size), details) of the JSON database
+        self._json_cache = None
+        # (expires_at, (disk_io, net_io)) on the monotonic clock
+        self._io_cache = None
+        
+        # CPU usage is sampled in the background, so a probe reads the last
+        # value instead of blocking while psutil measures an interval. The
+        # first call only primes psutil's counters. psutil itself is only
+        # imported once a service is created.
+        import psutil
+        psutil.cpu_percent(interval=None)
+        self._last_cpu = None
+        self._sampler_stop = threading.Event()
+        threading.Thread(target=self._sample_cpu, name="health-cpu", daemon=True).start()
+        atexit.register(self._sampler_stop.set)
+        # Singleflight state: key -> event set when its running probe ends,
+        # and when each kind of probe last started (monotonic)
+        self._inflight: Dict[str, threading.Event] = {}
+        self._last_probe: Dict[str, float] = {}
+        self._refreshers = {
+            "system_health": self._probe_system_health,
+            "readiness": self._probe_readiness,
+        }
+        
+        # Shared keep-alive session, so repeated probes reuse connections
+        # instead of paying a TCP (and TLS) handshake every time
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Connection"] = "keep-alive"
+        # With aiohttp, HTTP probes fan out on an event loop running in its
+        # own thread, so its session and connections outlive each probe
+        self._loop = None
+        self._aio_session = None
+        atexit.register(self.close)
         self.metrics = {
             "successful_checks": 0,
             "failed_checks": 0,
             "circuit_breaker_trips": 0,
             "fallbacks_used": 0,
         }
+        self._metrics_view = types.MappingProxyType(self.metrics)
         
         # Initialize circuit breakers for each service
         for service in self.config["services"].keys():
             self.circuit_breakers[service] = {
                 "state": "closed",  # closed, open, half-open
-                "failure_count": 0,
+                "events": deque(maxlen=128),  # (monotonic time, ok, latency)
+                "half_open_failures": 0,
                 "last_failure": None,
                 "last_success": None,
-                "trip_time": None
+                "trip_time": None,  # monotonic
+                "next_probe_after": None,  # monotonic
+                "last_delay": None,
+                "consecutive_trips": 0,
+                "_lock": threading.Lock()
             }
     
+    def close(self) -> None:
+        """Close the pooled HTTP connections."""
+        self.session.close()
+        loop, self._loop = self._loop, None
+        if loop is not None:
+            if self._aio_session is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(self._aio_session.close(), loop).result(timeout=1)
+                except Exception:
+                    pass
+            loop.call_soon_threadsafe(loop.stop)
+    
+    def _run_async(self, coro):
+        """Run a coroutine on the background event loop and wait for its result."""
+        with self.lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="health-aio", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    def _get_aio_session(self):
+        """aiohttp session of the background loop; only called on that loop."""
+        if self._aio_session is None:
+            self._aio_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=16))
+        return self._aio_session
+    
     def _load_config(self, config: Optional[Dict] = None) -> Dict:
         """Load configuration with defaults."""
         default_config = {
             "cache_ttl": 30,  # seconds
+            "min_probe_interval": 5,  # seconds between real probes of one kind
             "circuit_breaker": {
+                # Trips when over error_threshold of the outcomes in the last
+                # `window` seconds failed, given at least failure_threshold
+                # outcomes in that window
                 "failure_threshold": 3,
+                "error_threshold": 0.5,
+                "window": 60,  # seconds
+                # Open -> half-open delay: starts at reset_timeout and grows
+                # with decorrelated jitter on repeated trips, up to the max
                 "reset_timeout": 60,  # seconds
+                "max_reset_timeout": 600,  # seconds
                 "half_open_max_attempts": 2
             },
             "timeouts": {
@@ -131,7 +276,10 @@ class HealthService:
                     ],
                     "health_path": "/api/tags",
                     "required_models": ["codellama:instruct"],
-                    "timeout": 10
+                    "timeout": 10,
+                    # Connect timeout for the TCP pre-probe; only a refused
+                    # connection skips the HTTP check
+                    "tcp_probe_timeout": 1.0
                 },
                 "database": {
                     "types": ["postgres", "sqlite", "json"],
@@ -151,7 +299,11 @@ class HealthService:
                         "https://api.openai.com/v1/models",
                         "https://huggingface.co"
                     ],
-                    "timeout": 5
+                    "timeout": 5,
+                    # Split of the timeout: a black-holed host fails after the
+                    # connect timeout, a slow one after the read timeout
+                    "connect_timeout": 2,
+                    "read_timeout": 3
                 }
             }
         }
@@ -162,6 +314,51 @@ class HealthService:
             
         return default_config
     
+    def _precompute_config(self) -> None:
+        """Derive the per-probe values (URLs, timeouts, paths) from the config once."""
+        timeouts = self.config["timeouts"]
+        services = self.config["services"]
+        
+        ollama = services["ollama"]
+        self._ollama_timeout = ollama.get("timeout", timeouts["ollama"])
+        self._tcp_probe_timeout = ollama.get("tcp_probe_timeout", 1.0)
+        self._required_models = tuple(ollama["required_models"])
+        # (endpoint, health URL, (host, port) for the TCP pre-probe)
+        self._ollama_urls: List[Tuple[str, str, Tuple[str, int]]] = [
+            (endpoint, f"{endpoint.rstrip('/')}{ollama['health_path']}", self._tcp_address(endpoint))
+            for endpoint in ollama["endpoints"]
+        ]
+        
+        database = services["database"]
+        self._db_types = tuple(database["types"])
+        self._sqlite_path = database["paths"].get("sqlite", "data/coder.db")
+        self._json_db_path = database["paths"].get("json")
+        self._pg_connect_kwargs = dict(
+            host=os.getenv("DB_HOST", "localhost"),
+            port=os.getenv("DB_PORT", "5432"),
+            dbname=os.getenv("DB_NAME", "coder"),
+            user=os.getenv("DB_USER", "postgres"),
+            password=os.getenv("DB_PASSWORD", "")
+        )
+        
+        network = services["network"]
+        self._network_urls = tuple(network["check_urls"])
+        self._network_timeout = network.get("timeout", timeouts["network"])
+        self._network_timeouts = (
+            network.get("connect_timeout", self._network_timeout),
+            network.get("read_timeout", self._network_timeout)
+        )
+        
+        # Upper bound on how long check_system_health waits for its probes;
+        # Ollama tries each endpoint in turn, so it can take several timeouts
+        self._max_check_time = max(len(self._ollama_urls) * self._ollama_timeout, *timeouts.values())
+    
+    @staticmethod
+    def _tcp_address(url: str) -> Tuple[str, int]:
+        """Host and port a URL connects to."""
+        parsed = urlparse(url)
+        return parsed.hostname or "localhost", parsed.port or (443 if parsed.scheme == "https" else 80)
+    
     def _deep_update(self, target: Dict, source: Dict) -> None:
         """Deep update a dictionary."""
         for key, value in source.items():
@@ -177,193 +374,292 @@ class HealthService:
         Returns:
             Dict with status of each component and overall system health.
         """
-        start_time = time.time()
-        
         # Check if we can use cached results
         cached_result = self._get_cached_result("system_health")
         if cached_result:
             return cached_result
         
+        return self._singleflight("system_health")
+    
+    def _probe_system_health(self) -> Dict[str, Any]:
+        """Run all component checks and cache the combined result."""
+        start_time = time.monotonic()
+        
         # Initialize result structure
         result = {
-            "status": HealthStatus.HEALTHY.value,
+            "status": _HEALTHY,
             "timestamp": datetime.utcnow().isoformat(),
             "components": {},
-            "metrics": self.metrics.copy()
+            # Read-only live view: shared by every cached result, and
+            # callers can't write through it into the service's counters
+            "metrics": self._metrics_view
         }
         
-        # Check each service
-        services_healthy = True
-        
-        # Check Ollama service
-        ollama_result = self.check_ollama_health()
-        result["components"]["ollama"] = ollama_result.to_dict()
-        
-        # Check database
-        db_result = self.check_database_health()
-        result["components"]["database"] = db_result.to_dict()
-        
-        # Check filesystem
-        fs_result = self.check_filesystem_health()
-        result["components"]["filesystem"] = fs_result.to_dict()
-        
-        # Check network connectivity
-        net_result = self.check_network_health()
-        result["components"]["network"] = net_result.to_dict()
+        # Check each service concurrently
+        checks = {
+            "ollama": self.check_ollama_health,
+            "database": self.check_database_health,
+            "filesystem": self.check_filesystem_health,
+            "network": self.check_network_health,
+            "system": self.check_system_resources,
+        }
+        futures = {name: self._executor.submit(check) for name, check in checks.items()}
+        wait(futures.values(), timeout=self._max_check_time)
         
-        # Check system resources
-        sys_result = self.check_system_resources()
-        result["components"]["system"] = sys_result.to_dict()
+        # OR of the components' status bits
+        seen = 0
+        for name, future in futures.items():
+            component = self._future_result(name, future)
+            result["components"][name] = component.to_dict()
+            seen |= _STATUS_BIT[component.status]
         
         # Determine overall status
-        component_statuses = [
-            ollama_result.status,
-            db_result.status,
-            fs_result.status,
-            net_result.status,
-            sys_result.status
-        ]
-        
-        if HealthStatus.UNHEALTHY in component_statuses:
-            result["status"] = HealthStatus.DEGRADED.value
+        if seen & _UNHEALTHY_BIT:
+            result["status"] = _DEGRADED
         
         # Add timing information
-        result["response_time"] = time.time() - start_time
+        result["response_time"] = time.monotonic() - start_time
         
         # Cache the result
         self._cache_result("system_health", result)
         
         return result
     
+    def _future_result(self, name: str, future) -> HealthCheckResult:
+        """Result of a submitted check, or UNKNOWN if it timed out or raised."""
+        if not future.done():
+            logger.warning(f"{name} health check timed out")
+            return HealthCheckResult(
+                status=HealthStatus.UNKNOWN,
+                message=f"{name} health check timed out"
+            )
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"{name} health check failed: {str(e)}")
+            return HealthCheckResult(
+                status=HealthStatus.UNKNOWN,
+                message=f"{name} health check failed: {str(e)}"
+            )
+    
+    def quick_readiness(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Check only the components a readiness probe depends on, skipping
+        the Ollama, network and resource checks check_system_health runs.
+        
+        Returns:
+            Dict mapping component name to its health check result.
+        """
+        cached_result = self._get_cached_result("readiness")
+        if cached_result:
+            return cached_result
+        
+        return self._singleflight("readiness")
+    
+    def _probe_readiness(self) -> Dict[str, Dict[str, Any]]:
+        """Run the readiness checks and cache their results."""
+        components = {
+            "database": self.check_database_health().to_dict(),
+            "filesystem": self.check_filesystem_health().to_dict(),
+        }
+        self._cache_result("readiness", components)
+        return components
+    
     def check_ollama_health(self) -> HealthCheckResult:
         """Check the health of the Ollama service with fallbacks."""
-        start_time = time.time()
-        config = self.config["services"]["ollama"]
-        
+        start_time = time.monotonic()
         # Check circuit breaker first
         if not self._is_circuit_closed("ollama"):
             return HealthCheckResult(
                 status=HealthStatus.UNHEALTHY,
                 message="Circuit breaker is open",
-                response_time=time.time() - start_time
+                response_time=time.monotonic() - start_time
             )
         
-        # Try each endpoint
-        for endpoint in config["endpoints"]:
+        # Query the endpoints; the first one to answer is used
+        if AIOHTTP_AVAILABLE:
+            data = self._run_async(self._check_ollama_async())
+        else:
+            data = self._fetch_ollama_tags()
+        
+        if data is None:
+            # All endpoints failed
+            self._record_failure("ollama", time.monotonic() - start_time)
+            return HealthCheckResult(
+                status=HealthStatus.UNHEALTHY,
+                message="All Ollama endpoints are unreachable",
+                response_time=time.monotonic() - start_time
+            )
+        
+        # Check if required models are available
+        model_names = [m.get("name") for m in data.get("models") or ()]
+        available = set(model_names)
+        missing_models = [model for model in self._required_models if model not in available]
+        
+        if missing_models:
+            msg = f"Missing required models: {', '.join(missing_models)}"
+            return HealthCheckResult(
+                status=HealthStatus.DEGRADED,
+                message=msg,
+                details={"missing_models": missing_models},
+                response_time=time.monotonic() - start_time
+            )
+        
+        # Success
+        self._record_success("ollama", time.monotonic() - start_time)
+        return HealthCheckResult(
+            status=HealthStatus.HEALTHY,
+            message="Ollama service is healthy",
+            details={"models": model_names},
+            response_time=time.monotonic() - start_time
+        )
+    
+    def _fetch_ollama_tags(self) -> Optional[Dict]:
+        """Try each Ollama endpoint in turn; the first 200 response's JSON, or None."""
+        for endpoint, url, address in self._ollama_urls:
+            # An endpoint that refuses connections is ruled out in one quick
+            # connect attempt instead of waiting out the HTTP timeout
+            if self._tcp_refused(*address):
+                logger.warning(f"Ollama health check failed for {endpoint}: connection refused")
+                continue
             try:
-                url = f"{endpoint.rstrip('/')}{config['health_path']}"
-                response = requests.get(
-                    url,
-                    timeout=config.get("timeout", self.config["timeouts"]["ollama"])
-                )
+                response = self.session.get(url, timeout=self._ollama_timeout)
                 
                 if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Check if required models are available
-                    missing_models = [
-                        model for model in config["required_models"]
-                        if not any(m["name"] == model for m in data.get("models", []))
-                    ]
-                    
-                    if missing_models:
-                        msg = f"Missing required models: {', '.join(missing_models)}"
-                        return HealthCheckResult(
-                            status=HealthStatus.DEGRADED,
-                            message=msg,
-                            details={"missing_models": missing_models},
-                            response_time=time.time() - start_time
-                        )
-                    
-                    # Success
-                    self._record_success("ollama")
-                    return HealthCheckResult(
-                        status=HealthStatus.HEALTHY,
-                        message="Ollama service is healthy",
-                        details={"models": [m["name"] for m in data.get("models", [])]},
-                        response_time=time.time() - start_time
-                    )
+                    return response.json()
                 
             except requests.RequestException as e:
                 logger.warning(f"Ollama health check failed for {endpoint}: {str(e)}")
                 continue
+        return None
+    
+    async def _check_ollama_async(self) -> Optional[Dict]:
+        """Query all Ollama endpoints at once; the first 200 response's JSON, or None."""
+        session = self._get_aio_session()
+        timeout = aiohttp.ClientTimeout(total=self._ollama_timeout)
         
-        # All endpoints failed
-        self._record_failure("ollama")
-        return HealthCheckResult(
-            status=HealthStatus.UNHEALTHY,
-            message="All Ollama endpoints are unreachable",
-            response_time=time.time() - start_time
-        )
+        async def fetch(endpoint: str, url: str, address: Tuple[str, int]) -> Optional[Dict]:
+            if await self._tcp_refused_async(*address):
+                logger.warning(f"Ollama health check failed for {endpoint}: connection refused")
+                return None
+            try:
+                async with session.get(url, timeout=timeout) as response:
+                    if response.status == 200:
+                        return await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.warning(f"Ollama health check failed for {endpoint}: {str(e)}")
+            return None
+        
+        tasks = [asyncio.ensure_future(fetch(*target)) for target in self._ollama_urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                data = await next_done
+                if data is not None:
+                    return data
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    def _tcp_refused(self, host: str, port: int) -> bool:
+        """
+        Whether host:port definitely rejects TCP connections. A slow connect
+        (e.g. a remote endpoint over a WAN or VPN) is not a refusal, so the
+        caller still runs the real HTTP probe.
+        """
+        try:
+            socket.create_connection((host, port), timeout=self._tcp_probe_timeout).close()
+            return False
+        except OSError as e:
+            return _is_refusal(e)
+    
+    async def _tcp_refused_async(self, host: str, port: int) -> bool:
+        """Event-loop version of _tcp_refused."""
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self._tcp_probe_timeout)
+            writer.close()
+            return False
+        except asyncio.TimeoutError:
+            return False
+        except OSError as e:
+            return _is_refusal(e)
     
     def check_database_health(self) -> HealthCheckResult:
         """Check the health of the database with fallbacks."""
-        start_time = time.time()
-        config = self.config["services"]["database"]
-        
+        start_time = time.monotonic()
         # Try each database type in order of preference
-        for db_type in config["types"]:
+        for db_type in self._db_types:
             try:
-                if db_type == "postgres" and POSTGRES_AVAILABLE:
+                if db_type == "postgres" and _get_psycopg2() is not None:
+                    psycopg2 = _get_psycopg2()
+                    pg_pool = None
+                    conn = None
+                    failed = False
                     try:
-                        # Check PostgreSQL connection
-                        conn = psycopg2.connect(
-                            host=os.getenv("DB_HOST", "localhost"),
-                            port=os.getenv("DB_PORT", "5432"),
-                            dbname=os.getenv("DB_NAME", "coder"),
-                            user=os.getenv("DB_USER", "postgres"),
-                            password=os.getenv("DB_PASSWORD", "")
-                        )
+                        # Check PostgreSQL with a pooled connection
+                        pg_pool = self._get_pg_pool()
+                        conn = pg_pool.getconn()
                         with conn.cursor() as cursor:
                             cursor.execute("SELECT 1")
                             if cursor.fetchone()[0] == 1:
                                 return HealthCheckResult(
                                     status=HealthStatus.HEALTHY,
                                     message="PostgreSQL database is accessible",
-                                    response_time=time.time() - start_time
+                                    response_time=time.monotonic() - start_time
                                 )
+                    except psycopg2.OperationalError as e:
+                        logger.warning(f"PostgreSQL health check failed: {str(e)}")
+                        # The connection is unusable; start a fresh pool next time
+                        self._reset_pg_pool(pg_pool)
+                        conn = None
+                        continue
                     except Exception as e:
                         logger.warning(f"PostgreSQL health check failed: {str(e)}")
+                        failed = True
                         continue
+                    finally:
+                        if conn is not None:
+                            # A connection that raised (e.g. InterfaceError once
+                            # closed) is discarded, not handed to the next borrower
+                            pg_pool.putconn(conn, close=failed)
                         
                 elif db_type == "sqlite" and SQLITE_AVAILABLE:
                     try:
                         # Check SQLite database
-                        db_path = config["paths"].get("sqlite", "data/coder.db")
+                        db_path = self._sqlite_path
                         if not os.path.exists(os.path.dirname(db_path)):
                             os.makedirs(os.path.dirname(db_path), exist_ok=True)
                             
-                        # Try to connect and run a simple query
-                        with sqlite3.connect(db_path) as conn:
-                            cursor = conn.cursor()
-                            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-                            tables = cursor.fetchall()
-                            
-                            return HealthCheckResult(
-                                status=HealthStatus.HEALTHY,
-                                message="SQLite database is accessible",
-                                details={"tables": [t[0] for t in tables] if tables else []},
-                                response_time=time.time() - start_time
-                            )
+                        # List the tables on this thread's connection
+                        conn = self._get_sqlite_conn(db_path)
+                        try:
+                            tables = self._sqlite_tables(conn, db_path)
+                        except sqlite3.Error:
+                            self._sqlite_local.conn = None
+                            conn.close()
+                            raise
+                        
+                        return HealthCheckResult(
+                            status=HealthStatus.HEALTHY,
+                            message="SQLite database is accessible",
+                            details={"tables": tables},
+                            response_time=time.monotonic() - start_time
+                        )
                     except Exception as e:
                         logger.warning(f"SQLite health check failed: {str(e)}")
                         continue
                 
                 elif db_type == "json":
                     # Check JSON database
-                    json_path = config["paths"].get("json")
+                    json_path = self._json_db_path
                     if not os.path.exists(json_path):
                         continue
-                        
-                    # Try to read the JSON file
-                    with open(json_path, 'r') as f:
-                        data = json.load(f)
-                        
+                    
                     return HealthCheckResult(
                         status=HealthStatus.HEALTHY,
                         message="JSON database is accessible",
-                        details={"keys": list(data.keys())},
-                        response_time=time.time() - start_time
+                        details=self._json_db_details(json_path),
+                        response_time=time.monotonic() - start_time
                     )
                     
             except Exception as e:
@@ -374,12 +670,87 @@ class HealthService:
         return HealthCheckResult(
             status=HealthStatus.UNHEALTHY,
             message="All database backends are unavailable",
-            response_time=time.time() - start_time
+            response_time=time.monotonic() - start_time
         )
     
+    def _get_pg_pool(self):
+        """Shared PostgreSQL connection pool, created on first use."""
+        with self.lock:
+            if self._pg_pool is None:
+                self._pg_pool = _get_psycopg2().pool.ThreadedConnectionPool(1, 2, **self._pg_connect_kwargs)
+            return self._pg_pool
+    
+    def _reset_pg_pool(self, pg_pool) -> None:
+        """Discard a pool whose connections failed, if it is still the current one."""
+        if pg_pool is None:
+            return
+        with self.lock:
+            if self._pg_pool is pg_pool:
+                self._pg_pool = None
+        try:
+            pg_pool.closeall()
+        except Exception:
+            pass
+    
+    def _get_sqlite_conn(self, db_path: str) -> sqlite3.Connection:
+        """This thread's SQLite connection, kept open between probes."""
+        conn = getattr(self._sqlite_local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(db_path)
+            self._sqlite_local.conn = conn
+        return conn
+    
+    def _sqlite_tables(self, conn: sqlite3.Connection, db_path: str) -> List[str]:
+        """
+        Names of the tables in a SQLite database.
+        
+        The list is reused while neither the database file nor its WAL
+        has been modified since it was read.
+        """
+        try:
+            version = tuple(
+                os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+                for path in (db_path, f"{db_path}-wal")
+            )
+        except OSError:
+            version = None
+        
+        cached = self._sqlite_schema_cache.get(db_path)
+        if version is not None and cached is not None and cached[0] == version:
+            return cached[1]
+        
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table';")]
+        if version is not None:
+            self._sqlite_schema_cache[db_path] = (version, tables)
+        return tables
+    
+    def _json_db_details(self, json_path: str) -> Dict[str, Any]:
+        """
+        Top-level keys of the JSON database, re-read only when the file changes.
+        
+        Files over JSON_DB_PARSE_LIMIT are not parsed at all; their size is
+        reported instead.
+        """
+        st = os.stat(json_path)
+        cached = self._json_cache
+        if cached is not None and cached[0] == (st.st_mtime_ns, st.st_size):
+            return cached[1]
+        
+        if st.st_size > JSON_DB_PARSE_LIMIT:
+            # Still prove the file is readable
+            with open(json_path, "rb") as f:
+                f.read(1)
+            details = {"size": st.st_size}
+        else:
+            with open(json_path, "rb") as f:
+                data = json.loads(f.read())
+            details = {"keys": list(data.keys())}
+        self._json_cache = ((st.st_mtime_ns, st.st_size), details)
+        return details
+    
     def check_filesystem_health(self) -> HealthCheckResult:
         """Check filesystem health and available space."""
-        start_time = time.time()
+        start_time = time.monotonic()
         config = self.config["services"]["filesystem"]
         
         try:
@@ -388,14 +759,14 @@ class HealthService:
             accessible_paths = []
             
             for path in config["required_paths"]:
-                if os.path.exists(path) and os.access(path, os.W_OK):
+                # os.access is False for a missing path too, so no exists() check
+                if os.access(path, os.W_OK):
                     accessible_paths.append(path)
                 else:
                     missing_paths.append(path)
             
             # Check disk space
-            disk_usage = psutil.disk_usage("/")
-            free_space = disk_usage.free
+            free_space, total_space = self._disk_space("/")
             min_space = config.get("min_free_space", 100 * 1024 * 1024)  # 100MB default
             
             if missing_paths:
@@ -407,7 +778,7 @@ class HealthService:
                         "missing_paths": missing_paths,
                         "free_space": free_space
                     },
-                    response_time=time.time() - start_time
+                    response_time=time.monotonic() - start_time
                 )
             
             if free_space < min_space:
@@ -417,9 +788,9 @@ class HealthService:
                     details={
                         "free_space": free_space,
                         "min_required_space": min_space,
-                        "total_space": disk_usage.total
+                        "total_space": total_space
                     },
-                    response_time=time.time() - start_time
+                    response_time=time.monotonic() - start_time
                 )
             
             return HealthCheckResult(
@@ -428,45 +799,74 @@ class HealthService:
                 details={
                     "accessible_paths": accessible_paths,
                     "free_space": free_space,
-                    "total_space": disk_usage.total
+                    "total_space": total_space
                 },
-                response_time=time.time() - start_time
+                response_time=time.monotonic() - start_time
             )
             
         except Exception as e:
             return HealthCheckResult(
                 status=HealthStatus.UNHEALTHY,
                 message=f"Filesystem check failed: {str(e)}",
-                response_time=time.time() - start_time
+                response_time=time.monotonic() - start_time
             )
     
+    def _sample_cpu(self) -> None:
+        """Record CPU usage over each sampling interval until shutdown."""
+        import psutil
+        while not self._sampler_stop.wait(CPU_SAMPLE_INTERVAL):
+            try:
+                self._last_cpu = psutil.cpu_percent(interval=None)
+            except Exception as e:
+                logger.warning(f"CPU usage sampling failed: {str(e)}")
+    
+    def _disk_space(self, path: str) -> Tuple[int, int]:
+        """Free (for unprivileged users) and total bytes on path's filesystem."""
+        if hasattr(os, "statvfs"):
+            vfs = os.statvfs(path)
+            return vfs.f_bavail * vfs.f_frsize, vfs.f_blocks * vfs.f_frsize
+        usage = shutil.disk_usage(path)
+        return usage.free, usage.total
+    
+    def _io_counters(self):
+        """Disk and network I/O counters, re-read at most once a second."""
+        import psutil
+        cached = self._io_cache
+        now = time.monotonic()
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        counters = (psutil.disk_io_counters(), psutil.net_io_counters())
+        self._io_cache = (now + 1, counters)
+        return counters
+    
     def check_network_health(self) -> HealthCheckResult:
         """Check network connectivity to external services."""
-        start_time = time.time()
-        config = self.config["services"]["network"]
+        start_time = time.monotonic()
+        urls = self._network_urls
+        
+        if AIOHTTP_AVAILABLE:
+            outcomes = self._run_async(self._check_network_async(urls))
+        else:
+            outcomes = [self._head_status(url) for url in urls]
         
         failed_urls = []
         successful_urls = []
         
-        for url in config["check_urls"]:
-            try:
-                response = requests.head(
-                    url,
-                    timeout=config.get("timeout", self.config["timeouts"]["network"])
-                )
-                if response.status_code < 400:
-                    successful_urls.append(url)
-                else:
-                    failed_urls.append((url, f"HTTP {response.status_code}"))
-            except Exception as e:
-                failed_urls.append((url, str(e)))
+        # Each outcome is a status code, or the exception the request raised
+        for url, outcome in zip(urls, outcomes):
+            if isinstance(outcome, BaseException):
+                failed_urls.append((url, str(outcome)))
+            elif outcome < 400:
+                successful_urls.append(url)
+            else:
+                failed_urls.append((url, f"HTTP {outcome}"))
         
         if not successful_urls:
             return HealthCheckResult(
                 status=HealthStatus.UNHEALTHY,
                 message="All external services are unreachable",
                 details={"failed_checks": failed_urls},
-                response_time=time.time() - start_time
+                response_time=time.monotonic() - start_time
             )
         
         if failed_urls:
@@ -477,33 +877,61 @@ class HealthService:
                     "successful_checks": successful_urls,
                     "failed_checks": failed_urls
                 },
-                response_time=time.time() - start_time
+                response_time=time.monotonic() - start_time
             )
         
         return HealthCheckResult(
             status=HealthStatus.HEALTHY,
             message="All external services are reachable",
             details={"checked_urls": successful_urls},
-            response_time=time.time() - start_time
+            response_time=time.monotonic() - start_time
         )
     
+    def _head_status(self, url: str) -> Any:
+        """Status code of a HEAD request, or the exception it raised."""
+        try:
+            # Any answer, redirects included, shows the host is reachable;
+            # nothing is read beyond the status line and headers
+            response = self.session.head(
+                url,
+                timeout=self._network_timeouts,
+                stream=True,
+                allow_redirects=False
+            )
+            response.close()
+            return response.status_code
+        except Exception as e:
+            return e
+    
+    async def _check_network_async(self, urls: List[str]) -> List[Any]:
+        """HEAD all URLs at once; a status code or exception per URL."""
+        session = self._get_aio_session()
+        connect_timeout, read_timeout = self._network_timeouts
+        client_timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        
+        async def head(url: str) -> int:
+            async with session.head(url, timeout=client_timeout, allow_redirects=False) as response:
+                return response.status
+        
+        return await asyncio.gather(*(head(url) for url in urls), return_exceptions=True)
+    
     def check_system_resources(self) -> HealthCheckResult:
         """Check system resource usage."""
-        start_time = time.time()
+        import psutil
+        start_time = time.monotonic()
         
         try:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=0.5)
+            # CPU usage, from the background sampler once it has run
+            cpu_percent = self._last_cpu
+            if cpu_percent is None:
+                cpu_percent = psutil.cpu_percent(interval=None)
             
             # Memory usage
             memory = psutil.virtual_memory()
             memory_percent = memory.percent
             
-            # Disk I/O
-            disk_io = psutil.disk_io_counters()
-            
-            # Network I/O
-            net_io = psutil.net_io_counters()
+            # Disk and network I/O
+            disk_io, net_io = self._io_counters()
             
             details = {
                 "cpu": {
@@ -543,92 +971,215 @@ class HealthService:
                 status=status,
                 message=message,
                 details=details,
-                response_time=time.time() - start_time
+                response_time=time.monotonic() - start_time
             )
             
         except Exception as e:
             return HealthCheckResult(
                 status=HealthStatus.UNKNOWN,
                 message=f"Failed to check system resources: {str(e)}",
-                response_time=time.time() - start_time
+                response_time=time.monotonic() - start_time
             )
     
     def _is_circuit_closed(self, service: str) -> bool:
         """Check if the circuit breaker is closed for a service."""
-        with self.lock:
-            cb = self.circuit_breakers[service]
-            
+        cb = self.circuit_breakers[service]
+        with cb["_lock"]:
             if cb["state"] == "closed":
                 return True
                 
             if cb["state"] == "open":
-                # Check if reset timeout has passed
-                reset_timeout = self.config["circuit_breaker"]["reset_timeout"]
-                if time.time() - cb["trip_time"] > reset_timeout:
+                # Check if the backoff delay has passed
+                if time.monotonic() >= cb["next_probe_after"]:
                     # Move to half-open state
                     cb["state"] = "half-open"
-                    cb["failure_count"] = 0
+                    cb["half_open_failures"] = 0
                     return True
                 return False
                 
             if cb["state"] == "half-open":
                 # Allow a limited number of attempts
-                if cb["failure_count"] < self.config["circuit_breaker"]["half_open_max_attempts"]:
+                if cb["half_open_failures"] < self.config["circuit_breaker"]["half_open_max_attempts"]:
                     return True
                 return False
             
             return True
     
-    def _record_success(self, service: str) -> None:
+    def _record_success(self, service: str, latency: Optional[float] = None) -> None:
         """Record a successful operation for a service."""
-        with self.lock:
-            cb = self.circuit_breakers[service]
-            
+        cb = self.circuit_breakers[service]
+        with cb["_lock"]:
+            now = time.monotonic()
             if cb["state"] == "half-open":
-                # Success in half-open state, close the circuit
+                # Success in half-open state, close the circuit and forget
+                # the failures that tripped it
                 cb["state"] = "closed"
-                cb["failure_count"] = 0
+                cb["half_open_failures"] = 0
+                cb["consecutive_trips"] = 0
+                cb["last_delay"] = None
+                cb["events"].clear()
                 cb["last_success"] = time.time()
                 
             elif cb["state"] == "closed":
                 cb["last_success"] = time.time()
+            cb["events"].append((now, True, latency))
     
-    def _record_failure(self, service: str) -> None:
+    def _record_failure(self, service: str, latency: Optional[float] = None) -> None:
         """Record a failed operation for a service."""
-        with self.lock:
-            cb = self.circuit_breakers[service]
-            cb["failure_count"] += 1
+        cb = self.circuit_breakers[service]
+        with cb["_lock"]:
+            now = time.monotonic()
+            cb["events"].append((now, False, latency))
             cb["last_failure"] = time.time()
             
             if cb["state"] == "half-open":
                 # Failure in half-open state, reopen the circuit
-                cb["state"] = "open"
-                cb["trip_time"] = time.time()
-                self.metrics["circuit_breaker_trips"] += 1
+                cb["half_open_failures"] += 1
+                self._trip(cb, now)
                 
             elif cb["state"] == "closed":
-                # Check if we've exceeded the failure threshold
-                if cb["failure_count"] >= self.config["circuit_breaker"]["failure_threshold"]:
-                    cb["state"] = "open"
-                    cb["trip_time"] = time.time()
-                    self.metrics["circuit_breaker_trips"] += 1
+                # Trip on the recent error rate, not a lifetime count, so
+                # rare failures of a healthy service never add up
+                stats = self._window_stats(cb, now)
+                config = self.config["circuit_breaker"]
+                if (stats["volume"] >= config["failure_threshold"]
+                        and stats["error_rate"] > config["error_threshold"]):
+                    self._trip(cb, now)
+    
+    def _trip(self, cb: Dict[str, Any], now: float) -> None:
+        """
+        Open a circuit breaker; the caller holds cb["_lock"].
+        
+        The delay before the next half-open attempt uses decorrelated
+        jitter, so breakers that trip together don't all retry together,
+        and grows while the service keeps failing.
+        """
+        config = self.config["circuit_breaker"]
+        base = config["reset_timeout"]
+        delay = min(config["max_reset_timeout"], random.uniform(base, (cb["last_delay"] or base) * 3))
+        cb["state"] = "open"
+        cb["trip_time"] = now
+        cb["next_probe_after"] = now + delay
+        cb["last_delay"] = delay
+        cb["consecutive_trips"] += 1
+        self._increment_metric("circuit_breaker_trips")
+    
+    def _window_stats(self, cb: Dict[str, Any], now: float) -> Dict[str, Any]:
+        """
+        Outcome statistics over a circuit breaker's sliding window.
+        
+        Drops events older than the window; the caller holds cb["_lock"].
+        
+        Returns:
+            Dict with the event volume, error rate and p95 latency (None
+            if no latencies were recorded).
+        """
+        events = cb["events"]
+        horizon = now - self.config["circuit_breaker"]["window"]
+        while events and events[0][0] < horizon:
+            events.popleft()
+        
+        volume = len(events)
+        failures = sum(1 for _, ok, _ in events if not ok)
+        latencies = sorted(latency for _, _, latency in events if latency is not None)
+        return {
+            "volume": volume,
+            "error_rate": failures / volume if volume else 0.0,
+            "p95_latency": latencies[int(0.95 * (len(latencies) - 1))] if latencies else None,
+        }
+    
+    def _increment_metric(self, name: str) -> None:
+        """Increment one of the service metrics counters."""
+        with self._metrics_lock:
+            self.metrics[name] += 1
     
     def _get_cached_result(self, key: str) -> Optional[Dict]:
-        """Get a cached health check result."""
-        with self.lock:
-            if key in self.cache:
-                cached = self.cache[key]
-                if time.time() - cached["timestamp"] < self.config["cache_ttl"]:
-                    return cached["data"]
-        return None
+        """
+        Get a cached health check result.
+        
+        Results up to twice the cache TTL old are still returned
+        (stale-while-revalidate); the first caller to see a stale result
+        schedules one background refresh, so no caller waits on the probes.
+        """
+        with self._cache_lock:
+            cached = self.cache.get(key)
+            if cached is None:
+                return None
+            age = time.monotonic() - cached["mono"]
+            ttl = self.config["cache_ttl"]
+            self.cache.move_to_end(key)
+            if age < ttl:
+                return cached["data"]
+            if age >= 2 * ttl or key not in self._refreshers:
+                return None
+            if not cached.get("refreshing"):
+                cached["refreshing"] = True
+                self._refresh_executor.submit(self._refresh, key)
+            return cached["data"]
+    
+    def _singleflight(self, key: str) -> Dict:
+        """
+        Run the probe behind a cache key, at most one at a time.
+        
+        Callers arriving while the probe runs wait for it and share its
+        result, and a probe is never started within min_probe_interval of
+        the previous one while any cached result exists, so a burst of
+        polls costs a single probe.
+        """
+        with self._cache_lock:
+            cached = self.cache.get(key)
+            last = self._last_probe.get(key)
+            if (cached is not None and last is not None
+                    and time.monotonic() - last < self.config["min_probe_interval"]):
+                return cached["data"]
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+                self._last_probe[key] = time.monotonic()
+        
+        if not leader:
+            event.wait(timeout=self._max_check_time)
+            with self._cache_lock:
+                cached = self.cache.get(key)
+            if cached is not None:
+                return cached["data"]
+            # The probe we waited on failed; run our own
+            return self._refreshers[key]()
+        
+        try:
+            return self._refreshers[key]()
+        finally:
+            with self._cache_lock:
+                del self._inflight[key]
+            event.set()
+    
+    def _refresh(self, key: str) -> None:
+        """Recompute a cached result in the background."""
+        try:
+            self._singleflight(key)
+        except Exception as e:
+            logger.error(f"Background refresh of {key} failed: {str(e)}")
+        finally:
+            # Allow another refresh if this one failed or was rate limited
+            with self._cache_lock:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    cached["refreshing"] = False
     
     def _cache_result(self, key: str, data: Dict) -> None:
         """Cache a health check result."""
-        with self.lock:
+        with self._cache_lock:
             self.cache[key] = {
                 "data": data,
-                "timestamp": time.time()
+                "timestamp": time.time(),
+                "mono": time.monotonic()
             }
+            self.cache.move_to_end(key)
+            while len(self.cache) > self._cache_max:
+                self.cache.popitem(last=False)
 
-# Singleton instance
-health_service = HealthService()
+@functools.lru_cache(maxsize=1)
+def get_health_service() -> HealthService:
+    """Shared HealthService, created on first use rather than at import time."""
+    return HealthService()
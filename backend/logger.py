@@ -8,12 +8,302 @@ import logging
 import json
 import time
 from pathlib import Path
-from logging.handlers import RotatingFileHandler, QueueHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import threading
 import queue
-from datetime import datetime
 import traceback
+import datetime
 import atexit
+from collections import defaultdict, deque
+from itertools import islice
+from operator import itemgetter
+
+# Conditional import for faster JSON serialization of log entries
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_default(obj):
+    """Serialize values the JSON encoders don't handle natively"""
+    if isinstance(obj, traceback.TracebackException):
+        # Buffered tracebacks are only rendered when they are written out
+        return list(obj.format())
+    if isinstance(obj, (datetime.date, datetime.time)):
+        # Matches orjson's native output
+        return obj.isoformat()
+    # Paths, exceptions, Decimals etc. are logged as text rather than
+    # failing the whole record
+    return str(obj)
+
+if ORJSON_AVAILABLE:
+    def _dumps_bytes(obj):
+        return orjson.dumps(obj, default=_json_default)
+
+    def _dumps(obj):
+        return orjson.dumps(obj, default=_json_default).decode("utf-8")
+else:
+    def _dumps_bytes(obj):
+        return json.dumps(obj, default=_json_default).encode("utf-8")
+
+    def _dumps(obj):
+        return json.dumps(obj, default=_json_default)
+
+
+# Most chunks a single writev() call will accept
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+
+
+def _write_all(fd, pending):
+    """
+    Write the chunks in the pending deque to fd in order, gathering up to
+    _IOV_MAX of them into each writev() call so they don't need to be
+    concatenated first. Chunks are removed from pending as they are written,
+    so if a write fails pending holds exactly the bytes not yet on disk.
+    """
+    while pending:
+        if hasattr(os, "writev"):
+            written = os.writev(fd, list(islice(pending, _IOV_MAX)))
+        else:
+            written = os.write(fd, pending[0])
+        # Drop fully written chunks and trim a partially written one
+        while written:
+            size = len(pending[0])
+            if written >= size:
+                written -= size
+                pending.popleft()
+            else:
+                pending[0] = memoryview(pending[0])[written:]
+                written = 0
+
+
+def _iso_timestamp(now=None):
+    """Local-time ISO 8601 timestamp with microseconds, without building a datetime"""
+    if now is None:
+        now = time.time()
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now)) + f".{int((now % 1) * 1e6):06d}"
+
+
+def _buffer_entry_dict(entry):
+    """Expand a buffered entry tuple into the dict written to the buffer file"""
+    created, level, message, data, exception, _ = entry
+    record = {
+        "timestamp": _iso_timestamp(created),
+        "level": level,
+        "message": message,
+        "data": data,
+    }
+    if exception is not None:
+        record["exception"] = exception
+    return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Render a LogRecord as one JSON object per line"""
+    
+    def format(self, record):
+        return _dumps(self._entry(record))
+    
+    def format_bytes(self, record):
+        """Like format(), but returns the UTF-8 encoded bytes"""
+        return _dumps_bytes(self._entry(record))
+    
+    def _entry(self, record):
+        entry = {
+            "timestamp": _iso_timestamp(record.created),
+            "level": record.levelname,
+            "message": record.getMessage()
+        }
+        
+        data = getattr(record, "data", None)
+        if data:
+            entry["data"] = data if isinstance(data, dict) else {"value": str(data)}
+        
+        if record.exc_info and record.exc_info[0] is not None:
+            exc_type, exc_value, exc_traceback = record.exc_info
+            entry["exception"] = {
+                "type": exc_type.__name__,
+                "message": str(exc_value),
+                "traceback": traceback.format_exception(exc_type, exc_value, exc_traceback)
+            }
+        
+        return entry
+
+
+class TextFormatter(logging.Formatter):
+    """Plain-text formatter that appends the record's data, if any, to the line"""
+    
+    def formatMessage(self, record):
+        line = super().formatMessage(record)
+        data = getattr(record, "data", None)
+        return f"{line} - {data}" if data else line
+
+
+class _BufferOnError:
+    """
+    Handler mixin that passes records it fails to write (disk full, a failed
+    rotation) to on_error instead of printing a traceback to stderr. The
+    handlers run on the listener thread, so this is how write failures
+    still reach FallbackLogger's in-memory buffer.
+    """
+    
+    on_error = None  # callable(record), set by FallbackLogger
+    
+    def handleError(self, record):
+        if self.on_error is None:
+            super().handleError(record)
+            return
+        try:
+            self.on_error(record)
+        except Exception:
+            super().handleError(record)
+
+
+class _FileHandler(_BufferOnError, logging.FileHandler):
+    """logging.FileHandler whose failed records go to on_error"""
+
+
+class BufferedRotatingFileHandler(_BufferOnError, RotatingFileHandler):
+    """
+    RotatingFileHandler that writes through a large in-memory buffer instead
+    of flushing after every record. The buffer is flushed when it fills, on
+    rollover and close, whenever flush() is called, and right away for
+    ERROR and above so failures reach disk before a crash. Records it fails
+    to write go to on_error when that is set.
+    """
+    
+    def __init__(self, filename, maxBytes=0, backupCount=0, encoding=None, buffer_size=1 << 20):
+        self.buffer_size = buffer_size
+        self._size = 0
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding)
+    
+    def _open(self):
+        stream = open(self.baseFilename, "ab", buffering=self.buffer_size)
+        # Track the size ourselves; the stock rollover check seeks the
+        # stream on every record, which would flush the buffer
+        self._size = os.fstat(stream.fileno()).st_size
+        return stream
+    
+    def emit(self, record):
+        try:
+            if isinstance(self.formatter, JsonFormatter):
+                # Serialize straight to bytes instead of a str that would
+                # just be encoded again
+                data = self.formatter.format_bytes(record)
+            else:
+                data = self.format(record).encode(self.encoding or "utf-8", self.errors or "strict")
+            size = len(data) + 1
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self._size + size >= self.maxBytes:
+                self.doRollover()
+            self.stream.write(data)
+            self.stream.write(b"\n")
+            self._size += size
+            if record.levelno >= logging.ERROR:
+                self.stream.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class _EventQueue:
+    """
+    Queue for the single listener thread: a deque plus an Event that wakes
+    the listener when it's waiting. Unlike queue.Queue, producers don't take
+    a lock on every put; they only set the Event when it isn't already set.
+    The maxsize bound is approximate under concurrent puts.
+    """
+    
+    def __init__(self, maxsize=0):
+        self.maxsize = maxsize
+        self._items = deque()
+        self._ready = threading.Event()
+    
+    def put_nowait(self, item):
+        if self.maxsize > 0 and len(self._items) >= self.maxsize:
+            raise queue.Full
+        self.put(item)
+    
+    def put(self, item):
+        """Add an item regardless of maxsize"""
+        self._items.append(item)
+        if not self._ready.is_set():
+            self._ready.set()
+    
+    def get(self, block=True):
+        while True:
+            try:
+                return self._items.popleft()
+            except IndexError:
+                pass
+            if not block:
+                raise queue.Empty
+            self._ready.clear()
+            # Re-check after clearing: a put that saw the Event still set
+            # has already appended its item
+            if not self._items:
+                self._ready.wait()
+
+
+class _BatchQueueListener(QueueListener):
+    """QueueListener that also accepts a list of records as one queue item"""
+    
+    def enqueue_sentinel(self):
+        # Bypass maxsize so stop() works even when the queue is full
+        self.queue.put(self._sentinel)
+    
+    def handle(self, record):
+        if isinstance(record, list):
+            for item in record:
+                super().handle(item)
+        else:
+            super().handle(record)
+
+
+class _RecordQueueHandler(QueueHandler):
+    """
+    Queue records without formatting them, so the listener thread's handlers
+    do all the formatting (the stock QueueHandler formats in the caller).
+    
+    When the queue is full the record is dropped and counted rather than
+    blocking the caller.
+    """
+    
+    def __init__(self, queue):
+        super().__init__(queue)
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+    
+    def prepare(self, record):
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # A list is a batch from FallbackLogger.log_many
+            self.add_dropped(len(record) if isinstance(record, list) else 1)
+    
+    def add_dropped(self, count):
+        with self._dropped_lock:
+            self._dropped += count
+    
+    def take_dropped(self):
+        """Return the number of records dropped since the last call and reset it"""
+        with self._dropped_lock:
+            dropped, self._dropped = self._dropped, 0
+        return dropped
+
 
 class FallbackLogger:
     """
@@ -21,7 +311,8 @@ class FallbackLogger:
     1. Primary: Rotating file logger with JSON formatting
     2. Fallback 1: Simple file logger with text formatting
     3. Fallback 2: Console logger
-    4. Fallback 3: In-memory buffer with periodic flush to disk
+    4. Fallback 3: In-memory buffer with periodic flush to disk, for records
+       the file handlers fail to write and records that can't be created
     """
     
     def __init__(
@@ -34,19 +325,39 @@ class FallbackLogger:
         enable_console=True,
         json_format=True,
         buffer_size=1000,
-        flush_interval=60  # seconds
+        flush_interval=60,  # seconds
+        queue_maxsize=100_000
     ):
         """Initialize the fallback logger with multiple logging options"""
         self.name = name
         self.level = self._get_log_level(level)
+        self._level_names = {
+            lvl: logging.getLevelName(lvl)
+            for lvl in (logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR, logging.CRITICAL)
+        }
         self.max_size_bytes = max_size_mb * 1024 * 1024
         self.backup_count = backup_count
         self.enable_console = enable_console
         self.json_format = json_format
         self.buffer_size = buffer_size
         self.flush_interval = flush_interval
-        self.memory_buffer = []
-        self.buffer_lock = threading.Lock()
+        self.queue_maxsize = queue_maxsize
+        # Each logging thread appends to its own deque without locking; the
+        # flusher is the only consumer. Oldest entries drop off once a
+        # thread's deque holds buffer_size entries.
+        self._local = threading.local()
+        self._thread_buffers = []  # (thread, deque) pairs
+        self._registry_lock = threading.Lock()
+        # Serialized chunks a failed flush didn't get onto disk, per
+        # destination; written first by the next flush
+        self._unwritten = {}
+        self._flush_lock = threading.Lock()
+        # Append-only descriptors for the buffer files, keyed by destination
+        # and opened on first flush
+        self._buffer_fds = {}
+        self._listener = None
+        self._queue_handler = None
+        self._file_handler = None
         
         # Determine log directory with fallbacks
         self.log_dir = self._setup_log_directory(log_dir)
@@ -54,6 +365,9 @@ class FallbackLogger:
         # Setup the Python logger
         self.logger = logging.getLogger(name)
         self.logger.setLevel(self.level)
+        # Bound once so the per-call path skips the attribute lookups
+        self._is_enabled_for = self.logger.isEnabledFor
+        self._emit = self.logger.log
         
         # Clear any existing handlers
         if self.logger.hasHandlers():
@@ -62,8 +376,10 @@ class FallbackLogger:
         # Primary logging setup
         self.setup_primary_logging()
         
-        # Set up periodic flushing of in-memory buffer
-        self._start_flush_timer()
+        # Set up periodic flushing of in-memory buffer on one long-lived thread
+        self._stop_event = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name=f"{name}-log-flush", daemon=True)
+        self._flusher.start()
         
         # Register exit handler to ensure logs are flushed on shutdown
         atexit.register(self.shutdown)
@@ -127,30 +443,38 @@ class FallbackLogger:
                 return Path(".")
     
     def setup_primary_logging(self):
-        """Set up the primary logging mechanism with fallbacks"""
+        """
+        Set up the primary logging mechanism with fallbacks
+        
+        The handlers run on a QueueListener thread, so callers only pay for
+        putting the record on a queue, not for formatting and file writes.
+        """
+        handlers = []
         handlers_added = False
         
         # Try setting up rotating file handler
         try:
             file_path = self.log_dir / f"{self.name}.log"
-            file_handler = RotatingFileHandler(
+            file_handler = BufferedRotatingFileHandler(
                 filename=file_path,
                 maxBytes=self.max_size_bytes,
                 backupCount=self.backup_count,
                 encoding="utf-8"
             )
             file_handler.setLevel(self.level)
+            file_handler.on_error = self._buffer_failed_record
             
             # Use JSON formatting if enabled
             if self.json_format:
-                file_handler.setFormatter(logging.Formatter("%(message)s"))
+                file_handler.setFormatter(JsonFormatter())
             else:
-                formatter = logging.Formatter(
+                formatter = TextFormatter(
                     "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
                 )
                 file_handler.setFormatter(formatter)
             
-            self.logger.addHandler(file_handler)
+            handlers.append(file_handler)
+            self._file_handler = file_handler
             handlers_added = True
         except Exception as e:
             print(f"Warning: Could not set up rotating file handler: {e}")
@@ -159,16 +483,17 @@ class FallbackLogger:
         if not handlers_added:
             try:
                 simple_file_path = self.log_dir / f"{self.name}_simple.log"
-                simple_handler = logging.FileHandler(
+                simple_handler = _FileHandler(
                     filename=simple_file_path,
                     encoding="utf-8"
                 )
                 simple_handler.setLevel(self.level)
-                simple_formatter = logging.Formatter(
+                simple_handler.on_error = self._buffer_failed_record
+                simple_formatter = TextFormatter(
                     "%(asctime)s - %(levelname)s - %(message)s"
                 )
                 simple_handler.setFormatter(simple_formatter)
-                self.logger.addHandler(simple_handler)
+                handlers.append(simple_handler)
                 handlers_added = True
             except Exception as e:
                 print(f"Warning: Could not set up simple file handler: {e}")
@@ -177,54 +502,42 @@ class FallbackLogger:
         if self.enable_console or not handlers_added:
             console_handler = logging.StreamHandler()
             console_handler.setLevel(self.level)
-            console_formatter = logging.Formatter(
+            console_formatter = TextFormatter(
                 "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
             )
             console_handler.setFormatter(console_formatter)
-            self.logger.addHandler(console_handler)
+            handlers.append(console_handler)
             handlers_added = True
         
+        try:
+            # Bounded so a stalled disk can't grow the queue without limit;
+            # records beyond it are dropped and reported in a summary
+            self._log_queue = _EventQueue(self.queue_maxsize)
+            self._listener = _BatchQueueListener(self._log_queue, *handlers, respect_handler_level=True)
+            self._listener.start()
+            self._queue_handler = _RecordQueueHandler(self._log_queue)
+            self.logger.addHandler(self._queue_handler)
+        except Exception as e:
+            # Fall back to writing from the calling thread
+            print(f"Warning: Could not start background log writer: {e}")
+            self._listener = None
+            for handler in handlers:
+                self.logger.addHandler(handler)
+        
         # If all else fails, we'll use the in-memory buffer
         # which is always available as a final fallback
     
-    def _format_log_entry(self, level, message, data=None, exc_info=None):
-        """Format a log entry, with JSON if enabled"""
-        if self.json_format:
-            entry = {
-                "timestamp": datetime.now().isoformat(),
-                "level": logging.getLevelName(level),
-                "message": message
-            }
-            
-            if data:
-                if isinstance(data, dict):
-                    entry["data"] = data
-                else:
-                    entry["data"] = {"value": str(data)}
-            
-            if exc_info:
-                entry["exception"] = {
-                    "type": exc_info[0].__name__,
-                    "message": str(exc_info[1]),
-                    "traceback": traceback.format_exception(*exc_info)
-                }
-            
-            return json.dumps(entry)
-        else:
-            log_msg = message
-            if data:
-                log_msg += f" - {data}"
-            return log_msg
-    
-    def _add_to_buffer(self, level, message, data=None, exc_info=None):
-        """Add log entry to memory buffer"""
-        entry = {
-            "timestamp": datetime.now().isoformat(),
-            "level": level,
-            "message": message,
-            "data": data,
-        }
+    def _add_to_buffer(self, level, message, data=None, exc_info=None, destination=None):
+        """
+        Add log entry to memory buffer
         
+        Entries are stored as (created, level, message, data, exception,
+        destination) tuples and only turned into dicts when the buffer is
+        flushed. destination is a file name under the log directory and
+        defaults to the logger's buffer file.
+        """
+        created = time.time()
+        exception = None
         if exc_info:
             # Handle both boolean True and exception info tuple
             if exc_info is True:
@@ -233,74 +546,201 @@ class FallbackLogger:
             
             if isinstance(exc_info, (tuple, list)) and len(exc_info) == 3:
                 exc_type, exc_value, exc_traceback = exc_info
-                entry["exception"] = {
+                exception = {
                     "type": exc_type.__name__ if exc_type else "UnknownException",
                     "message": str(exc_value) if exc_value else "No exception message",
-                    "traceback": traceback.format_exception(exc_type, exc_value, exc_traceback) if exc_type and exc_value else []
+                    # Keeps only a frame summary, not the frames themselves;
+                    # the text is formatted when the buffer is flushed
+                    "traceback": traceback.TracebackException(
+                        exc_type, exc_value, exc_traceback, lookup_lines=False
+                    ) if exc_type and exc_value else []
                 }
             else:
                 # Fallback for unexpected exc_info format
-                entry["exception"] = {
+                exception = {
                     "type": "LoggerError",
                     "message": f"Invalid exc_info format: {type(exc_info)}",
                     "traceback": []
                 }
         
-        with self.buffer_lock:
-            self.memory_buffer.append(entry)
-            
-            # Trim buffer if it gets too large
-            if len(self.memory_buffer) > self.buffer_size:
-                self.memory_buffer = self.memory_buffer[-self.buffer_size:]
+        self._thread_buffer().append((created, level, message, data, exception, destination))
+    
+    def _buffer_failed_record(self, record):
+        """Keep a record a file handler failed to write (runs on the listener thread)"""
+        try:
+            message = record.getMessage()
+        except Exception:
+            message = str(record.msg)
+        self._add_to_buffer(record.levelno, message, getattr(record, "data", None), record.exc_info)
+        print(f"Warning: Failed to write log record, keeping it in the buffer: {sys.exc_info()[1]}")
+    
+    def _thread_buffer(self):
+        """Return the calling thread's buffer, registering it on first use"""
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = deque(maxlen=self.buffer_size)
+            self._local.buffer = buffer
+            with self._registry_lock:
+                self._thread_buffers.append((threading.current_thread(), buffer))
+        return buffer
+    
+    def _drain_buffers(self):
+        """Take every buffered entry, oldest first, and forget finished threads"""
+        entries = []
+        append = entries.append
+        with self._registry_lock:
+            registered = list(self._thread_buffers)
+        for _, buffer in registered:
+            # popleft is atomic, so this is safe against the owner appending
+            popleft = buffer.popleft
+            try:
+                while buffer:
+                    append(popleft())
+            except IndexError:
+                pass
+        with self._registry_lock:
+            self._thread_buffers = [
+                (thread, buffer) for thread, buffer in self._thread_buffers
+                if thread.is_alive() or buffer
+            ]
+        # Tuples sort by creation time first
+        entries.sort(key=itemgetter(0))
+        return entries
     
     def _flush_buffer(self):
-        """Flush the memory buffer to disk"""
-        with self.buffer_lock:
-            if not self.memory_buffer:
+        """Flush the memory buffer to disk in a single write"""
+        with self._flush_lock:
+            entries = self._drain_buffers()
+            if not entries and not self._unwritten:
                 return
             
+            # Group by destination so each file gets one contiguous write
+            buckets = defaultdict(list)
+            for entry in entries:
+                buckets[entry[5]].append(entry)
+            
+            for destination in set(buckets) | set(self._unwritten):
+                # Bytes left over from a failed write go out first
+                pending = self._unwritten.pop(destination, None) or deque()
+                try:
+                    for entry in buckets.get(destination, ()):
+                        pending.append(_dumps_bytes(_buffer_entry_dict(entry)) + b"\n")
+                    _write_all(self._buffer_fd(destination), pending)
+                except Exception as e:
+                    # If we can't flush, keep the newest unwritten chunks for
+                    # the next attempt but print warning; the file is reopened
+                    # then too
+                    print(f"Warning: Failed to flush log buffer to disk: {e}")
+                    self._close_buffer_fd(destination)
+                    while len(pending) > self.buffer_size:
+                        pending.popleft()
+                    self._unwritten[destination] = pending
+    
+    def _buffer_fd(self, destination):
+        """Return the append-only descriptor for a buffer destination, opening it if needed"""
+        fd = self._buffer_fds.get(destination)
+        if fd is None:
+            buffer_path = self.log_dir / (destination or f"{self.name}_buffer.log")
+            fd = os.open(buffer_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            self._buffer_fds[destination] = fd
+        return fd
+    
+    def _close_buffer_fd(self, destination):
+        """Close a buffer destination's descriptor if it is open"""
+        fd = self._buffer_fds.pop(destination, None)
+        if fd is not None:
             try:
-                buffer_path = self.log_dir / f"{self.name}_buffer.log"
-                with open(buffer_path, "a", encoding="utf-8") as f:
-                    for entry in self.memory_buffer:
-                        # Convert to JSON for storage
-                        f.write(json.dumps(entry) + "\n")
-                
-                # Clear the buffer
-                self.memory_buffer.clear()
-            except Exception as e:
-                # If we can't flush, keep the buffer but print warning
-                print(f"Warning: Failed to flush log buffer to disk: {e}")
+                os.close(fd)
+            except OSError:
+                pass
     
-    def _start_flush_timer(self):
-        """Start the timer to periodically flush the buffer"""
-        def flush_and_reschedule():
+    def _flush_loop(self):
+        """Periodically flush the buffer until shutdown is signalled"""
+        while not self._stop_event.wait(self.flush_interval):
+            self._report_dropped()
             self._flush_buffer()
-            # Schedule the next flush
-            timer = threading.Timer(self.flush_interval, flush_and_reschedule)
-            timer.daemon = True
-            timer.start()
-        
-        # Start the initial timer
-        timer = threading.Timer(self.flush_interval, flush_and_reschedule)
-        timer.daemon = True
-        timer.start()
+            if self._file_handler is not None:
+                try:
+                    self._file_handler.flush()
+                except Exception as e:
+                    # Keep the flusher alive; the handler retries on its next write
+                    print(f"Warning: Failed to flush log file: {e}")
+    
+    def _report_dropped(self):
+        """Queue one warning summarizing records dropped because the queue was full"""
+        handler = self._queue_handler
+        if handler is None:
+            return
+        dropped = handler.take_dropped()
+        if not dropped:
+            return
+        record = self.logger.makeRecord(
+            self.logger.name, logging.WARNING, __file__, 0,
+            f"Dropped {dropped} log records since last flush (queue full)", None, None,
+            extra={"data": {"dropped": dropped}}
+        )
+        try:
+            self._log_queue.put_nowait(record)
+        except queue.Full:
+            # Still full; carry the count over to the next cycle
+            handler.add_dropped(dropped)
     
     def log(self, level, message, data=None, exc_info=None):
-        """Log a message at the specified level with fallbacks"""
+        """
+        Log a message at the specified level with fallbacks
+        
+        Records below the logger's level return before any formatting. Data
+        that is expensive to build can be passed as a zero-argument callable,
+        which is only called when the record will actually be emitted.
+        """
+        if not self._is_enabled_for(level):
+            return
         try:
-            # Format the message
-            formatted_message = self._format_log_entry(level, message, data, exc_info)
+            if callable(data):
+                data = data()
             
-            # Try to log using the Python logger
-            self.logger.log(level, formatted_message, exc_info=exc_info)
+            # Formatting is left to the handlers' formatters
+            self._emit(level, message, exc_info=exc_info, extra={"data": data})
         except Exception as e:
-            # Fallback to memory buffer
-            self._add_to_buffer(level, message, data, exc_info)
+            # Fallback to memory buffer (a data callable that raised can't be stored)
+            self._add_to_buffer(level, message, None if callable(data) else data, exc_info)
             
             # Print to console as a last resort
             print(f"Logging error (falling back to buffer): {e}")
-            print(f"Original log: [{logging.getLevelName(level)}] {message}")
+            print(f"Original log: [{self._level_names.get(level, level)}] {message}")
+    
+    def log_many(self, level, records):
+        """
+        Log several messages at one level with a single queue operation
+        
+        Each record is a message string or a (message, data) pair. The batch
+        goes straight to this logger's own handlers, so logger filters and
+        propagation to ancestor loggers don't apply to it.
+        """
+        if not self._is_enabled_for(level):
+            return
+        handler = self._queue_handler
+        if handler is None:
+            for record in records:
+                message, data = (record, None) if isinstance(record, str) else record
+                self.log(level, message, data)
+            return
+        
+        make_record = self.logger.makeRecord
+        name = self.logger.name
+        batch = []
+        append = batch.append
+        for record in records:
+            message, data = (record, None) if isinstance(record, str) else record
+            try:
+                if callable(data):
+                    data = data()
+                append(make_record(name, level, __file__, 0, message, None, None, extra={"data": data}))
+            except Exception as e:
+                self._add_to_buffer(level, message, None if callable(data) else data)
+                print(f"Logging error (falling back to buffer): {e}")
+        if batch:
+            handler.enqueue(batch)
     
     def debug(self, message, data=None, exc_info=None):
         """Log a debug message"""
@@ -328,7 +768,18 @@ class FallbackLogger:
     
     def shutdown(self):
         """Shutdown the logger and ensure all logs are flushed"""
+        self._stop_event.set()
+        if self._flusher.is_alive() and self._flusher is not threading.current_thread():
+            self._flusher.join(timeout=2)
+        self._report_dropped()
         self._flush_buffer()
+        with self._flush_lock:
+            for destination in list(self._buffer_fds):
+                self._close_buffer_fd(destination)
+        if self._listener is not None:
+            # Drains the queue into the handlers before returning
+            self._listener.stop()
+            self._listener = None
         logging.shutdown()
 
 # Create a default logger instance
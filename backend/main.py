@@ -4,6 +4,8 @@ import os
 import json
 import time
 import logging
+import mimetypes
+import base64
 from fastapi import FastAPI, HTTPException, Depends, Request, Header, status
 from fastapi.responses import JSONResponse
 
@@ -24,16 +26,17 @@ logger.info(f"Startup completed with status: {startup_status['overall_status']}"
 # Now import other components - these will use fallbacks if primary modules failed
 from code_execution import code_executor, CodeExecutionResult
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import PlainTextResponse, JSONResponse
+from fastapi.responses import PlainTextResponse, JSONResponse, StreamingResponse, Response
 from pydantic import BaseModel
 import os
 import time
 from typing import Optional, Dict, Any, List
 
 from ollama_client import OllamaClient
-from executor import run_code
+from executor import run_code, stream_code
 from file_manager import file_manager
-from health_monitor import health_monitor
+from database import db as database
+from health_monitor import get_health_monitor
 from security import rate_limiter, verify_api_key, SecurityConfig
 from template_manager import template_manager
 from auth_manager import auth_manager
@@ -325,7 +328,12 @@ class OpenFolderRequest(BaseModel):
 class ProjectFileRequest(BaseModel):
     project_id: str
     file_path: str
+    prefetch: bool = False
     
+class ProjectFilesBatchRequest(BaseModel):
+    project_id: str
+    file_paths: List[str]
+
 class WriteProjectFileRequest(BaseModel):
     project_id: str
     file_path: str
@@ -339,6 +347,11 @@ async def read_root(api_key: str = Depends(verify_api_key)):
         "version": "1.0.0"
     }
 
+@app.get("/debug/pool")
+async def debug_pool(api_key: str = Depends(verify_api_key)):
+    """Report PostgreSQL connection pool usage for right-sizing"""
+    return database.get_pool_stats()
+
 
 # ---------- Authentication Endpoints ----------
 
@@ -483,8 +496,8 @@ async def create_project(request: TemplateRequest, api_key: str = Depends(verify
 async def health_check():
     """Comprehensive health check with fallbacks for all system components"""
     try:
-        # Run health check
-        result = health_monitor.check_health()
+        # Run health check without blocking the event loop
+        result = await get_health_monitor().check_health_async()
         return result
     except Exception as e:
         logger.error(f"Health check error: {e}")
@@ -499,6 +512,18 @@ async def health_check():
             language="python"
         )
 
+@app.get("/health/metrics")
+async def health_metrics():
+    """Latency and status metrics for each health probe"""
+    return get_health_monitor().get_metrics()
+
+@app.on_event("shutdown")
+async def shutdown_health_monitor():
+    """Close the health monitor's HTTP session on shutdown"""
+    # Only if a monitor was created; don't start one just to close it
+    if get_health_monitor.cache_info().currsize:
+        await get_health_monitor().close_async()
+
 @app.post("/chat")
 async def chat(request: ChatRequest, api_key: str = Depends(verify_api_key)):
     # Get preferred model from request or use default
@@ -695,6 +720,17 @@ async def execute_code(request: FileRequest, api_key: str = Depends(verify_api_k
             "method_used": "error_fallback"
         }
 
+@app.post("/execute/stream")
+async def execute_code_stream(request: FileRequest, api_key: str = Depends(verify_api_key)):
+    """Execute code in a container and stream its output as it is produced"""
+    language = "python"  # Default
+    if request.filename:
+        ext = os.path.splitext(request.filename)[1].lower()
+        if ext == ".js" or ext == ".jsx":
+            language = "javascript"
+    
+    return StreamingResponse(stream_code(request.content, language), media_type="text/plain")
+
 @app.post("/save")
 async def save_file(request: FileRequest, api_key: str = Depends(verify_api_key)):
     try:
@@ -796,6 +832,17 @@ async def open_folder(request: OpenFolderRequest, api_key: str = Depends(verify_
             }
         )
 
+@app.post("/project/open_folder/stream")
+async def open_folder_stream(request: OpenFolderRequest, api_key: str = Depends(verify_api_key)):
+    """
+    Open a folder as a project and stream its files as NDJSON while the
+    scan is still running, so clients can start rendering immediately.
+    """
+    return StreamingResponse(
+        file_manager.open_folder_stream(request.folder_path),
+        media_type="application/x-ndjson"
+    )
+
 @app.get("/project/{project_id}/files")
 async def get_project_files(project_id: str, api_key: str = Depends(verify_api_key)):
     """
@@ -826,11 +873,16 @@ async def read_project_file(request: ProjectFileRequest, api_key: str = Depends(
     Read a file from an opened project.
     """
     try:
-        result = file_manager.read_project_file(request.project_id, request.file_path)
+        result = file_manager.read_project_file(request.project_id, request.file_path, prefetch=request.prefetch)
         
         if not result.get("success", False):
             logger.warning(f"Error reading project file: {result.get('error', 'Unknown error')}")
             return JSONResponse(status_code=404, content=result)
+        
+        # Binary files are sent as-is rather than mangled into JSON text
+        if result.get("binary"):
+            media_type = mimetypes.guess_type(result["name"])[0] or "application/octet-stream"
+            return Response(content=result["content"], media_type=media_type)
             
         return result
     except Exception as e:
@@ -844,6 +896,36 @@ async def read_project_file(request: ProjectFileRequest, api_key: str = Depends(
             }
         )
 
+@app.post("/project/file/read_batch")
+async def read_project_files_batch(request: ProjectFilesBatchRequest, api_key: str = Depends(verify_api_key)):
+    """
+    Read several files from an opened project in a single batched request.
+    """
+    try:
+        result = file_manager.read_project_files_batch(request.project_id, request.file_paths)
+        
+        if not result.get("success", False):
+            logger.warning(f"Error reading project files: {result.get('error', 'Unknown error')}")
+            return JSONResponse(status_code=404, content=result)
+        
+        # Binary files can't go into JSON as raw bytes, so they are sent as base64
+        for entry in result["files"]:
+            if entry.get("binary"):
+                entry["content"] = base64.b64encode(entry["content"]).decode("ascii")
+                entry["encoding"] = "base64"
+            
+        return result
+    except Exception as e:
+        logger.error(f"Error in read_project_files_batch endpoint: {e}")
+        return JSONResponse(
+            status_code=500, 
+            content={
+                "success": False, 
+                "error": str(e), 
+                "message": "Failed to read project files."
+            }
+        )
+
 @app.post("/project/file/write")
 async def write_project_file(request: WriteProjectFileRequest, api_key: str = Depends(verify_api_key)):
     """
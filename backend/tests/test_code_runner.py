@@ -0,0 +1,145 @@
+import os
+import unittest
+import sys
+import socket
+import threading
+from unittest.mock import patch, MagicMock
+
+# Add parent directory to path to import executor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import executor
+
+# Larger than a pipe buffer and than most argv limits
+LARGE_CODE = "x = 1\n" * 200000 + "print('done', x)\n"
+
+class TestStdinExecution(unittest.TestCase):
+    """Test that code reaches the interpreter through stdin"""
+
+    def test_local_script_large_code(self):
+        """Test that code of any size runs through the stdin pipe"""
+        result = executor._run_local_script(sys.executable, LARGE_CODE)
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout, b"done 1\n")
+
+    def test_local_script_reports_errors(self):
+        """Test that stderr and the exit status come back as bytes"""
+        result = executor._run_local_script(sys.executable, "import sys\nsys.exit('boom')\n")
+        self.assertEqual(result.returncode, 1)
+        self.assertIn(b"boom", result.stderr)
+
+    def test_container_receives_code_on_stdin(self):
+        """Test that the code is written to the attach socket and stdin is closed"""
+        ours, theirs = socket.socketpair()
+        client = MagicMock()
+        container = client.containers.create.return_value
+        container.attach_socket.return_value = ours
+
+        received = []
+        reader = threading.Thread(target=lambda: received.append(self._read_all(theirs)))
+        reader.start()
+        result = executor._start_container_with_stdin(client, "python:3.10-slim", ["python", "-"], LARGE_CODE)
+        reader.join(5)
+        theirs.close()
+
+        self.assertIs(result, container)
+        container.start.assert_called_once_with()
+        self.assertEqual(received, [LARGE_CODE.encode("utf-8")])
+        self.assertTrue(client.containers.create.call_args.kwargs["stdin_open"])
+
+    def test_container_removed_when_attach_fails(self):
+        """Test that a container whose stdin can't be attached is removed"""
+        client = MagicMock()
+        container = client.containers.create.return_value
+        container.attach_socket.side_effect = OSError("attach failed")
+        with self.assertRaises(OSError):
+            executor._start_container_with_stdin(client, "python:3.10-slim", ["python", "-"], "print(1)")
+        container.remove.assert_called_once_with(force=True)
+
+    @staticmethod
+    def _read_all(sock):
+        """Read from sock until the writer shuts down its side"""
+        chunks = []
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                return b"".join(chunks)
+            chunks.append(data)
+
+class FakeContainer:
+    """Container stand-in whose log stream and exit status are scripted"""
+
+    name = "exec_test"
+
+    def __init__(self, chunks=(), status=0, block=False):
+        self.chunks = list(chunks)
+        self.status = status
+        self.block = block
+        self.killed = threading.Event()
+        self.removed = False
+
+    def logs(self, **kwargs):
+        yield from self.chunks
+        if self.block:
+            # A silent script: the stream only ends when the container dies
+            self.killed.wait(5)
+
+    def kill(self):
+        self.killed.set()
+
+    def wait(self, timeout=None):
+        return {"StatusCode": self.status}
+
+    def remove(self, force=False):
+        self.removed = True
+
+class TestContainerOutput(unittest.TestCase):
+    """Test streaming container output, exit status and the watchdog"""
+
+    def test_streams_chunks(self):
+        """Test that output is yielded chunk by chunk, decoding split characters"""
+        snowman = "☃".encode("utf-8")
+        container = FakeContainer([b"hello ", snowman[:1], snowman[1:] + b"\n"])
+        output = list(executor._iter_container_output(container, timeout=5))
+
+        self.assertEqual("".join(output), "hello ☃\n")
+        self.assertEqual(output[0], "hello ")
+        self.assertTrue(container.removed)
+        self.assertFalse(container.killed.is_set())
+
+    def test_nonzero_exit_status(self):
+        """Test that a failing script ends with its exit status"""
+        container = FakeContainer([b"Traceback ...\n"], status=2)
+        output = "".join(executor._iter_container_output(container, timeout=5))
+        self.assertEqual(output, "Traceback ...\n\nError (Exit code 2)")
+        self.assertTrue(container.removed)
+
+    def test_output_truncated(self):
+        """Test that output past MAX_OUTPUT_BYTES is cut off and the container killed"""
+        container = FakeContainer([b"a" * 600, b"b" * 600, b"c" * 600])
+        with patch.object(executor, "MAX_OUTPUT_BYTES", 1000):
+            output = "".join(executor._iter_container_output(container, timeout=5))
+
+        self.assertEqual(output, "a" * 600 + "b" * 400 + "\n[Output truncated at 1000 bytes]")
+        self.assertTrue(container.killed.is_set())
+        self.assertTrue(container.removed)
+
+    def test_watchdog_kills_silent_container(self):
+        """Test that a container past its timeout is killed even without output"""
+        container = FakeContainer([b"started\n"], status=137, block=True)
+        output = "".join(executor._iter_container_output(container, timeout=0.2))
+
+        self.assertTrue(container.killed.is_set())
+        self.assertEqual(output, "started\n\nExecution timed out (0.2 seconds)")
+        self.assertTrue(container.removed)
+
+    def test_closing_early_removes_container(self):
+        """Test that a consumer stopping early still removes the container"""
+        container = FakeContainer([b"one", b"two"])
+        stream = executor._iter_container_output(container, timeout=5)
+        self.assertEqual(next(stream), "one")
+        stream.close()
+        self.assertTrue(container.removed)
+
+if __name__ == '__main__':
+    unittest.main()
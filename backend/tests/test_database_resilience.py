@@ -0,0 +1,178 @@
+import os
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import json
+import shutil
+import tempfile
+
+# Add parent directory to path to import database
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import CircuitBreaker, Database
+
+class TestJsonCache(unittest.TestCase):
+    """Test that the cached JSON database can't be modified through returned data"""
+
+    def setUp(self):
+        """Point a JSON-backed Database at a temporary file"""
+        self.test_dir = tempfile.mkdtemp()
+        self.json_path = os.path.join(self.test_dir, "db.json")
+
+        self.patchers = [
+            patch.object(database, "DB_TYPE", "json"),
+            patch.object(database, "JSON_DB_PATH", self.json_path),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+        self.db = Database()
+        self.assertEqual(self.db.db_type, "json")
+        self.assertTrue(self.db._save_json_data({
+            "projects": {"p1": {"name": "Original"}},
+            "files": {},
+            "executions": {}
+        }))
+
+    def tearDown(self):
+        """Clean up patches and temporary files"""
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_loaded_data_is_isolated(self):
+        """Test that mutating one read doesn't leak into the next"""
+        first = self.db._load_json_file()
+        first["projects"]["p1"]["name"] = "Mutated"
+        first["projects"]["p2"] = {"name": "Added"}
+
+        second = self.db._load_json_file()
+        self.assertEqual(second["projects"], {"p1": {"name": "Original"}})
+        self.assertIsNot(first, second)
+
+    def test_saved_data_is_isolated(self):
+        """Test that mutating a dict after saving it doesn't change the cache"""
+        data = self.db._get_json_data()
+        data["projects"]["p1"]["name"] = "Saved"
+        self.assertTrue(self.db._save_json_data(data))
+
+        data["projects"]["p1"]["name"] = "Changed after save"
+        self.assertEqual(self.db._get_json_data()["projects"]["p1"]["name"], "Saved")
+
+    def test_external_change_invalidates_cache(self):
+        """Test that a file rewritten outside the Database is re-read"""
+        self.db._load_json_file()
+        with open(self.json_path, "w") as f:
+            json.dump({"projects": {"p9": {"name": "External change"}}, "files": {}, "executions": {}}, f)
+
+        self.assertEqual(list(self.db._load_json_file()["projects"]), ["p9"])
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test circuit breaker trip and recovery"""
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=3, recovery_time=30)
+
+    def _expire_recovery_time(self):
+        """Pretend the last failure happened longer ago than recovery_time"""
+        self.breaker.last_failure_time -= self.breaker.recovery_time + 1
+
+    def test_trips_at_threshold(self):
+        """Test that the breaker opens after failure_threshold failures"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "CLOSED")
+        self.assertTrue(self.breaker.is_allowed())
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "OPEN")
+        self.assertFalse(self.breaker.is_allowed())
+        self.assertFalse(self.breaker.would_allow())
+
+    def test_success_resets_failure_count(self):
+        """Test that a success while closed clears earlier failures"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "CLOSED")
+
+    def test_recovers_through_half_open(self):
+        """Test OPEN -> HALF_OPEN after recovery_time, then CLOSED on success"""
+        for _ in range(3):
+            self.breaker.record_failure()
+        self._expire_recovery_time()
+
+        # would_allow() reports the recovery without changing state
+        self.assertTrue(self.breaker.would_allow())
+        self.assertEqual(self.breaker.state, "OPEN")
+
+        self.assertTrue(self.breaker.is_allowed())
+        self.assertEqual(self.breaker.state, "HALF_OPEN")
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, "CLOSED")
+        self.assertEqual(self.breaker.failure_count, 0)
+
+    def test_half_open_failure_reopens(self):
+        """Test that a failed trial request while half-open reopens the breaker"""
+        for _ in range(3):
+            self.breaker.record_failure()
+        self._expire_recovery_time()
+        self.assertTrue(self.breaker.is_allowed())
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "OPEN")
+        self.assertFalse(self.breaker.is_allowed())
+
+class TestStatusProbe(unittest.TestCase):
+    """Test that get_status observes the PostgreSQL breaker without changing it"""
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=3, recovery_time=30)
+        self.breaker_patcher = patch.object(database, "pg_circuit", self.breaker)
+        self.breaker_patcher.start()
+
+        # Only the attributes get_status reads; no real pool is needed
+        self.db = Database.__new__(Database)
+        self.db.db_type = "postgres"
+        self.db.pg_pool = MagicMock()
+        self.db.failed_operations = 0
+
+    def tearDown(self):
+        self.breaker_patcher.stop()
+
+    def test_successful_probe_keeps_failure_count(self):
+        """Test a healthy status poll doesn't reset failures from real operations"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        with patch.object(Database, "_get_pg_connection", return_value=MagicMock()):
+            status = self.db.get_status()
+
+        self.assertTrue(status["healthy"])
+        self.assertEqual(self.breaker.failure_count, 2)
+        self.assertEqual(self.breaker.state, "CLOSED")
+
+    def test_failed_probe_doesnt_trip(self):
+        """Test failing status polls don't count towards opening the breaker"""
+        with patch.object(Database, "_get_pg_connection", side_effect=Exception("down")):
+            for _ in range(5):
+                self.assertFalse(self.db.get_status()["healthy"])
+
+        self.assertEqual(self.breaker.failure_count, 0)
+        self.assertEqual(self.breaker.state, "CLOSED")
+
+    def test_open_breaker_skips_probe(self):
+        """Test an open breaker is reported without a connection attempt or a state change"""
+        for _ in range(3):
+            self.breaker.record_failure()
+        with patch.object(Database, "_get_pg_connection") as get_connection:
+            status = self.db.get_status()
+
+        get_connection.assert_not_called()
+        self.assertEqual(status["circuit_state"], "OPEN")
+        self.assertEqual(self.breaker.state, "OPEN")
+
+if __name__ == '__main__':
+    unittest.main()
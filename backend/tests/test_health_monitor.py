@@ -0,0 +1,225 @@
+import os
+import unittest
+import sys
+import asyncio
+import errno
+import socket
+import threading
+import time
+from unittest.mock import patch
+
+# Add parent directory to path to import health_monitor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from health_monitor import HAS_AIOHTTP, HealthMonitor, _is_refusal
+
+HEALTHY = {"status": "healthy"}
+
+class HealthMonitorTestCase(unittest.TestCase):
+    """Base class creating a HealthMonitor whose background probe doesn't run code"""
+
+    env = {}
+
+    def setUp(self):
+        patchers = [
+            patch.dict(os.environ, self.env),
+            patch.object(HealthMonitor, "_check_code_execution", return_value=HEALTHY),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.monitor = HealthMonitor()
+
+    def tearDown(self):
+        self.monitor._bg_stop.set()
+        self.monitor._executor.shutdown(wait=True)
+
+class TestCoalescedChecks(HealthMonitorTestCase):
+    """Test that concurrent health checks share the one in flight"""
+
+    def setUp(self):
+        super().setUp()
+        self.runs = 0
+
+    def _slow_checks(self):
+        """Stand-in for _run_health_checks that counts runs"""
+        self.runs += 1
+        time.sleep(0.2)
+        return {"status": "healthy", "checks": {"ollama": HEALTHY}}
+
+    async def _slow_checks_async(self):
+        self.runs += 1
+        await asyncio.sleep(0.2)
+        return {"status": "healthy", "checks": {"ollama": HEALTHY}}
+
+    def test_concurrent_callers_share_one_check(self):
+        """Test that threads arriving during a check wait for its result"""
+        self.monitor._run_health_checks = self._slow_checks
+        results = []
+        barrier = threading.Barrier(8)
+
+        def call():
+            barrier.wait()
+            results.append(self.monitor.check_health())
+
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(self.runs, 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result["status"] == "healthy" for result in results))
+        self.assertEqual(self.monitor._inflight, {})
+
+        # Followers get their own copy they can extend
+        results[0]["checks"]["extra"] = HEALTHY
+        self.assertTrue(all("extra" not in result["checks"] for result in results[1:]))
+
+    def test_sequential_calls_run_again(self):
+        """Test that a finished check isn't reused by later callers"""
+        self.monitor._run_health_checks = self._slow_checks
+        self.monitor.check_health()
+        self.monitor.check_health()
+        self.assertEqual(self.runs, 2)
+
+    def test_async_callers_share_one_check(self):
+        """Test that coroutines on one loop share the in-flight check"""
+        self.monitor._run_health_checks_async = self._slow_checks_async
+
+        async def main():
+            return await asyncio.gather(*(self.monitor.check_health_async() for _ in range(5)))
+
+        results = asyncio.run(main())
+        self.assertEqual(self.runs, 1)
+        self.assertEqual(len(results), 5)
+
+class TestComponentTtls(HealthMonitorTestCase):
+    """Test per-component TTLs and their environment overrides"""
+
+    env = {"HEALTH_CACHE_TTL": "60", "HEALTH_DOCKER_TTL": "5"}
+
+    def test_defaults_scale_with_cache_ttl(self):
+        """Test that HEALTH_CACHE_TTL sets the default TTL of each component"""
+        ttls = self.monitor.ttls
+        self.assertEqual(self.monitor.cache_ttl, 60)
+        self.assertEqual(ttls["ollama"], 60)
+        self.assertEqual(ttls["database"], 20)
+        self.assertEqual(ttls["code_execution"], 120)
+        self.assertEqual(ttls["ollama_models"], 600)
+
+    def test_component_override(self):
+        """Test that HEALTH_<COMPONENT>_TTL overrides one component"""
+        self.assertEqual(self.monitor.ttls["docker"], 5)
+
+    def test_entries_expire_per_component(self):
+        """Test that each cached result expires after its own TTL"""
+        calls = []
+
+        def check():
+            calls.append(1)
+            return HEALTHY
+
+        now = time.monotonic()
+        with patch("health_monitor.time.monotonic", return_value=now):
+            self.monitor._cached("docker", check)
+            self.monitor._cached("ollama", check)
+            self.monitor._cached("docker", check)
+        self.assertEqual(len(calls), 2)
+
+        # Docker's 5s TTL has run out, Ollama's 60s hasn't
+        with patch("health_monitor.time.monotonic", return_value=now + 10):
+            self.assertIsNone(self.monitor._get_cached("docker"))
+            self.assertIs(self.monitor._get_cached("ollama"), HEALTHY)
+            self.monitor._cached("docker", check)
+        self.assertEqual(len(calls), 3)
+
+class TestTcpPreProbe(HealthMonitorTestCase):
+    """Test that only a definite refusal skips the Ollama HTTP probe"""
+
+    def setUp(self):
+        super().setUp()
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.open_port = self.listener.getsockname()[1]
+
+        # A port that was just released has nothing listening on it
+        closed = socket.socket()
+        closed.bind(("127.0.0.1", 0))
+        self.closed_port = closed.getsockname()[1]
+        closed.close()
+
+    def tearDown(self):
+        self.listener.close()
+        super().tearDown()
+
+    def test_is_refusal(self):
+        """Test which connect errors count as a refusal"""
+        self.assertTrue(_is_refusal(ConnectionRefusedError()))
+        self.assertTrue(_is_refusal(OSError(errno.ENETUNREACH, "Network is unreachable")))
+        self.assertFalse(_is_refusal(socket.timeout("timed out")))
+        self.assertFalse(_is_refusal(OSError(errno.ETIMEDOUT, "Connection timed out")))
+
+    def test_tcp_refused(self):
+        """Test the blocking pre-probe against open, closed and slow ports"""
+        self.assertFalse(self.monitor._tcp_refused("127.0.0.1", self.open_port))
+        self.assertTrue(self.monitor._tcp_refused("127.0.0.1", self.closed_port))
+        with patch("health_monitor.socket.create_connection", side_effect=socket.timeout("timed out")):
+            self.assertFalse(self.monitor._tcp_refused("127.0.0.1", self.open_port))
+
+    def test_tcp_refused_async(self):
+        """Test the event-loop pre-probe against open and closed ports"""
+        self.assertFalse(asyncio.run(self.monitor._tcp_refused_async("127.0.0.1", self.open_port)))
+        self.assertTrue(asyncio.run(self.monitor._tcp_refused_async("127.0.0.1", self.closed_port)))
+
+    def test_refused_ollama_skips_http(self):
+        """Test that a refusing Ollama is reported offline without an HTTP request"""
+        self.monitor._ollama_addr = ("127.0.0.1", self.closed_port)
+        with patch.object(self.monitor._http, "request") as request:
+            self.assertEqual(self.monitor._check_ollama()["status"], "offline")
+        request.assert_not_called()
+
+@unittest.skipUnless(HAS_AIOHTTP, "aiohttp not installed")
+class TestAioSessions(HealthMonitorTestCase):
+    """Test that each event loop gets its own aiohttp session"""
+
+    def test_session_reused_within_loop(self):
+        """Test that probes on one loop share a session until it is closed"""
+        async def main():
+            first = self.monitor._get_aio_session()
+            second = self.monitor._get_aio_session()
+            await self.monitor.close_async()
+            return first, second
+
+        first, second = asyncio.run(main())
+        self.assertIs(first, second)
+        self.assertTrue(first.closed)
+        self.assertEqual(self.monitor._aio_sessions, {})
+
+    def test_session_per_loop(self):
+        """Test that a new loop gets a new session and dead loops are forgotten"""
+        async def get_session():
+            return self.monitor._get_aio_session()
+
+        first = asyncio.run(get_session())
+        self.assertEqual(len(self.monitor._aio_sessions), 1)
+
+        async def main():
+            session = self.monitor._get_aio_session()
+            await self.monitor.close_async()
+            return session
+
+        second = asyncio.run(main())
+        self.assertIsNot(first, second)
+        self.assertEqual(self.monitor._aio_sessions, {})
+        asyncio.run(first.close())
+
+    def test_close_without_session(self):
+        """Test that closing on a loop that never probed does nothing"""
+        asyncio.run(self.monitor.close_async())
+        self.assertEqual(self.monitor._aio_sessions, {})
+
+if __name__ == '__main__':
+    unittest.main()
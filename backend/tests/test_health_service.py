@@ -0,0 +1,301 @@
+import os
+import unittest
+import sys
+import asyncio
+import errno
+import socket
+import threading
+import time
+import types
+from unittest.mock import patch, MagicMock
+
+# Add parent directory to path to import health_service
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from health_service import HealthService, _is_refusal
+
+class HealthServiceTestCase(unittest.TestCase):
+    """Base class creating a HealthService with probes replaced by counters"""
+
+    config = {"cache_ttl": 10, "min_probe_interval": 0}
+
+    def setUp(self):
+        self.service = HealthService(self.config)
+        self.probe_calls = 0
+        self.probe_lock = threading.Lock()
+        self.probe_delay = 0
+        self.service._refreshers["system_health"] = self._fake_probe
+
+    def tearDown(self):
+        self.service.close()
+
+    def _fake_probe(self):
+        """Stand-in for _probe_system_health that counts calls and caches its result"""
+        with self.probe_lock:
+            self.probe_calls += 1
+            result = {"status": "healthy", "probe": self.probe_calls}
+        time.sleep(self.probe_delay)
+        self.service._cache_result("system_health", result)
+        return result
+
+    def _age_cache(self, key, seconds):
+        """Make a cached entry look older than it is"""
+        self.service.cache[key]["mono"] -= seconds
+
+class TestStaleWhileRevalidate(HealthServiceTestCase):
+    """Test serving stale results while refreshing them in the background"""
+
+    def _wait_for_refresh(self):
+        # The refresh executor has one worker; an empty task queues behind it
+        self.service._refresh_executor.submit(lambda: None).result(timeout=5)
+
+    def test_fresh_result_served_from_cache(self):
+        """Test that a result within the TTL doesn't trigger a probe"""
+        first = self.service.check_system_health()
+        self.assertIs(self.service.check_system_health(), first)
+        self.assertEqual(self.probe_calls, 1)
+
+    def test_stale_result_served_and_refreshed_once(self):
+        """Test that a stale result is returned while one refresh runs"""
+        first = self.service.check_system_health()
+        self._age_cache("system_health", 15)
+
+        # Both callers get the stale data; only the first schedules a refresh
+        self.assertIs(self.service.check_system_health(), first)
+        self.assertIs(self.service.check_system_health(), first)
+        self._wait_for_refresh()
+
+        self.assertEqual(self.probe_calls, 2)
+        self.assertEqual(self.service.check_system_health()["probe"], 2)
+
+    def test_expired_result_probes_inline(self):
+        """Test that results older than twice the TTL are not served"""
+        self.service.check_system_health()
+        self._age_cache("system_health", 25)
+
+        self.assertEqual(self.service.check_system_health()["probe"], 2)
+        self.assertEqual(self.probe_calls, 2)
+
+class TestSingleflight(HealthServiceTestCase):
+    """Test that concurrent callers share one probe"""
+
+    def test_concurrent_callers_share_one_probe(self):
+        """Test that callers arriving during a probe wait for its result"""
+        self.probe_delay = 0.2
+        results = []
+        barrier = threading.Barrier(8)
+
+        def call():
+            barrier.wait()
+            results.append(self.service.check_system_health())
+
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(self.probe_calls, 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result["probe"] == 1 for result in results))
+
+    def test_min_probe_interval(self):
+        """Test that a probe isn't repeated within min_probe_interval"""
+        self.service.config["min_probe_interval"] = 60
+        self.service.check_system_health()
+        self._age_cache("system_health", 25)
+
+        # Expired, but the last probe was too recent to start another
+        self.assertEqual(self.service.check_system_health()["probe"], 1)
+        self.assertEqual(self.probe_calls, 1)
+
+class TestSlidingWindowBreaker(HealthServiceTestCase):
+    """Test that breakers trip on the recent error rate"""
+
+    config = {
+        "cache_ttl": 10,
+        "min_probe_interval": 0,
+        "circuit_breaker": {"failure_threshold": 3, "error_threshold": 0.5, "window": 60},
+    }
+
+    def _state(self):
+        return self.service.circuit_breakers["ollama"]["state"]
+
+    def test_trips_on_error_rate(self):
+        """Test that the breaker opens once enough recent outcomes failed"""
+        self.service._record_failure("ollama")
+        self.service._record_failure("ollama")
+        self.assertEqual(self._state(), "closed")  # below failure_threshold outcomes
+
+        self.service._record_failure("ollama")
+        self.assertEqual(self._state(), "open")
+        self.assertFalse(self.service._is_circuit_closed("ollama"))
+        self.assertEqual(self.service.metrics["circuit_breaker_trips"], 1)
+
+    def test_successes_keep_rate_below_threshold(self):
+        """Test that occasional failures of a healthy service don't trip it"""
+        for _ in range(3):
+            self.service._record_success("ollama")
+        self.service._record_failure("ollama")
+        self.service._record_failure("ollama")
+        self.assertEqual(self._state(), "closed")  # 2 of 5 failed
+
+    def test_old_outcomes_leave_the_window(self):
+        """Test that failures older than the window no longer count"""
+        self.service._record_failure("ollama")
+        self.service._record_failure("ollama")
+        events = self.service.circuit_breakers["ollama"]["events"]
+        aged = [(at - 120, ok, latency) for at, ok, latency in events]
+        events.clear()
+        events.extend(aged)
+
+        self.service._record_failure("ollama")
+        self.assertEqual(self._state(), "closed")
+        self.assertEqual(len(events), 1)
+
+class TestBreakerBackoff(HealthServiceTestCase):
+    """Test the jittered delay before half-open attempts"""
+
+    config = {
+        "cache_ttl": 10,
+        "min_probe_interval": 0,
+        "circuit_breaker": {
+            "failure_threshold": 1,
+            "error_threshold": 0.5,
+            "reset_timeout": 10,
+            "max_reset_timeout": 100,
+            "half_open_max_attempts": 1,
+        },
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.cb = self.service.circuit_breakers["ollama"]
+
+    def _retry_now(self):
+        """Let the breaker's backoff delay elapse"""
+        self.cb["next_probe_after"] = time.monotonic() - 1
+        self.assertTrue(self.service._is_circuit_closed("ollama"))
+        self.assertEqual(self.cb["state"], "half-open")
+
+    def test_delay_grows_with_repeated_trips(self):
+        """Test that each trip's delay is drawn from [reset_timeout, 3 * previous delay]"""
+        with patch("health_service.random.uniform", side_effect=lambda low, high: high) as uniform:
+            self.service._record_failure("ollama")
+            self.assertEqual(self.cb["last_delay"], 30)
+
+            self._retry_now()
+            self.service._record_failure("ollama")
+            self.assertEqual(self.cb["last_delay"], 90)
+
+            # Capped at max_reset_timeout
+            self._retry_now()
+            self.service._record_failure("ollama")
+            self.assertEqual(self.cb["last_delay"], 100)
+
+        self.assertEqual([c.args for c in uniform.call_args_list], [(10, 30), (10, 90), (10, 270)])
+        self.assertEqual(self.cb["consecutive_trips"], 3)
+
+    def test_delay_is_jittered(self):
+        """Test that trips use a random delay within the bounds"""
+        delays = set()
+        for _ in range(20):
+            self.cb["last_delay"] = None
+            self.service._trip(self.cb, time.monotonic())
+            self.assertTrue(10 <= self.cb["last_delay"] <= 30)
+            delays.add(self.cb["last_delay"])
+        self.assertGreater(len(delays), 1)
+
+    def test_half_open_success_resets_backoff(self):
+        """Test that recovering closes the breaker and starts the backoff over"""
+        self.service._record_failure("ollama")
+        self.assertFalse(self.service._is_circuit_closed("ollama"))
+
+        self._retry_now()
+        self.service._record_success("ollama")
+        self.assertEqual(self.cb["state"], "closed")
+        self.assertIsNone(self.cb["last_delay"])
+        self.assertEqual(self.cb["consecutive_trips"], 0)
+
+class TestTcpPreProbe(HealthServiceTestCase):
+    """Test that only a definite refusal skips the Ollama HTTP probe"""
+
+    def setUp(self):
+        super().setUp()
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.open_port = self.listener.getsockname()[1]
+
+        # A port that was just released has nothing listening on it
+        closed = socket.socket()
+        closed.bind(("127.0.0.1", 0))
+        self.closed_port = closed.getsockname()[1]
+        closed.close()
+
+    def tearDown(self):
+        self.listener.close()
+        super().tearDown()
+
+    def test_is_refusal(self):
+        """Test which connect errors count as a refusal"""
+        self.assertTrue(_is_refusal(ConnectionRefusedError()))
+        self.assertTrue(_is_refusal(OSError(errno.EHOSTUNREACH, "No route to host")))
+        self.assertFalse(_is_refusal(socket.timeout("timed out")))
+        self.assertFalse(_is_refusal(OSError(errno.ETIMEDOUT, "Connection timed out")))
+
+    def test_tcp_refused(self):
+        """Test the blocking pre-probe against open, closed and slow ports"""
+        self.assertFalse(self.service._tcp_refused("127.0.0.1", self.open_port))
+        self.assertTrue(self.service._tcp_refused("127.0.0.1", self.closed_port))
+        with patch("health_service.socket.create_connection", side_effect=socket.timeout("timed out")):
+            self.assertFalse(self.service._tcp_refused("127.0.0.1", self.open_port))
+
+    def test_tcp_refused_async(self):
+        """Test the event-loop pre-probe against open and closed ports"""
+        self.assertFalse(asyncio.run(self.service._tcp_refused_async("127.0.0.1", self.open_port)))
+        self.assertTrue(asyncio.run(self.service._tcp_refused_async("127.0.0.1", self.closed_port)))
+
+    def test_refused_endpoint_skips_http(self):
+        """Test that a refusing endpoint is ruled out without an HTTP request"""
+        self.service._ollama_urls = [
+            ("http://127.0.0.1", f"http://127.0.0.1:{self.closed_port}/api/tags", ("127.0.0.1", self.closed_port))
+        ]
+        with patch.object(self.service.session, "get") as get:
+            self.assertIsNone(self.service._fetch_ollama_tags())
+        get.assert_not_called()
+
+class TestPostgresProbeConnections(HealthServiceTestCase):
+    """Test that the Postgres probe never returns a broken connection to its pool"""
+
+    config = {
+        "cache_ttl": 10,
+        "min_probe_interval": 0,
+        "services": {"database": {"types": ["postgres"]}},
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.psycopg2 = types.SimpleNamespace(OperationalError=type("OperationalError", (Exception,), {}))
+        self.pool = MagicMock()
+        self.conn = self.pool.getconn.return_value
+        self.cursor = self.conn.cursor.return_value.__enter__.return_value
+        patcher = patch("health_service._get_psycopg2", return_value=self.psycopg2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service._get_pg_pool = lambda: self.pool
+
+    def test_healthy_connection_returned(self):
+        """Test that a connection that answered goes back to the pool open"""
+        self.cursor.fetchone.return_value = (1,)
+        self.assertEqual(self.service.check_database_health().status, "healthy")
+        self.pool.putconn.assert_called_once_with(self.conn, close=False)
+
+    def test_failed_connection_closed(self):
+        """Test that a connection that raised is closed rather than reused"""
+        self.cursor.execute.side_effect = Exception("connection already closed")
+        self.service.check_database_health()
+        self.pool.putconn.assert_called_once_with(self.conn, close=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import unittest
+import sys
+import queue
+import logging
+import shutil
+import tempfile
+import threading
+
+# Add parent directory to path to import logger
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logger import FallbackLogger, _EventQueue, _RecordQueueHandler
+
+class TestEventQueue(unittest.TestCase):
+    """Test the listener queue's wake-ups and bounds"""
+
+    def _consume(self, q, count, received):
+        """Thread target: get count items from q into received"""
+        for _ in range(count):
+            received.append(q.get())
+
+    def test_get_wakes_on_put(self):
+        """Test that a blocked get returns once an item is put"""
+        q = _EventQueue()
+        received = []
+        consumer = threading.Thread(target=self._consume, args=(q, 1, received), daemon=True)
+        consumer.start()
+
+        # Give the consumer time to block on the empty queue
+        consumer.join(0.05)
+        self.assertTrue(consumer.is_alive())
+
+        q.put("record")
+        consumer.join(5)
+        self.assertFalse(consumer.is_alive(), "get() missed the wake-up")
+        self.assertEqual(received, ["record"])
+
+    def test_concurrent_put_get(self):
+        """Test that no item or wake-up is lost with many producers"""
+        q = _EventQueue()
+        producers, per_producer = 8, 2000
+        received = []
+        consumer = threading.Thread(
+            target=self._consume, args=(q, producers * per_producer, received), daemon=True
+        )
+        consumer.start()
+
+        def produce(producer_id):
+            for i in range(per_producer):
+                q.put((producer_id, i))
+
+        threads = [threading.Thread(target=produce, args=(p,)) for p in range(producers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        consumer.join(10)
+        self.assertFalse(consumer.is_alive(), "get() missed a wake-up")
+        self.assertEqual(len(received), producers * per_producer)
+
+        # Each producer's items arrive in the order it put them
+        for p in range(producers):
+            self.assertEqual([i for pid, i in received if pid == p], list(range(per_producer)))
+
+    def test_get_nonblocking_empty(self):
+        """Test that a non-blocking get on an empty queue raises queue.Empty"""
+        q = _EventQueue()
+        with self.assertRaises(queue.Empty):
+            q.get(block=False)
+
+    def test_put_nowait_full(self):
+        """Test that put_nowait respects maxsize while put bypasses it"""
+        q = _EventQueue(maxsize=2)
+        q.put_nowait(1)
+        q.put_nowait(2)
+        with self.assertRaises(queue.Full):
+            q.put_nowait(3)
+
+        # put() is used for the stop sentinel and must always succeed
+        q.put("sentinel")
+        self.assertEqual([q.get(), q.get(), q.get()], [1, 2, "sentinel"])
+
+class TestRecordQueueHandler(unittest.TestCase):
+    """Test that records are dropped and counted when the queue is full"""
+
+    def _record(self, msg):
+        return logging.LogRecord("test", logging.INFO, __file__, 0, msg, None, None)
+
+    def test_drop_counting(self):
+        """Test dropped single records and batches are counted and reset"""
+        handler = _RecordQueueHandler(_EventQueue(maxsize=2))
+        handler.enqueue(self._record("one"))
+        handler.enqueue(self._record("two"))
+
+        # Queue is full: one record and a batch of two are dropped
+        handler.enqueue(self._record("three"))
+        handler.enqueue([self._record("four"), self._record("five")])
+
+        self.assertEqual(handler.take_dropped(), 3)
+        self.assertEqual(handler.take_dropped(), 0)
+        self.assertEqual([handler.queue.get().msg, handler.queue.get().msg], ["one", "two"])
+
+class _FullDisk:
+    """Stream stand-in whose writes fail as on a full disk"""
+
+    def write(self, data):
+        raise OSError(28, "No space left on device")
+
+    def flush(self):
+        raise OSError(28, "No space left on device")
+
+    def close(self):
+        pass
+
+class TestHandlerFailureFallback(unittest.TestCase):
+    """Test that records the file handler fails to write reach the buffer"""
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.logger = FallbackLogger(name="handler-failure-test", log_dir=self.log_dir,
+                                     enable_console=False, flush_interval=3600)
+
+    def tearDown(self):
+        self.logger.shutdown()
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+
+    def test_write_failure_goes_to_buffer(self):
+        """Test a write failure on the listener thread buffers the record"""
+        self.logger._file_handler.stream = _FullDisk()
+        self.logger.error("disk is full", {"attempt": 1})
+
+        # Stopping the listener drains the queue into the handlers
+        self.logger._listener.stop()
+        self.logger._listener = None
+
+        entries = [entry[1:4] for entry in self.logger._drain_buffers()]
+        self.assertIn((logging.ERROR, "disk is full", {"attempt": 1}), entries)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import os
+import unittest
+import sys
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path to import file_manager
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import file_manager
+from file_manager import FileManager
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\xff\xfe"
+
+class TestProjectFiles(unittest.TestCase):
+    """Test path validation and batch reads for opened projects"""
+
+    def setUp(self):
+        """Open a temporary folder as a project"""
+        self.test_dir = tempfile.mkdtemp()
+        self.project_root = os.path.join(self.test_dir, "project")
+        os.makedirs(os.path.join(self.project_root, "sub"))
+
+        for name, content in [("a.txt", b"alpha"), ("b.txt", b"bravo"),
+                              (os.path.join("sub", "c.txt"), b"charlie"),
+                              ("image.png", PNG_BYTES)]:
+            with open(os.path.join(self.project_root, name), "wb") as f:
+                f.write(content)
+
+        # Sibling folders sharing the project name as a prefix
+        os.makedirs(os.path.join(self.test_dir, "project-evil"))
+        with open(os.path.join(self.test_dir, "outside.txt"), "w") as f:
+            f.write("secret")
+
+        self.file_manager = FileManager()
+        result = self.file_manager.open_folder(self.project_root)
+        self.assertTrue(result["success"])
+        self.project_id = result["project_id"]
+        self.project = self.file_manager.open_projects[self.project_id]
+
+    def tearDown(self):
+        """Clean up temporary test directories"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_resolve_project_path_inside(self):
+        """Test that paths inside the project resolve under its root"""
+        resolved = self.file_manager._resolve_project_path(self.project, "sub/c.txt")
+        self.assertEqual(resolved, os.path.join(os.path.abspath(self.project_root), "sub", "c.txt"))
+
+        resolved = self.file_manager._resolve_project_path(self.project, "sub/../a.txt")
+        self.assertEqual(resolved, os.path.join(os.path.abspath(self.project_root), "a.txt"))
+
+    def test_resolve_project_path_escape(self):
+        """Test that paths escaping the project root are rejected"""
+        for path in ["../outside.txt", "sub/../../outside.txt", "../project-evil/x.txt",
+                     os.path.join(self.test_dir, "outside.txt"), "..", "."]:
+            with self.subTest(path=path):
+                self.assertIsNone(self.file_manager._resolve_project_path(self.project, path))
+
+    def test_batch_order_and_errors(self):
+        """Test that batch results follow request order with per-file errors"""
+        paths = ["b.txt", "missing.txt", "../outside.txt", "sub", "sub/c.txt", "image.png", "a.txt"]
+        result = self.file_manager.read_project_files_batch(self.project_id, paths)
+
+        self.assertTrue(result["success"])
+        files = result["files"]
+        self.assertEqual([f["path"] for f in files], paths)
+        self.assertEqual([f["success"] for f in files], [True, False, False, False, True, True, True])
+
+        self.assertEqual(files[0]["content"], "bravo")
+        self.assertEqual(files[0]["size"], 5)
+        self.assertFalse(files[0]["binary"])
+        for entry in files[1:4]:
+            self.assertIn("File not found or access denied", entry["error"])
+        self.assertEqual(files[4]["content"], "charlie")
+        self.assertEqual(files[6]["content"], "alpha")
+
+        # Binary files keep their raw bytes
+        self.assertTrue(files[5]["binary"])
+        self.assertEqual(files[5]["content"], PNG_BYTES)
+
+    def test_batch_unknown_project(self):
+        """Test batch read for a project that was never opened"""
+        result = self.file_manager.read_project_files_batch("no-such-project", ["a.txt"])
+        self.assertFalse(result["success"])
+        self.assertIn("Project not found", result["error"])
+
+    def test_batch_file_limit(self):
+        """Test that batches over MAX_BATCH_FILES are rejected outright"""
+        with patch.object(file_manager, "MAX_BATCH_FILES", 2):
+            result = self.file_manager.read_project_files_batch(self.project_id, ["a.txt", "b.txt", "sub/c.txt"])
+        self.assertFalse(result["success"])
+        self.assertIn("Too many files", result["error"])
+
+    def test_batch_byte_limit(self):
+        """Test that files past MAX_BATCH_BYTES come back as errors"""
+        with patch.object(file_manager, "MAX_BATCH_BYTES", 8):
+            result = self.file_manager.read_project_files_batch(self.project_id, ["a.txt", "b.txt"])
+        self.assertTrue(result["success"])
+        first, second = result["files"]
+        self.assertTrue(first["success"])
+        self.assertEqual(first["content"], "alpha")
+        self.assertFalse(second["success"])
+        self.assertIn("Error reading file", second["error"])
+
+class TestFolderScan(unittest.TestCase):
+    """Test that folder listings are stable whichever scanner is used"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        for i in range(40):
+            directory = os.path.join(self.test_dir, f"dir{i % 5}", f"sub{i % 3}")
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"file{i}.txt"), "w") as f:
+                f.write("x" * i)
+        self.file_manager = FileManager()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _listing(self):
+        result = self.file_manager.open_folder(self.test_dir)
+        self.assertTrue(result["success"])
+        paths = [f["path"] for f in result["files"]]
+        stored = self.file_manager.open_projects[result["project_id"]]["files"].paths
+        self.assertEqual(stored, paths)
+        return paths
+
+    def test_serial_listing_sorted(self):
+        """Test that the stored listing is sorted by path"""
+        paths = self._listing()
+        self.assertEqual(len(paths), 40)
+        self.assertEqual(paths, sorted(paths))
+
+    def test_parallel_listing_matches_serial(self):
+        """Test that the parallel scan stores the same order and reuses its pool"""
+        serial = self._listing()
+        with patch.object(file_manager, "SCAN_WORKERS", 4):
+            first = self._listing()
+            executor = file_manager._scan_executor
+            second = self._listing()
+        self.assertEqual(first, serial)
+        self.assertEqual(second, serial)
+        self.assertIsNotNone(executor)
+        self.assertIs(file_manager._scan_executor, executor)
+
+if __name__ == '__main__':
+    unittest.main()